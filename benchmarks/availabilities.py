@@ -0,0 +1,66 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Compare offer availability computation before and after interval algebra.
+
+Usage: python -m benchmarks.availabilities [--leases N] [--repeat N]
+"""
+
+import argparse
+import datetime
+import timeit
+
+from esi_leap.common import intervals
+from esi_leap.tests.objects import availabilities as reference
+
+
+def availabilities(start_time, end_time, conflicts):
+    return [[s, e] for s, e in intervals.subtract(start_time, end_time, conflicts)]
+
+
+def make_offer(lease_count):
+    # back-to-back historical leases with a one hour gap after every other
+    # one, followed by a year of free time
+    start = datetime.datetime(2020, 1, 1)
+    conflicts = []
+    t = start
+    for i in range(lease_count):
+        conflicts.append((t, t + datetime.timedelta(hours=4)))
+        t += datetime.timedelta(hours=4 if i % 2 else 5)
+    return start, t + datetime.timedelta(days=365), conflicts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--leases", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    start, end, conflicts = make_offer(args.leases)
+    assert reference.legacy_availabilities(start, end, conflicts) == availabilities(
+        start, end, conflicts
+    )
+
+    for name, func in (
+        ("legacy", reference.legacy_availabilities),
+        ("intervals", availabilities),
+    ):
+        best = min(
+            timeit.repeat(
+                lambda: func(start, end, conflicts), number=1, repeat=args.repeat
+            )
+        )
+        print("%-10s %8.2f ms" % (name, best * 1000))
+
+
+if __name__ == "__main__":
+    main()
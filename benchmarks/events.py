@@ -0,0 +1,128 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measure the cost of one event poll as the events table grows.
+
+A consumer polls for the events of one project, either resuming from an
+id a fixed number of events behind the newest one (tail), or catching up
+from the first event (catch-up). The paged keyset query is compared with
+the unordered, unlimited query it replaced. Timings are in milliseconds.
+
+Usage: python -m benchmarks.events [--sizes N,N,...] [--projects N]
+           [--behind N] [--limit N] [--repeat N]
+"""
+
+import argparse
+import datetime
+import random
+import timeit
+
+from oslo_db import options as db_options
+from oslo_db.sqlalchemy import enginefacade
+
+import esi_leap.conf
+from esi_leap.db.sqlalchemy import api
+from esi_leap.db.sqlalchemy import models
+
+
+CONF = esi_leap.conf.CONF
+
+
+def legacy_event_get_all(lessee_or_owner_id, last_event_id):
+    return (
+        api.model_query(models.Event)
+        .filter(last_event_id < models.Event.id)
+        .filter(
+            (lessee_or_owner_id == models.Event.lessee_id)
+            | (lessee_or_owner_id == models.Event.owner_id)
+        )
+        .all()
+    )
+
+
+def event_get_all(lessee_or_owner_id, last_event_id, limit):
+    return api.event_get_all(
+        {
+            "lessee_or_owner_id": lessee_or_owner_id,
+            "last_event_id": last_event_id,
+            "limit": limit,
+        }
+    ).all()
+
+
+def grow(engine, start, end, projects, rng):
+    now = datetime.datetime(2026, 1, 1)
+    rows = [
+        dict(
+            id=i,
+            event_type="esi_leap.lease.fulfill.end",
+            event_time=now + datetime.timedelta(seconds=i),
+            object_type="lease",
+            object_uuid="lease-%d" % i,
+            resource_type="ironic_node",
+            resource_uuid="node-%d" % (i % 1000),
+            lessee_id=rng.choice(projects),
+            owner_id=rng.choice(projects),
+        )
+        for i in range(start + 1, end + 1)
+    ]
+    with engine.begin() as conn:
+        conn.execute(models.Event.__table__.insert(), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--behind", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    db_options.set_defaults(CONF, connection="sqlite://")
+    CONF([], project="esi-leap", default_config_files=[])
+    CONF.set_override("slow_query_threshold", 0, group="query_stats")
+    engine = enginefacade.writer.get_engine()
+    models.Base.metadata.create_all(engine)
+
+    rng = random.Random(0)
+    projects = ["project-%d" % i for i in range(args.projects)]
+    project = projects[0]
+
+    print(
+        "%10s %12s %12s %16s %16s"
+        % ("events", "tail legacy", "tail paged", "catch-up legacy", "catch-up paged")
+    )
+    size = 0
+    for target in sorted(int(s) for s in args.sizes.split(",")):
+        grow(engine, size, target, projects, rng)
+        size = target
+
+        timings = []
+        for last_event_id in (max(0, size - args.behind), 0):
+            paged = [e.id for e in event_get_all(project, last_event_id, args.limit)]
+            legacy = sorted(e.id for e in legacy_event_get_all(project, last_event_id))
+            assert paged == legacy[: args.limit]
+
+            for func in (
+                lambda: legacy_event_get_all(project, last_event_id),
+                lambda: event_get_all(project, last_event_id, args.limit),
+            ):
+                timings.append(min(timeit.repeat(func, number=1, repeat=args.repeat)))
+        print(
+            "%10d %12.2f %12.2f %16.2f %16.2f"
+            % ((size,) + tuple(t * 1000 for t in timings))
+        )
+
+
+if __name__ == "__main__":
+    main()
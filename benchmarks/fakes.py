@@ -0,0 +1,119 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""In-process stand-ins for the Ironic and Keystone clients.
+
+Every call sleeps for a fixed latency to model the round trip to the real
+service, and is counted so that the benchmarks can report how many remote
+calls an operation makes.
+"""
+
+import collections
+import time
+
+from ironicclient.common.apiclient import exceptions as ir_exception
+
+
+class Backend(object):
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = collections.Counter()
+
+    def call(self, name):
+        self.calls[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+
+class FakeNode(object):
+    def __init__(self, uuid, name, owner, resource_class):
+        self.uuid = uuid
+        self.name = name
+        self.owner = owner
+        self.lessee = None
+        self.resource_class = resource_class
+        self.properties = {"cpus": 40, "memory_mb": 131072}
+        self.provision_state = "available"
+        self.power_state = "power off"
+        self.maintenance = False
+
+
+class FakeNodeManager(object):
+    def __init__(self, backend, nodes):
+        self._backend = backend
+        self._nodes = {node.uuid: node for node in nodes}
+
+    def list(self, detail=False, fields=None, **filters):
+        self._backend.call("ironic.node.list")
+        return [
+            node
+            for node in self._nodes.values()
+            if all(getattr(node, k) == v for k, v in filters.items())
+        ]
+
+    def get(self, ident, fields=None):
+        self._backend.call("ironic.node.get")
+        node = self._nodes.get(ident)
+        if node is None:
+            node = next((n for n in self._nodes.values() if n.name == ident), None)
+        if node is None:
+            raise ir_exception.NotFound()
+        return node
+
+    def update(self, ident, patches):
+        self._backend.call("ironic.node.update")
+        node = self._nodes[ident]
+        for patch in patches:
+            path = patch["path"].lstrip("/").split("/")
+            if path[0] == "properties":
+                if patch["op"] == "remove":
+                    node.properties.pop(path[1], None)
+                else:
+                    node.properties[path[1]] = patch["value"]
+            else:
+                value = None if patch["op"] == "remove" else patch["value"]
+                setattr(node, path[0], value)
+        return node
+
+    def set_provision_state(self, ident, state):
+        self._backend.call("ironic.node.set_provision_state")
+
+
+class FakeIronicClient(object):
+    def __init__(self, backend, nodes):
+        self.node = FakeNodeManager(backend, nodes)
+
+
+class FakeProject(object):
+    def __init__(self, id, name, parent_id=None):
+        self.id = id
+        self.name = name
+        self.parent_id = parent_id
+
+
+class FakeProjectManager(object):
+    def __init__(self, backend, projects):
+        self._backend = backend
+        self._projects = {project.id: project for project in projects}
+
+    def get(self, project_id):
+        self._backend.call("keystone.projects.get")
+        return self._projects[project_id]
+
+    def list(self, name=None):
+        self._backend.call("keystone.projects.list")
+        return [p for p in self._projects.values() if name is None or p.name == name]
+
+
+class FakeKeystoneClient(object):
+    def __init__(self, backend, projects):
+        self.projects = FakeProjectManager(backend, projects)
@@ -0,0 +1,198 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Compare full Ironic node listings with the fields esi-leap requests.
+
+A fake Ironic node list response is built for a number of nodes, with
+driver_info, driver_internal_info, instance_info and extra of a typical
+deployed node, once with every field (detail=True) and once with only
+ironic.NODE_FIELDS. For each the payload size, and the time the client
+takes to decode it into node resources, are reported.
+
+Usage: python -m benchmarks.ironic_fields [--nodes N] [--repeat N]
+"""
+
+import argparse
+import json
+import timeit
+
+from ironicclient.v1 import node as ironic_node
+from oslo_utils import uuidutils
+
+from esi_leap.common import ironic
+
+
+INTERFACES = (
+    "bios",
+    "boot",
+    "console",
+    "deploy",
+    "firmware",
+    "inspect",
+    "management",
+    "network",
+    "power",
+    "raid",
+    "rescue",
+    "storage",
+    "vendor",
+)
+
+
+def full_node(i):
+    uuid = uuidutils.generate_uuid()
+    link = "https://ironic.example.com:6385/v1/nodes/%s" % uuid
+    node = {
+        "uuid": uuid,
+        "name": "node-%d" % i,
+        "driver": "ipmi",
+        "driver_info": {
+            "ipmi_address": "10.0.%d.%d" % (i // 256, i % 256),
+            "ipmi_username": "admin",
+            "ipmi_password": "******",
+            "ipmi_port": 623,
+            "ipmi_terminal_port": 9000 + i,
+            "deploy_kernel": "https://images.example.com/ipa.kernel",
+            "deploy_ramdisk": "https://images.example.com/ipa.initramfs",
+            "rescue_kernel": "https://images.example.com/ipa.kernel",
+            "rescue_ramdisk": "https://images.example.com/ipa.initramfs",
+        },
+        "driver_internal_info": {
+            "agent_url": "http://10.1.%d.%d:9999" % (i // 256, i % 256),
+            "agent_version": "9.7.0",
+            "agent_last_heartbeat": "2026-10-19T18:00:00.000000",
+            "agent_verify_ca": True,
+            "hardware_manager_version": {"generic_hardware_manager": "1.2"},
+            "last_power_state_change": "2026-10-19T17:00:00.000000",
+            "is_whole_disk_image": True,
+            "deploy_steps": None,
+            "clean_steps": [
+                {
+                    "step": step,
+                    "priority": 10 * n,
+                    "interface": "deploy",
+                    "reboot_requested": False,
+                    "abortable": True,
+                    "argsinfo": None,
+                }
+                for n, step in enumerate(
+                    ("erase_devices_metadata", "erase_devices", "delete_configuration")
+                )
+            ],
+            "root_uuid_or_disk_id": uuidutils.generate_uuid(),
+        },
+        "instance_info": {
+            "image_source": "https://images.example.com/centos-9.qcow2",
+            "image_checksum": "b3d1ac4b" * 8,
+            "image_os_hash_algo": "sha512",
+            "image_os_hash_value": "9f86d081" * 16,
+            "image_disk_format": "qcow2",
+            "root_gb": "100",
+            "swap_mb": "0",
+            "display_name": "instance-%d" % i,
+            "capabilities": {"boot_mode": "uefi"},
+            "configdrive": "H4sICAAAAAAC/3RtcC5pc28A" * 40,
+        },
+        "instance_uuid": uuidutils.generate_uuid(),
+        "extra": {
+            "rack": "r%d" % (i // 40),
+            "slot": i % 40,
+            "asset_tag": "A%08d" % i,
+            "notes": "procured 2024, warranty until 2029",
+        },
+        "properties": {
+            "cpus": 64,
+            "cpu_arch": "x86_64",
+            "memory_mb": 262144,
+            "local_gb": 1800,
+            "capabilities": "boot_mode:uefi,cpu_vt:true,cpu_aes:true",
+            "lease_uuid": uuidutils.generate_uuid(),
+        },
+        "resource_class": "baremetal",
+        "owner": uuidutils.generate_uuid(),
+        "lessee": uuidutils.generate_uuid(),
+        "provision_state": "active",
+        "target_provision_state": None,
+        "power_state": "power on",
+        "target_power_state": None,
+        "maintenance": False,
+        "maintenance_reason": None,
+        "fault": None,
+        "last_error": None,
+        "reservation": None,
+        "console_enabled": False,
+        "protected": False,
+        "protected_reason": None,
+        "retired": False,
+        "retired_reason": None,
+        "automated_clean": None,
+        "chassis_uuid": None,
+        "conductor_group": "",
+        "conductor": "conductor-%d" % (i % 3),
+        "allocation_uuid": None,
+        "description": None,
+        "network_data": {},
+        "traits": ["CUSTOM_GPU", "CUSTOM_NVME"],
+        "created_at": "2024-01-01T00:00:00+00:00",
+        "updated_at": "2026-10-19T18:00:00+00:00",
+        "provision_updated_at": "2026-10-19T17:00:00+00:00",
+        "inspection_started_at": None,
+        "inspection_finished_at": "2024-01-01T01:00:00+00:00",
+        "links": [
+            {"href": link, "rel": "self"},
+            {"href": link.replace("/v1", ""), "rel": "bookmark"},
+        ],
+    }
+    for interface in INTERFACES:
+        node["%s_interface" % interface] = "fake"
+    for sub in ("ports", "portgroups", "states", "volume"):
+        node[sub] = [
+            {"href": "%s/%s" % (link, sub), "rel": "self"},
+            {"href": "%s/%s" % (link.replace("/v1", ""), sub), "rel": "bookmark"},
+        ]
+    return node
+
+
+def decode(payload):
+    return [
+        ironic_node.Node(None, info, loaded=True)
+        for info in json.loads(payload)["nodes"]
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    nodes = [full_node(i) for i in range(args.nodes)]
+    payloads = [
+        ("detail=True", json.dumps({"nodes": nodes})),
+        (
+            "fields=NODE_FIELDS",
+            json.dumps(
+                {"nodes": [{f: n[f] for f in ironic.NODE_FIELDS} for n in nodes]}
+            ),
+        ),
+    ]
+
+    print("%-20s %12s %12s" % ("request", "size (KiB)", "decode (ms)"))
+    for name, payload in payloads:
+        duration = min(
+            timeit.repeat(lambda: decode(payload), number=1, repeat=args.repeat)
+        )
+        print("%-20s %12.0f %12.1f" % (name, len(payload) / 1024.0, duration * 1000))
+
+
+if __name__ == "__main__":
+    main()
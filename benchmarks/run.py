@@ -0,0 +1,369 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Benchmark the API and manager against a seeded database.
+
+The database is seeded with offers, leases and events, Ironic and Keystone
+are replaced by in-process fakes with a configurable latency, and each
+scenario is run a number of times through the WSGI application. For every
+scenario the p50 and p99 latency and the number of SQL statements and
+remote calls per run are reported, and compared against a stored baseline.
+
+Usage: python -m benchmarks.run [--offers N] [--leases N] [--events N]
+           [--projects N] [--nodes N] [--latency MS] [--iterations N]
+           [--database-url URL] [--scenario NAME ...]
+           [--baseline PATH] [--save-baseline] [--tolerance FRACTION]
+
+--database-url defaults to an in-memory SQLite database. A MySQL URL must
+point at an empty scratch database; its tables are created and filled.
+
+The command exits with status 1 if any scenario regressed against the
+baseline: p50 or p99 latency more than --tolerance above it, or more SQL
+statements or remote calls per run. Latencies are only comparable with a
+baseline recorded on the same machine; record one locally with
+--save-baseline before making a change.
+"""
+
+import argparse
+import collections
+import datetime
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+
+import mock
+from oslo_db.sqlalchemy import enginefacade
+from oslo_utils import uuidutils
+import sqlalchemy as sa
+import webtest
+
+from benchmarks import fakes
+from esi_leap.api import app
+from esi_leap.common import rpc
+from esi_leap.common import statuses
+import esi_leap.conf
+from esi_leap.db.sqlalchemy import models
+from esi_leap.manager import service as manager_service
+from esi_leap import objects
+
+
+CONF = esi_leap.conf.CONF
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+RESOURCE_CLASSES = ["baremetal", "gpu", "storage"]
+
+Result = collections.namedtuple("Result", ["p50", "p99", "queries", "calls"])
+
+
+class StatementCounter(object):
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, many):
+        self.count += 1
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(p / 100.0 * len(ordered)) - 1)]
+
+
+def configure(database_url, lock_path):
+    CONF([], project="esi-leap", default_config_files=[])
+    CONF.set_override("connection", database_url, group="database")
+    CONF.set_override("auth_enable", False, group="pecan")
+    CONF.set_override("lock_path", lock_path, group="oslo_concurrency")
+    CONF.set_override("default_resource_type", "ironic_node", group="api")
+    objects.register_all()
+    rpc.init(CONF)
+
+
+def seed(args, now):
+    """Fill the database and build the fake Ironic and Keystone state."""
+    engine = enginefacade.writer.get_engine()
+    models.Base.metadata.create_all(engine)
+
+    projects = [
+        fakes.FakeProject(uuidutils.generate_uuid(), "project-%d" % i)
+        for i in range(args.projects)
+    ]
+    nodes = [
+        fakes.FakeNode(
+            uuidutils.generate_uuid(),
+            "node-%d" % i,
+            projects[i % len(projects)].id,
+            RESOURCE_CLASSES[i % len(RESOURCE_CLASSES)],
+        )
+        for i in range(args.nodes)
+    ]
+
+    offers = []
+    for i in range(args.offers):
+        node = nodes[i % len(nodes)]
+        offers.append(
+            dict(
+                uuid=uuidutils.generate_uuid(),
+                project_id=node.owner,
+                resource_type="ironic_node",
+                resource_uuid=node.uuid,
+                start_time=now - datetime.timedelta(days=365),
+                end_time=now + datetime.timedelta(days=365),
+                status=statuses.AVAILABLE,
+                properties={},
+            )
+        )
+
+    # most leases are history; the last lease of each offer is upcoming
+    # and every tenth offer has one due to be fulfilled by the manager
+    leases = []
+    per_offer = max(1, args.leases // max(1, len(offers)))
+    for i, offer in enumerate(offers):
+        for j in range(per_offer):
+            if len(leases) >= args.leases:
+                break
+            lessee = projects[(i + j + 1) % len(projects)].id
+            lease = dict(
+                uuid=uuidutils.generate_uuid(),
+                project_id=lessee,
+                owner_id=offer["project_id"],
+                offer_uuid=offer["uuid"],
+                resource_type=offer["resource_type"],
+                resource_uuid=offer["resource_uuid"],
+                properties={},
+            )
+            if j == per_offer - 1:
+                start = now + datetime.timedelta(days=1)
+                lease.update(status=statuses.CREATED)
+            elif j == per_offer - 2 and i % 10 == 0:
+                start = now - datetime.timedelta(hours=1)
+                lease.update(status=statuses.CREATED)
+            else:
+                start = now - datetime.timedelta(days=2 * (per_offer - j))
+                lease.update(status=statuses.EXPIRED)
+            lease.update(start_time=start, end_time=start + datetime.timedelta(days=1))
+            leases.append(lease)
+
+    events = []
+    for i in range(args.events):
+        lease = leases[i % len(leases)] if leases else {}
+        events.append(
+            dict(
+                event_type="esi_leap.lease.fulfill.end",
+                event_time=now - datetime.timedelta(seconds=args.events - i),
+                object_type="lease",
+                object_uuid=lease.get("uuid"),
+                resource_type="ironic_node",
+                resource_uuid=lease.get("resource_uuid"),
+                lessee_id=lease.get("project_id"),
+                owner_id=lease.get("owner_id"),
+            )
+        )
+
+    with engine.begin() as conn:
+        for model, rows in (
+            (models.Offer, offers),
+            (models.Lease, leases),
+            (models.Event, events),
+        ):
+            if rows:
+                conn.execute(model.__table__.insert(), rows)
+
+    return projects, nodes, offers
+
+
+def run_scenario(func, iterations, counter, backend):
+    # one unmeasured run to fill caches and open connections
+    func(iterations)
+    samples = []
+    queries = []
+    calls = []
+    for i in range(iterations):
+        counter.count = 0
+        backend.calls.clear()
+        start = time.perf_counter()
+        func(i)
+        samples.append(time.perf_counter() - start)
+        queries.append(counter.count)
+        calls.append(sum(backend.calls.values()))
+    # counts are medians so that a one-off connection check or cache
+    # fill does not show up as a regression
+    return Result(
+        percentile(samples, 50) * 1000,
+        percentile(samples, 99) * 1000,
+        percentile(queries, 50),
+        percentile(calls, 50),
+    )
+
+
+def build_scenarios(test_app, offers, now, admin):
+    def get(path):
+        return lambda i: test_app.get(path, headers=admin)
+
+    def claim(i):
+        offer = offers[i % len(offers)]
+        start = now + datetime.timedelta(days=30, hours=2 * i)
+        test_app.post_json(
+            "/v1/offers/%s/claim" % offer["uuid"],
+            {
+                "start_time": start.isoformat(),
+                "end_time": (start + datetime.timedelta(hours=1)).isoformat(),
+            },
+            headers=admin,
+        )
+
+    def manager_cycle(i):
+        manager._fulfill_leases()
+        manager._expire_leases()
+        manager._cancel_leases()
+        manager._expire_offers()
+
+    with mock.patch("oslo_messaging.get_rpc_transport"), mock.patch(
+        "oslo_messaging.get_rpc_server"
+    ):
+        manager = manager_service.ManagerService()
+
+    return collections.OrderedDict(
+        [
+            ("offers.get_all", get("/v1/offers")),
+            ("leases.get_all", get("/v1/leases")),
+            ("nodes.get_all", get("/v1/nodes")),
+            ("events.get_all", get("/v1/events")),
+            ("offers.claim", claim),
+            ("manager.cycle", manager_cycle),
+        ]
+    )
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for field in ("p50", "p99"):
+            if getattr(result, field) > base[field] * (1 + tolerance):
+                regressions.append(
+                    "%s: %s %.2fms > baseline %.2fms"
+                    % (name, field, getattr(result, field), base[field])
+                )
+        for field in ("queries", "calls"):
+            if getattr(result, field) > base[field]:
+                regressions.append(
+                    "%s: %s %d > baseline %d"
+                    % (name, field, getattr(result, field), base[field])
+                )
+    return regressions
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--offers", type=int, default=1000)
+    parser.add_argument("--leases", type=int, default=10000)
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--nodes", type=int, default=1000)
+    parser.add_argument(
+        "--latency", type=float, default=5, help="fake Ironic/Keystone latency, ms"
+    )
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--database-url")
+    parser.add_argument("--scenario", action="append")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix="esi-leap-bench-")
+    configure(args.database_url or "sqlite://", workdir)
+
+    now = datetime.datetime.now()
+    projects, nodes, offers = seed(args, now)
+    backend = fakes.Backend(args.latency / 1000.0)
+    ironic_client = fakes.FakeIronicClient(backend, nodes)
+    keystone_client = fakes.FakeKeystoneClient(backend, projects)
+
+    counter = StatementCounter()
+    sa.event.listen(sa.engine.Engine, "before_cursor_execute", counter)
+
+    admin = {
+        "X-Project-Id": projects[0].id,
+        "X-User-Id": "bench",
+        "X-Roles": "admin",
+    }
+
+    patches = [
+        mock.patch(
+            "esi_leap.common.ironic.get_ironic_client", return_value=ironic_client
+        ),
+        mock.patch(
+            "esi_leap.resource_objects.ironic_node.get_ironic_client",
+            return_value=ironic_client,
+        ),
+        mock.patch(
+            "esi_leap.common.keystone.get_keystone_client",
+            return_value=keystone_client,
+        ),
+    ]
+    for p in patches:
+        p.start()
+
+    test_app = webtest.TestApp(app.setup_app())
+    scenarios = build_scenarios(test_app, offers, now, admin)
+
+    results = collections.OrderedDict()
+    print(
+        "%-16s %10s %10s %8s %8s"
+        % ("scenario", "p50 (ms)", "p99 (ms)", "queries", "calls")
+    )
+    for name, func in scenarios.items():
+        if args.scenario and name not in args.scenario:
+            continue
+        result = run_scenario(func, args.iterations, counter, backend)
+        results[name] = result
+        print(
+            "%-16s %10.2f %10.2f %8d %8d"
+            % (name, result.p50, result.p99, result.queries, result.calls)
+        )
+
+    for p in patches:
+        p.stop()
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update({name: r._asdict() for name, r in results.items()})
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print("Saved baseline to %s" % args.baseline)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline at %s; run with --save-baseline" % args.baseline)
+        return 0
+
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f), args.tolerance)
+    for regression in regressions:
+        print("REGRESSION %s" % regression)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
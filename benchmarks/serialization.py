@@ -0,0 +1,155 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Compare the WSME and the fast JSON encoding of collection responses.
+
+The lease, offer and event rows of a listing, as the controllers have
+them after adding project and node names, are encoded once the way WSME
+does by default, building one wtypes.Base per row, and once through
+types.to_json as with [api] fast_json. Both must give the same bytes.
+Timings are in milliseconds.
+
+Usage: python -m benchmarks.serialization [--rows N] [--repeat N]
+"""
+
+import argparse
+import datetime
+import timeit
+
+from oslo_utils import uuidutils
+from wsme.rest import json as wjson
+
+from esi_leap.api.controllers import types
+from esi_leap.api.controllers.v1 import event
+from esi_leap.api.controllers.v1 import lease
+from esi_leap.api.controllers.v1 import offer
+
+
+START = datetime.datetime(2026, 1, 1)
+
+
+def lease_values(i):
+    return {
+        "uuid": uuidutils.generate_uuid(),
+        "name": None,
+        "project_id": "project-%d" % (i % 50),
+        "project": "Project %d" % (i % 50),
+        "owner_id": "owner-%d" % (i % 5),
+        "owner": "Owner %d" % (i % 5),
+        "resource_type": "ironic_node",
+        "resource_uuid": uuidutils.generate_uuid(),
+        "resource": "node-%d" % i,
+        "resource_class": "baremetal",
+        "resource_properties": {"cpus": 64, "memory_mb": 262144, "traits": []},
+        "start_time": START + datetime.timedelta(hours=i),
+        "end_time": START + datetime.timedelta(days=7, hours=i),
+        "fulfill_time": START + datetime.timedelta(hours=i, seconds=5),
+        "expire_time": None,
+        "status": "active",
+        "properties": {},
+        "purpose": "benchmark",
+        "offer_uuid": uuidutils.generate_uuid(),
+        "parent_lease_uuid": None,
+    }
+
+
+def offer_values(i):
+    start = START + datetime.timedelta(hours=i)
+    return {
+        "uuid": uuidutils.generate_uuid(),
+        "name": "offer-%d" % i,
+        "project_id": "owner-%d" % (i % 5),
+        "project": "Owner %d" % (i % 5),
+        "lessee_id": None,
+        "lessee": None,
+        "resource_type": "ironic_node",
+        "resource_uuid": uuidutils.generate_uuid(),
+        "resource": "node-%d" % i,
+        "resource_class": "baremetal",
+        "resource_properties": {"cpus": 64, "memory_mb": 262144, "traits": []},
+        "start_time": start,
+        "end_time": start + datetime.timedelta(days=30),
+        "status": "available",
+        "properties": {},
+        "availabilities": [
+            [start, start + datetime.timedelta(days=3)],
+            [start + datetime.timedelta(days=10), start + datetime.timedelta(days=30)],
+        ],
+        "parent_lease_uuid": None,
+    }
+
+
+def event_values(i):
+    return {
+        "id": i,
+        "event_type": "esi_leap.lease.fulfill.end",
+        "event_time": START + datetime.timedelta(seconds=i),
+        "object_type": "lease",
+        "object_uuid": uuidutils.generate_uuid(),
+        "resource_type": "ironic_node",
+        "resource_uuid": uuidutils.generate_uuid(),
+        "lessee_id": "project-%d" % (i % 50),
+        "owner_id": "owner-%d" % (i % 5),
+    }
+
+
+def wsme_encode(collection_type, item_type, attr, rows):
+    collection = collection_type()
+    setattr(collection, attr, [item_type(**values) for values in rows])
+    return wjson.encode_result(collection, collection_type)
+
+
+def fast_encode(collection_type, item_type, attr, rows):
+    result = types.to_json(
+        collection_type,
+        collection_type(),
+        **{attr: [types.to_json(item_type, values) for values in rows]},
+    )
+    return wjson.encode_result(result, types.jsontype)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    scenarios = [
+        ("leases", lease.LeaseCollection, lease.Lease, lease_values),
+        ("offers", offer.OfferCollection, offer.Offer, offer_values),
+        ("events", event.EventCollection, event.Event, event_values),
+    ]
+
+    print("%-10s %12s %12s %10s" % ("listing", "wsme (ms)", "fast (ms)", "speedup"))
+    for attr, collection_type, item_type, values in scenarios:
+        rows = [values(i) for i in range(args.rows)]
+        encoded = wsme_encode(collection_type, item_type, attr, rows)
+        assert encoded == fast_encode(collection_type, item_type, attr, rows)
+
+        timings = [
+            min(
+                timeit.repeat(
+                    lambda: encode(collection_type, item_type, attr, rows),
+                    number=1,
+                    repeat=args.repeat,
+                )
+            )
+            for encode in (wsme_encode, fast_encode)
+        ]
+        print(
+            "%-10s %12.1f %12.1f %9.1fx"
+            % (attr, timings[0] * 1000, timings[1] * 1000, timings[0] / timings[1])
+        )
+
+
+if __name__ == "__main__":
+    main()
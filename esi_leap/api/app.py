@@ -12,22 +12,90 @@
 
 from keystonemiddleware import auth_token
 from oslo_context import context
+from oslo_log import log as logging
+from oslo_utils import strutils
+from osprofiler import web
 import pecan
 from pecan import hooks
+import time
 
+from esi_leap.api import compression
+from esi_leap.common import metrics
+from esi_leap.common import query_stats
 import esi_leap.conf
+from esi_leap.db import api as dbapi
+from esi_leap.objects import base as objects_base
 
 
 CONF = esi_leap.conf.CONF
+LOG = logging.getLogger(__name__)
+
+# requests sending this header with a true value read from the primary
+# database, e.g. to see their own writes when a replica is configured
+PRIMARY_READ_HEADER = "X-ESI-Leap-Read-Primary"
+
+
+def _route(controller):
+    # name a route by its handler, e.g. OffersController.get_all, rather
+    # than by path so that resource uuids do not leak into labels and logs
+    route = controller.__name__
+    owner = getattr(controller, "__self__", None)
+    if owner is not None:
+        route = "%s.%s" % (type(owner).__name__, route)
+    return route
 
 
 class ContextHook(hooks.PecanHook):
     def before(self, state):
         ctx = context.RequestContext.from_environ(state.request.environ)
         state.request.context = ctx
+        query_stats.start(_route(state.controller))
+        objects_base.start_read_cache()
+        dbapi.allow_replica_reads(
+            state.request.method in ("GET", "HEAD")
+            and not strutils.bool_from_string(
+                state.request.headers.get(PRIMARY_READ_HEADER)
+            )
+        )
 
     def after(self, state):
         state.request.context = None
+        objects_base.stop_read_cache()
+        dbapi.allow_replica_reads(False)
+        stats = query_stats.stop()
+        if stats is None:
+            return
+        values = {
+            "method": state.request.method,
+            "route": stats.route,
+            "count": stats.count,
+            "duration": stats.duration,
+        }
+        if stats.over_budget:
+            values["budget"] = CONF.query_stats.request_query_budget
+            LOG.warning(
+                "%(method)s %(route)s issued %(count)d queries in "
+                "%(duration).3fs, more than the budget of %(budget)d",
+                values,
+            )
+        else:
+            LOG.debug(
+                "%(method)s %(route)s issued %(count)d queries in %(duration).3fs",
+                values,
+            )
+
+
+class MetricsHook(hooks.PecanHook):
+    def before(self, state):
+        state.request.environ[metrics.START_KEY] = time.monotonic()
+
+    def after(self, state):
+        start = state.request.environ.pop(metrics.START_KEY, None)
+        if start is None or state.controller is None:
+            return
+        metrics.API_REQUEST_DURATION.labels(
+            state.request.method, _route(state.controller), state.response.status_int
+        ).observe(time.monotonic() - start)
 
 
 def get_pecan_config():
@@ -51,15 +119,25 @@ def setup_app(config=None):
 
     app = pecan.make_app(
         config.app.root,
-        hooks=lambda: [ContextHook()],
+        hooks=lambda: [ContextHook(), MetricsHook()],
         debug=CONF.pecan.debug,
         static_root=config.app.static_root if CONF.pecan.debug else None,
         force_canonical=getattr(config.app, "force_canonical", True),
     )
 
+    if CONF.compression.enabled:
+        app = compression.CompressionMiddleware(app)
+
+    if CONF.profiler.enabled:
+        app = web.WsgiMiddleware(app, hmac_keys=CONF.profiler.hmac_keys, enabled=True)
+
     if CONF.pecan.auth_enable:
         app = auth_token.AuthProtocol(app, dict(CONF.keystone_authtoken))
 
+    if CONF.metrics.enabled:
+        metrics.instrument_db()
+        app = metrics.MetricsMiddleware(app)
+
     return app
 
 
@@ -0,0 +1,203 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Negotiated compression of API responses.
+
+Responses are compressed chunk by chunk as the application produces
+them. Responses without a Content-Length are taken to be streamed, and
+each chunk is flushed to the client as soon as it is compressed.
+"""
+
+import time
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from esi_leap.common import metrics
+import esi_leap.conf
+
+
+CONF = esi_leap.conf.CONF
+
+COMPRESSIBLE_TYPES = ("application/json", "application/xml", "text/")
+
+# time.thread_time is only available from python 3.7
+_cpu_time = getattr(time, "thread_time", time.process_time)
+
+
+def get_encodings():
+    """Return the encodings available, in order of preference."""
+    return ("zstd", "gzip") if zstandard is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding, encodings):
+    """Return the preferred of the encodings a client accepts, or None.
+
+    :param accept_encoding: the Accept-Encoding header of the request.
+    :param encodings: the encodings available, in order of preference.
+    """
+    if not accept_encoding:
+        return None
+    qvalues = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        qvalue = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    qvalue = float(value)
+                except ValueError:
+                    qvalue = 0.0
+        qvalues[coding.strip().lower()] = qvalue
+
+    best, best_qvalue = None, 0.0
+    for encoding in encodings:
+        qvalue = qvalues.get(encoding, qvalues.get("*", 0.0))
+        if qvalue > best_qvalue:
+            best, best_qvalue = encoding, qvalue
+    return best
+
+
+def _get_header(headers, name):
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _is_compressible(status, headers):
+    if int(status.split(None, 1)[0]) in (204, 304):
+        return False
+    if _get_header(headers, "content-encoding") is not None:
+        return False
+    if "no-transform" in (_get_header(headers, "cache-control") or "").lower():
+        return False
+    content_type = (_get_header(headers, "content-type") or "").lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def _add_vary(headers):
+    vary = _get_header(headers, "vary")
+    if vary is None:
+        return headers + [("Vary", "Accept-Encoding")]
+    values = [v.strip().lower() for v in vary.split(",")]
+    if "*" in values or "accept-encoding" in values:
+        return headers
+    return [
+        (key, "%s, Accept-Encoding" % value) if key.lower() == "vary" else (key, value)
+        for key, value in headers
+    ]
+
+
+class _Stream(object):
+    """Compresses one response and records how well it did."""
+
+    def __init__(self, encoding, streaming):
+        self.encoding = encoding
+        self.streaming = streaming
+        self.original = 0
+        self.compressed = 0
+        self.cpu_time = 0.0
+        if encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(
+                level=CONF.compression.zstd_level
+            ).compressobj()
+            self._sync_flush = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        else:
+            self._compressor = zlib.compressobj(
+                CONF.compression.gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+            )
+            self._sync_flush = zlib.Z_SYNC_FLUSH
+
+    def compress(self, data):
+        start = _cpu_time()
+        out = self._compressor.compress(data)
+        if self.streaming:
+            out += self._compressor.flush(self._sync_flush)
+        self.cpu_time += _cpu_time() - start
+        self.original += len(data)
+        self.compressed += len(out)
+        return out
+
+    def finish(self):
+        start = _cpu_time()
+        out = self._compressor.flush()
+        self.cpu_time += _cpu_time() - start
+        self.compressed += len(out)
+        metrics.observe_compression(
+            self.encoding, self.original, self.compressed, self.cpu_time
+        )
+        return out
+
+
+class CompressionMiddleware(object):
+    """Compress responses for clients that accept gzip or zstd.
+
+    Only responses of at least [compression]min_size bytes, or of unknown
+    size, and of a textual content type are compressed.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def __call__(self, environ, start_response):
+        encoding = None
+        if environ.get("REQUEST_METHOD") != "HEAD":
+            encoding = choose_encoding(
+                environ.get("HTTP_ACCEPT_ENCODING"), get_encodings()
+            )
+        # the application may call start_response while it is iterated
+        streams = []
+
+        def _start_response(status, headers, exc_info=None):
+            del streams[:]
+            if not _is_compressible(status, headers):
+                return start_response(status, headers, exc_info)
+            headers = _add_vary(headers)
+            length = _get_header(headers, "content-length")
+            if encoding is None or (
+                length is not None and int(length) < CONF.compression.min_size
+            ):
+                return start_response(status, headers, exc_info)
+
+            stream = _Stream(encoding, streaming=length is None)
+            streams.append(stream)
+            headers = [
+                (key, value)
+                for key, value in headers
+                if key.lower() != "content-length"
+            ]
+            headers.append(("Content-Encoding", encoding))
+            write = start_response(status, headers, exc_info)
+            return lambda data: write(stream.compress(data))
+
+        app_iter = self.app(environ, _start_response)
+        if encoding is None:
+            return app_iter
+        return self._compress(app_iter, streams)
+
+    def _compress(self, app_iter, streams):
+        try:
+            for chunk in app_iter:
+                if streams:
+                    chunk = streams[0].compress(chunk)
+                if chunk:
+                    yield chunk
+            if streams:
+                yield streams[0].finish()
+        finally:
+            if hasattr(app_iter, "close"):
+                app_iter.close()
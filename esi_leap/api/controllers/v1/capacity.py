@@ -0,0 +1,165 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import pecan
+from pecan import rest
+import wsme
+from wsme import types as wtypes
+import wsmeext.pecan as wsme_pecan
+
+from esi_leap.api.controllers import base
+from esi_leap.api.controllers import types
+from esi_leap.api.controllers.v1 import utils
+from esi_leap.common import capacity
+from esi_leap.common import exception
+from esi_leap.common import inventory
+from esi_leap.common import keystone
+import esi_leap.conf
+from esi_leap.resource_objects import get_resource_object
+
+CONF = esi_leap.conf.CONF
+
+
+class Capacity(base.ESILEAPBase):
+    offer_uuid = wsme.wsattr(wtypes.text, readonly=True)
+    resource_type = wsme.wsattr(wtypes.text, readonly=True)
+    resource_uuid = wsme.wsattr(wtypes.text, readonly=True)
+    resource = wsme.wsattr(wtypes.text, readonly=True)
+    resource_class = wsme.wsattr(wtypes.text, readonly=True)
+    start_time = wsme.wsattr(datetime.datetime, readonly=True)
+    end_time = wsme.wsattr(datetime.datetime, readonly=True)
+    availability = wsme.wsattr([datetime.datetime], readonly=True)
+
+    def __init__(self, **kwargs):
+        self.fields = (
+            "offer_uuid",
+            "resource_type",
+            "resource_uuid",
+            "resource",
+            "resource_class",
+            "start_time",
+            "end_time",
+            "availability",
+        )
+        for field in self.fields:
+            setattr(self, field, kwargs.get(field, wtypes.Unset))
+
+
+class CapacityCollection(types.Collection):
+    capacity = [Capacity]
+
+    def __init__(self, **kwargs):
+        self._type = "capacity"
+        self.capacity = kwargs.get("capacity", [])
+
+
+class CapacityController(rest.RestController):
+    @wsme_pecan.wsexpose(
+        CapacityCollection,
+        wtypes.text,
+        wtypes.text,
+        datetime.datetime,
+        datetime.datetime,
+        wtypes.IntegerType(minimum=1),
+        wtypes.IntegerType(minimum=1),
+    )
+    def get_all(
+        self,
+        resource_type=None,
+        resource_class=None,
+        start_time=None,
+        end_time=None,
+        duration=None,
+        count=None,
+    ):
+        request = pecan.request.context
+        cdict = request.to_policy_values()
+        utils.policy_authorize("esi_leap:offer:get_all", cdict, cdict)
+
+        if resource_type is None:
+            resource_type = CONF.api.default_resource_type
+
+        if duration is None and (
+            start_time is None or end_time is None or end_time <= start_time
+        ):
+            raise exception.InvalidTimeAPICommand(
+                resource="capacity", start_time=str(start_time), end_time=str(end_time)
+            )
+
+        try:
+            utils.policy_authorize("esi_leap:offer:offer_admin", cdict, cdict)
+            lessee_ids = None
+        except exception.HTTPForbidden:
+            lessee_ids = keystone.get_parent_project_id_tree(cdict["project_id"])
+
+        node_list = None
+        if resource_type == "ironic_node":
+            node_list = inventory.get_node_list()
+
+        resources = {}
+
+        def get_resource(resource_uuid):
+            if resource_uuid not in resources:
+                resources[resource_uuid] = get_resource_object(
+                    resource_type, resource_uuid
+                )
+            return resources[resource_uuid]
+
+        def usable(window):
+            if (
+                lessee_ids is not None
+                and window.lessee_id is not None
+                and window.project_id != cdict["project_id"]
+                and window.lessee_id not in lessee_ids
+            ):
+                return False
+            if resource_class is not None:
+                resource = get_resource(window.resource_uuid)
+                return resource.get_resource_class(node_list) == resource_class
+            return True
+
+        index = capacity.get_index()
+        index.refresh()
+
+        if duration is None:
+            windows = index.get_free(resource_type, start_time, end_time, usable)
+        else:
+            if start_time is None:
+                start_time = datetime.datetime.now()
+            start_time, windows = index.get_earliest(
+                resource_type,
+                datetime.timedelta(seconds=duration),
+                count or 1,
+                start_time,
+                usable,
+            )
+            if start_time is not None:
+                end_time = start_time + datetime.timedelta(seconds=duration)
+
+        capacity_collection = CapacityCollection()
+        for w in windows:
+            resource = get_resource(w.resource_uuid)
+            capacity_collection.capacity.append(
+                Capacity(
+                    offer_uuid=w.offer_uuid,
+                    resource_type=w.resource_type,
+                    resource_uuid=w.resource_uuid,
+                    resource=resource.get_name(node_list),
+                    resource_class=resource.get_resource_class(node_list),
+                    start_time=start_time,
+                    end_time=end_time,
+                    availability=[w.start_time, w.end_time],
+                )
+            )
+
+        return capacity_collection
@@ -23,6 +23,7 @@ from esi_leap.api.controllers.v1 import utils
 from esi_leap.common import exception
 from esi_leap.common import keystone
 import esi_leap.conf
+from esi_leap.db import api as dbapi
 from esi_leap.objects import event as event_obj
 from esi_leap.resource_objects import get_resource_object
 
@@ -48,6 +49,7 @@ class Event(base.ESILEAPBase):
 
 class EventCollection(types.Collection):
     events = [Event]
+    next_event_id = int
 
     def __init__(self, **kwargs):
         self._type = "events"
@@ -62,7 +64,7 @@ class EventsController(rest.RestController):
         wtypes.text,
         wtypes.text,
         wtypes.text,
-        wtypes.text,
+        int,
     )
     def get_all(
         self,
@@ -72,10 +74,16 @@ class EventsController(rest.RestController):
         event_type=None,
         resource_type=None,
         resource_uuid=None,
+        limit=None,
     ):
         request = pecan.request.context
         cdict = request.to_policy_values()
 
+        if limit is not None and limit < 1:
+            raise exception.InvalidLimit(limit=limit)
+        # events are returned in pages of at most [api] max_limit
+        limit = min(limit or CONF.api.max_limit, CONF.api.max_limit)
+
         try:
             utils.policy_authorize("esi_leap:offer:offer_admin", cdict, cdict)
         except exception.HTTPForbidden:
@@ -99,6 +107,7 @@ class EventsController(rest.RestController):
             "event_type": event_type,
             "resource_type": resource_type,
             "resource_uuid": resource_uuid,
+            "limit": limit,
         }
 
         # unpack iterator to tuple so we can use 'del'
@@ -106,11 +115,15 @@ class EventsController(rest.RestController):
             if v is None:
                 del filters[k]
 
-        events = event_obj.Event.get_all(filters, request)
+        # check the version and list the events on one session
+        with dbapi.read_transaction():
+            version = event_obj.Event.get_version(filters)
+            if utils.collection_not_modified(filters, version):
+                return utils.not_modified()
+            events = event_obj.Event.get_all(filters, request)
         event_collection = EventCollection()
-        event_collection.events = []
-        for event in events:
-            e = Event(
+        event_dicts = [
+            dict(
                 id=event.id,
                 event_type=event.event_type,
                 event_time=event.event_time,
@@ -121,6 +134,22 @@ class EventsController(rest.RestController):
                 lessee_id=event.lessee_id,
                 owner_id=event.owner_id,
             )
-            event_collection.events.append(e)
+            for event in events
+        ]
+
+        # poll again from the last event returned, or from the same place
+        # if there were no new events
+        if event_dicts:
+            event_collection.next_event_id = event_dicts[-1]["id"]
+        elif last_event_id is not None:
+            event_collection.next_event_id = last_event_id
+
+        if utils.use_fast_json():
+            return utils.json_response(
+                EventCollection,
+                event_collection,
+                events=[types.to_json(Event, e) for e in event_dicts],
+            )
+        event_collection.events = [Event(**e) for e in event_dicts]
 
         return event_collection
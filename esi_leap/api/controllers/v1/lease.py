@@ -25,7 +25,7 @@ from esi_leap.api.controllers import types
 from esi_leap.api.controllers.v1 import utils
 from esi_leap.common import constants
 from esi_leap.common import exception
-from esi_leap.common import ironic
+from esi_leap.common import inventory
 from esi_leap.common import keystone
 from esi_leap.common import statuses
 import esi_leap.conf
@@ -74,6 +74,8 @@ class Lease(base.ESILEAPBase):
 
 class LeaseCollection(types.Collection):
     leases = [Lease]
+    resources_synced_at = datetime.datetime
+    next_changes_since = datetime.datetime
 
     def __init__(self, **kwargs):
         self._type = "leases"
@@ -102,6 +104,7 @@ class LeasesController(rest.RestController):
         wtypes.text,
         wtypes.text,
         wtypes.text,
+        datetime.datetime,
     )
     def get_all(
         self,
@@ -115,6 +118,7 @@ class LeasesController(rest.RestController):
         resource_type=None,
         resource_uuid=None,
         resource_class=None,
+        changes_since=None,
     ):
         request = pecan.request.context
         cdict = request.to_policy_values()
@@ -143,10 +147,23 @@ class LeasesController(rest.RestController):
             view=view,
             resource_type=resource_type,
             resource_uuid=resource_uuid,
+            changes_since=changes_since,
         )
 
+        # node attributes are only versioned when read from the inventory
+        if CONF.inventory.enabled and utils.collection_not_modified(
+            (filters, resource_class),
+            lease_obj.Lease.get_version(filters),
+            inventory.get_version(),
+        ):
+            return utils.not_modified()
+
         lease_collection = LeaseCollection()
         leases = lease_obj.Lease.get_all(filters, request)
+        if changes_since is not None:
+            lease_collection.next_changes_since = utils.next_changes_since(
+                leases, changes_since
+            )
 
         lease_collection.leases = []
 
@@ -155,27 +172,43 @@ class LeasesController(rest.RestController):
             node_list = None
 
             with concurrent.futures.ThreadPoolExecutor() as executor:
-                f1 = executor.submit(ironic.get_node_list)
+                f1 = executor.submit(
+                    inventory.get_node_list,
+                    uuids={lease.resource_uuid for lease in leases},
+                )
                 f2 = executor.submit(keystone.get_project_list)
                 node_list = f1.result()
                 project_list = f2.result()
 
+            synced_at = inventory.synced_at(node_list)
+            if synced_at is not None:
+                lease_collection.resources_synced_at = synced_at
+
+            resources = utils.get_resource_objects(leases, node_list)
             leases_with_added_info = [
-                Lease(
-                    **utils.lease_get_dict_with_added_info(
-                        lease, project_list, node_list
-                    )
+                utils.lease_get_dict_with_added_info(
+                    lease, project_list, node_list, resource=resource
                 )
-                for lease in leases
+                for lease, resource in zip(leases, resources)
             ]
             if resource_class:
-                lease_collection.leases = [
+                leases_with_added_info = [
                     lease
                     for lease in leases_with_added_info
-                    if lease.resource_class == resource_class
+                    if lease["resource_class"] == resource_class
                 ]
-            else:
-                lease_collection.leases = leases_with_added_info
+
+            if utils.use_fast_json():
+                return utils.json_response(
+                    LeaseCollection,
+                    lease_collection,
+                    leases=[
+                        types.to_json(Lease, lease) for lease in leases_with_added_info
+                    ],
+                )
+            lease_collection.leases = [
+                Lease(**lease) for lease in leases_with_added_info
+            ]
 
         return lease_collection
 
@@ -262,7 +295,7 @@ class LeasesController(rest.RestController):
             request, "esi_leap:lease:get", lease_id, statuses.LEASE_CAN_DELETE
         )
 
-        lease.cancel(request)
+        lease.cancel(request, deferred=CONF.outbox.enabled)
 
     @staticmethod
     def _lease_get_all_authorize_filters(
@@ -276,9 +309,13 @@ class LeasesController(rest.RestController):
         owner_id=None,
         resource_type=None,
         resource_uuid=None,
+        changes_since=None,
     ):
         if status is not None:
             status = [status] if status != "any" else None
+        elif changes_since is not None:
+            # a client syncing changes also needs the leases that ended
+            status = None
         else:
             status = [
                 statuses.CREATED,
@@ -296,6 +333,7 @@ class LeasesController(rest.RestController):
             "end_time": end_time,
             "resource_type": resource_type,
             "resource_uuid": resource_uuid,
+            "changes_since": changes_since,
             "time_filter_type": constants.WITHIN_TIME_FILTER,
         }
 
@@ -20,6 +20,9 @@ import wsmeext.pecan as wsme_pecan
 
 from esi_leap.api.controllers import base
 from esi_leap.api.controllers import types
+from esi_leap.api.controllers.v1 import utils
+from esi_leap.common import exception
+from esi_leap.common import inventory
 from esi_leap.common import ironic
 from esi_leap.common import keystone
 from esi_leap.common import statuses
@@ -65,6 +68,7 @@ class Node(base.ESILEAPBase):
 
 class NodeCollection(types.Collection):
     nodes = [Node]
+    resources_synced_at = datetime
 
     def __init__(self, **kwargs):
         self._type = "nodes"
@@ -75,6 +79,7 @@ class NodesController(rest.RestController):
     @wsme_pecan.wsexpose(NodeCollection, wtypes.text, wtypes.text, wtypes.text)
     def get_all(self, resource_class=None, owner=None, lessee=None):
         context = pecan.request.context
+        cdict = context.to_policy_values()
 
         if owner is not None:
             owner = keystone.get_project_uuid_from_ident(owner)
@@ -87,23 +92,46 @@ class NodesController(rest.RestController):
             "lessee": lessee,
         }
 
+        if CONF.inventory.enabled:
+            # the inventory is filled with the service credentials, so
+            # show only the nodes Ironic would list for the project
+            try:
+                utils.policy_authorize("esi_leap:offer:offer_admin", cdict, cdict)
+            except exception.HTTPForbidden:
+                filter_args["owner_or_lessee"] = context.project_id
+
+        filter_args = {k: v for k, v in filter_args.items() if v is not None}
+        offer_filters = {"status": [statuses.AVAILABLE]}
+        lease_filters = {"status": [statuses.CREATED]}
+        now = datetime.now()
+
+        # offers become current and stop being current as time passes, so
+        # the ETag also changes at the next start or end of an offer
+        if CONF.inventory.enabled and utils.collection_not_modified(
+            (filter_args, offer_obj.Offer.get_next_change_time(offer_filters, now)),
+            inventory.get_version(**filter_args),
+            offer_obj.Offer.get_version(offer_filters),
+            lease_obj.Lease.get_version(lease_filters),
+        ):
+            return utils.not_modified()
+
         nodes = None
         project_list = None
 
         with concurrent.futures.ThreadPoolExecutor() as executor:
-            filter_args = {k: v for k, v in filter_args.items() if v is not None}
-            f1 = executor.submit(ironic.get_node_list, context, **filter_args)
+            f1 = executor.submit(inventory.get_node_list, context, **filter_args)
             f2 = executor.submit(keystone.get_project_list)
             nodes = f1.result()
             project_list = f2.result()
 
         node_collection = NodeCollection()
+        synced_at = inventory.synced_at(nodes)
+        if synced_at is not None:
+            node_collection.resources_synced_at = synced_at
 
-        now = datetime.now()
-
-        offers = offer_obj.Offer.get_all({"status": [statuses.AVAILABLE]}, context)
+        offers = offer_obj.Offer.get_all(offer_filters, context)
 
-        leases = lease_obj.Lease.get_all({"status": [statuses.CREATED]}, context)
+        leases = lease_obj.Lease.get_all(lease_filters, context)
 
         for node in nodes:
             future_offers = []
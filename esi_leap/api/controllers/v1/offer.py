@@ -25,12 +25,14 @@ from esi_leap.api.controllers import types
 from esi_leap.api.controllers.v1 import lease
 from esi_leap.api.controllers.v1 import utils
 from esi_leap.common import exception
+from esi_leap.common import inventory
 from esi_leap.common import ironic
 from esi_leap.common import keystone
 from esi_leap.common import statuses
 import esi_leap.conf
 from esi_leap.objects import lease as lease_obj
 from esi_leap.objects import offer as offer_obj
+from esi_leap.resource_objects import get_many
 from esi_leap.resource_objects import get_resource_object
 
 CONF = esi_leap.conf.CONF
@@ -73,13 +75,78 @@ class Offer(base.ESILEAPBase):
 
 class OfferCollection(types.Collection):
     offers = [Offer]
+    resources_synced_at = datetime.datetime
+    next_changes_since = datetime.datetime
 
     def __init__(self, **kwargs):
         self._type = "offers"
 
 
+class OfferBulk(base.ESILEAPBase):
+    name = wsme.wsattr(wtypes.text)
+    lessee_id = wsme.wsattr(wtypes.text)
+    resource_type = wsme.wsattr(wtypes.text)
+    resource_uuids = wsme.wsattr([wtypes.text], mandatory=True)
+    start_time = wsme.wsattr(datetime.datetime)
+    end_time = wsme.wsattr(datetime.datetime)
+    properties = {wtypes.text: types.jsontype}
+
+    def __init__(self, **kwargs):
+        self.fields = (
+            "name",
+            "lessee_id",
+            "resource_type",
+            "resource_uuids",
+            "start_time",
+            "end_time",
+            "properties",
+        )
+        for field in self.fields:
+            setattr(self, field, kwargs.get(field, wtypes.Unset))
+
+
+class OfferBulkResult(base.ESILEAPBase):
+    resource_uuid = wsme.wsattr(wtypes.text, readonly=True)
+    offer = wsme.wsattr(Offer, readonly=True)
+    error = wsme.wsattr(wtypes.text, readonly=True)
+
+
+class OfferBulkResultCollection(types.Collection):
+    results = [OfferBulkResult]
+
+    def __init__(self, **kwargs):
+        self._type = "results"
+
+
+class OfferClaimBulk(base.ESILEAPBase):
+    count = wsme.wsattr(wtypes.IntegerType(minimum=1), mandatory=True)
+    resource_type = wsme.wsattr(wtypes.text)
+    resource_class = wsme.wsattr(wtypes.text)
+    resource_properties = {wtypes.text: types.jsontype}
+    start_time = wsme.wsattr(datetime.datetime)
+    end_time = wsme.wsattr(datetime.datetime)
+    name = wsme.wsattr(wtypes.text)
+    purpose = wsme.wsattr(wtypes.text)
+    properties = {wtypes.text: types.jsontype}
+
+    def __init__(self, **kwargs):
+        self.fields = (
+            "count",
+            "resource_type",
+            "resource_class",
+            "resource_properties",
+            "start_time",
+            "end_time",
+            "name",
+            "purpose",
+            "properties",
+        )
+        for field in self.fields:
+            setattr(self, field, kwargs.get(field, wtypes.Unset))
+
+
 class OffersController(rest.RestController):
-    _custom_actions = {"claim": ["POST"]}
+    _custom_actions = {"claim": ["POST"], "bulk": ["POST"], "claim_bulk": ["POST"]}
 
     @wsme_pecan.wsexpose(Offer, wtypes.text)
     def get_one(self, offer_id):
@@ -106,6 +173,7 @@ class OffersController(rest.RestController):
         datetime.datetime,
         datetime.datetime,
         wtypes.text,
+        datetime.datetime,
     )
     def get_all(
         self,
@@ -118,6 +186,7 @@ class OffersController(rest.RestController):
         available_start_time=None,
         available_end_time=None,
         status=None,
+        changes_since=None,
     ):
         request = pecan.request.context
         cdict = request.to_policy_values()
@@ -153,9 +222,10 @@ class OffersController(rest.RestController):
                 a_start=str(available_start_time), a_end=str(available_end_time)
             )
 
-        if status is None:
+        if status is None and changes_since is None:
             status = statuses.OFFER_CAN_DELETE
-        elif status == "any":
+        elif status is None or status == "any":
+            # a client syncing changes also needs the offers that ended
             status = None
         else:
             status = [status]
@@ -176,6 +246,7 @@ class OffersController(rest.RestController):
             "end_time": end_time,
             "available_start_time": available_start_time,
             "available_end_time": available_end_time,
+            "changes_since": changes_since,
         }
 
         # unpack iterator to tuple so we can use 'del'
@@ -183,8 +254,20 @@ class OffersController(rest.RestController):
             if v is None:
                 del filters[k]
 
+        # node attributes are only versioned when read from the inventory
+        if CONF.inventory.enabled and utils.collection_not_modified(
+            (filters, resource_class),
+            offer_obj.Offer.get_version(filters),
+            inventory.get_version(),
+        ):
+            return utils.not_modified()
+
         offer_collection = OfferCollection()
         offers = offer_obj.Offer.get_all(filters, request)
+        if changes_since is not None:
+            offer_collection.next_changes_since = utils.next_changes_since(
+                offers, changes_since
+            )
 
         offer_collection.offers = []
 
@@ -192,25 +275,39 @@ class OffersController(rest.RestController):
             project_list = None
             node_list = None
             with concurrent.futures.ThreadPoolExecutor() as executor:
-                f1 = executor.submit(ironic.get_node_list)
+                f1 = executor.submit(
+                    inventory.get_node_list,
+                    uuids={o.resource_uuid for o in offers},
+                )
                 f2 = executor.submit(keystone.get_project_list)
                 node_list = f1.result()
                 project_list = f2.result()
 
+            synced_at = inventory.synced_at(node_list)
+            if synced_at is not None:
+                offer_collection.resources_synced_at = synced_at
+
+            resources = utils.get_resource_objects(offers, node_list)
             offers_with_added_info = [
-                Offer(
-                    **utils.offer_get_dict_with_added_info(o, project_list, node_list)
+                utils.offer_get_dict_with_added_info(
+                    o, project_list, node_list, resource=resource
                 )
-                for o in offers
+                for o, resource in zip(offers, resources)
             ]
             if resource_class:
-                offer_collection.offers = [
+                offers_with_added_info = [
                     o
                     for o in offers_with_added_info
-                    if o.resource_class == resource_class
+                    if o["resource_class"] == resource_class
                 ]
-            else:
-                offer_collection.offers = offers_with_added_info
+
+            if utils.use_fast_json():
+                return utils.json_response(
+                    OfferCollection,
+                    offer_collection,
+                    offers=[types.to_json(Offer, o) for o in offers_with_added_info],
+                )
+            offer_collection.offers = [Offer(**o) for o in offers_with_added_info]
 
         return offer_collection
 
@@ -265,6 +362,97 @@ class OffersController(rest.RestController):
         o.create()
         return Offer(**utils.offer_get_dict_with_added_info(o))
 
+    @wsme_pecan.wsexpose(OfferBulkResultCollection, body=OfferBulk)
+    def bulk(self, new_offers):
+        request = pecan.request.context
+        cdict = request.to_policy_values()
+        utils.policy_authorize("esi_leap:offer:create", cdict, cdict)
+
+        offer_dict = new_offers.to_dict()
+        resource_idents = offer_dict.pop("resource_uuids")
+        offer_dict["project_id"] = request.project_id
+        if "resource_type" not in offer_dict:
+            offer_dict["resource_type"] = CONF.api.default_resource_type
+
+        if "lessee_id" in offer_dict:
+            offer_dict["lessee_id"] = keystone.get_project_uuid_from_ident(
+                offer_dict["lessee_id"]
+            )
+
+        if "start_time" not in offer_dict:
+            offer_dict["start_time"] = datetime.datetime.now()
+        if "end_time" not in offer_dict:
+            offer_dict["end_time"] = datetime.datetime.max
+
+        if offer_dict["start_time"] >= offer_dict["end_time"]:
+            raise exception.InvalidTimeRange(
+                resource="an offer",
+                start_time=str(offer_dict["start_time"]),
+                end_time=str(offer_dict["end_time"]),
+            )
+
+        # resolve every node with a single listing rather than one
+        # Ironic request per node
+        node_list = None
+        if offer_dict["resource_type"] == "ironic_node":
+            node_list = ironic.get_node_list()
+
+        resources = get_many(offer_dict["resource_type"], resource_idents, node_list)
+
+        results = []
+        pending = []
+        offer_resources = {}
+        for ident in resource_idents:
+            result = OfferBulkResult(resource_uuid=ident)
+            results.append(result)
+            try:
+                resource = resources.get(ident)
+                if resource is None:
+                    raise exception.NodeNotFound(
+                        uuid=ident,
+                        resource_type=offer_dict["resource_type"],
+                        err="Not found",
+                    )
+                if resource.get_uuid() in offer_resources:
+                    raise exception.ResourceTimeConflict(
+                        resource_uuid=resource.get_uuid(),
+                        resource_type=offer_dict["resource_type"],
+                    )
+                utils.check_resource_admin(
+                    cdict, resource, request.project_id, node_list
+                )
+            except exception.ESILeapException as e:
+                result.error = str(e)
+                continue
+
+            offer_resources[resource.get_uuid()] = resource
+            o = offer_obj.Offer(
+                uuid=uuidutils.generate_uuid(),
+                resource_uuid=resource.get_uuid(),
+                **offer_dict,
+            )
+            pending.append((result, o))
+
+        if pending:
+            _, errors = offer_obj.Offer.create_bulk([o for _, o in pending])
+            project_list = keystone.get_project_list()
+            for result, o in pending:
+                if o.resource_uuid in errors:
+                    result.error = str(errors[o.resource_uuid])
+                else:
+                    result.offer = Offer(
+                        **utils.offer_get_dict_with_added_info(
+                            o,
+                            project_list,
+                            node_list,
+                            resource=offer_resources[o.resource_uuid],
+                        )
+                    )
+
+        offer_collection = OfferBulkResultCollection()
+        offer_collection.results = results
+        return offer_collection
+
     @wsme_pecan.wsexpose(Offer, wtypes.text)
     def delete(self, offer_id):
         request = pecan.request.context
@@ -272,7 +460,7 @@ class OffersController(rest.RestController):
         offer = utils.check_offer_policy_and_retrieve(
             request, "esi_leap:offer:delete", offer_id, statuses.OFFER_CAN_DELETE
         )
-        offer.cancel()
+        offer.cancel(deferred=CONF.outbox.enabled)
 
     @wsme_pecan.wsexpose(
         lease.Lease, wtypes.text, body=lease.Lease, status_code=http_client.CREATED
@@ -310,3 +498,100 @@ class OffersController(rest.RestController):
         new_lease = lease_obj.Lease(**lease_dict)
         new_lease.create(request)
         return lease.Lease(**utils.lease_get_dict_with_added_info(new_lease))
+
+    @wsme_pecan.wsexpose(
+        lease.LeaseCollection, body=OfferClaimBulk, status_code=http_client.CREATED
+    )
+    def claim_bulk(self, new_claim):
+        request = pecan.request.context
+        cdict = request.to_policy_values()
+        utils.policy_authorize("esi_leap:offer:claim", cdict, cdict)
+
+        lease_dict = new_claim.to_dict()
+        count = lease_dict.pop("count")
+        resource_type = lease_dict.pop("resource_type", CONF.api.default_resource_type)
+        resource_class = lease_dict.pop("resource_class", None)
+        resource_properties = lease_dict.pop("resource_properties", {})
+
+        if "start_time" not in lease_dict:
+            lease_dict["start_time"] = datetime.datetime.now()
+        if "end_time" not in lease_dict:
+            lease_dict["end_time"] = lease_dict["start_time"] + datetime.timedelta(
+                days=CONF.api.default_lease_time
+            )
+
+        if lease_dict["start_time"] >= lease_dict["end_time"]:
+            raise exception.InvalidTimeRange(
+                resource="a lease",
+                start_time=str(lease_dict["start_time"]),
+                end_time=str(lease_dict["end_time"]),
+            )
+
+        try:
+            utils.policy_authorize("esi_leap:offer:offer_admin", cdict, cdict)
+            lessee_id = None
+        except exception.HTTPForbidden:
+            lessee_id = cdict["project_id"]
+
+        offers = offer_obj.Offer.get_claimable(
+            lease_dict["start_time"],
+            lease_dict["end_time"],
+            resource_type=resource_type,
+            lessee_id=lessee_id,
+        )
+
+        node_list = None
+        if resource_type == "ironic_node":
+            node_list = inventory.get_node_list(uuids={o.resource_uuid for o in offers})
+
+        selected = {}
+        for o, resource in zip(offers, utils.get_resource_objects(offers, node_list)):
+            if len(selected) == count:
+                break
+            if o.resource_uuid in selected:
+                continue
+            if (
+                resource_class is not None
+                and resource.get_resource_class(node_list) != resource_class
+            ):
+                continue
+            if resource_properties:
+                node_properties = resource.get_properties(node_list)
+                if any(
+                    node_properties.get(k) != v for k, v in resource_properties.items()
+                ):
+                    continue
+            selected[o.resource_uuid] = (o, resource)
+
+        if len(selected) < count:
+            raise exception.InsufficientOffers(available=len(selected), count=count)
+
+        leases = [
+            lease_obj.Lease(
+                uuid=uuidutils.generate_uuid(),
+                project_id=request.project_id,
+                offer_uuid=o.uuid,
+                resource_type=o.resource_type,
+                resource_uuid=o.resource_uuid,
+                owner_id=o.project_id,
+                parent_lease_uuid=o.parent_lease_uuid,
+                **lease_dict,
+            )
+            for o, _ in selected.values()
+        ]
+        lease_obj.Lease.create_bulk(leases, request)
+
+        project_list = keystone.get_project_list()
+        lease_collection = lease.LeaseCollection()
+        lease_collection.leases = [
+            lease.Lease(
+                **utils.lease_get_dict_with_added_info(
+                    new_lease,
+                    project_list,
+                    node_list,
+                    resource=selected[new_lease.resource_uuid][1],
+                )
+            )
+            for new_lease in leases
+        ]
+        return lease_collection
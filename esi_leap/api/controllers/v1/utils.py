@@ -11,19 +11,29 @@
 #    under the License.
 
 from oslo_policy import policy as oslo_policy
+from oslo_utils import timeutils
 from oslo_utils import uuidutils
+import pecan
+import wsme
 
 import datetime
+import hashlib
+import http.client as http_client
 
+from esi_leap.api.controllers import types
 from esi_leap.common import exception
 from esi_leap.common import keystone
 from esi_leap.common import policy
+import esi_leap.conf
 from esi_leap.objects import lease as lease_obj
 from esi_leap.objects import offer as offer_obj
+from esi_leap.resource_objects import get_many
 
+CONF = esi_leap.conf.CONF
 
-def check_resource_admin(cdict, resource, project_id):
-    if project_id != resource.get_owner_project_id():
+
+def check_resource_admin(cdict, resource, project_id, resource_list=None):
+    if project_id != resource.get_owner_project_id(resource_list):
         resource_policy_authorize(
             "esi_leap:offer:offer_admin",
             cdict,
@@ -56,6 +66,25 @@ def check_resource_lease_admin(cdict, resource, project_id, start_time, end_time
                     )
 
 
+def get_resource_objects(objs, resource_list=None):
+    """Resolve the resources of a collection of leases or offers.
+
+    The resources are resolved with one get_many call per resource type
+    and returned in the order of objs.
+    """
+    idents = {}
+    for o in objs:
+        idents.setdefault(o.resource_type, set()).add(o.resource_uuid)
+    resources = {
+        resource_type: get_many(resource_type, uuids, resource_list)
+        for resource_type, uuids in idents.items()
+    }
+    return [
+        resources[o.resource_type].get(o.resource_uuid) or o.resource_object()
+        for o in objs
+    ]
+
+
 def get_offer(uuid_or_name, status_filters=[]):
     if uuidutils.is_uuid_like(uuid_or_name):
         o = offer_obj.Offer.get(uuid_or_name)
@@ -154,8 +183,11 @@ def check_offer_lessee(cdict, offer):
         )
 
 
-def offer_get_dict_with_added_info(offer, project_list=None, node_list=None):
-    resource = offer.resource_object()
+def offer_get_dict_with_added_info(
+    offer, project_list=None, node_list=None, resource=None
+):
+    if resource is None:
+        resource = offer.resource_object()
 
     o = offer.to_dict()
     o["availabilities"] = offer.get_availabilities()
@@ -167,8 +199,11 @@ def offer_get_dict_with_added_info(offer, project_list=None, node_list=None):
     return o
 
 
-def lease_get_dict_with_added_info(lease, project_list=None, node_list=None):
-    resource = lease.resource_object()
+def lease_get_dict_with_added_info(
+    lease, project_list=None, node_list=None, resource=None
+):
+    if resource is None:
+        resource = lease.resource_object()
 
     lease_dict = lease.to_dict()
     lease_dict["project"] = keystone.get_project_name(lease.project_id, project_list)
@@ -187,3 +222,73 @@ def check_lease_length(cdict, start_time, end_time, max_time):
             policy_authorize("esi_leap:lease:lease_admin", cdict, cdict)
         except exception.HTTPForbidden:
             raise exception.LeaseExceedMaxTimeRange(max_time=max_time)
+
+
+def collection_not_modified(key, *versions):
+    """Set a weak ETag on a collection and check it against If-None-Match.
+
+    The ETag is a digest of the arguments selecting the collection and
+    the (row count, last change time) versions of the rows it is built
+    from, so it can be checked before the collection is built. Change
+    times are only as fine as the database keeps them, and a second
+    change within the same tick would not show, so no ETag is set until
+    the rows were left unchanged for a second.
+
+    :param key: the filters and other arguments selecting the collection.
+    :param versions: the versions of the rows the collection is built from.
+    :returns: whether the client already has the collection.
+    """
+    changed = [version[1] for version in versions if version[1] is not None]
+    if changed and max(changed) > timeutils.utcnow() - datetime.timedelta(seconds=1):
+        return False
+
+    digest = hashlib.sha256(repr((key, versions)).encode("utf-8")).hexdigest()
+    pecan.response.headers["ETag"] = 'W/"%s"' % digest
+    return digest in pecan.request.if_none_match
+
+
+def not_modified():
+    """Return an empty 304 Not Modified response."""
+    return wsme.api.Response(
+        None, status_code=http_client.NOT_MODIFIED, return_type=None
+    )
+
+
+def next_changes_since(rows, changes_since):
+    """Return the changes_since cursor for the next poll of a collection.
+
+    The cursor is the last change time of the rows listed, as stored in
+    the database, or changes_since itself if no rows were listed. Since
+    changes_since matches rows changed at or after it, rows written
+    within the same tick as the last row listed are returned again by the
+    next poll rather than missed. Clients see such rows twice.
+
+    :param rows: the leases or offers listed.
+    :param changes_since: the changes_since of the listing.
+    """
+    times = [row.updated_at or row.created_at for row in rows]
+    return max(times, default=changes_since)
+
+
+def use_fast_json():
+    """Return whether to encode a collection with types.to_json.
+
+    Only JSON responses are encoded this way; XML is still rendered by
+    WSME.
+    """
+    return (
+        CONF.api.fast_json
+        and pecan.request.pecan.get("content_type") == "application/json"
+    )
+
+
+def json_response(datatype, collection, **overrides):
+    """Return a collection converted by types.to_json as the response.
+
+    WSME passes values of types.jsontype to json.dumps as they are.
+    """
+    return wsme.api.Response(
+        types.to_json(datatype, collection, **overrides),
+        status_code=http_client.OK,
+        return_type=types.jsontype,
+    )
@@ -15,6 +15,7 @@ from oslo_service import service
 from oslo_service import wsgi
 
 from esi_leap.api import app
+from esi_leap.common import profiler
 import esi_leap.conf
 
 
@@ -24,6 +25,7 @@ CONF = esi_leap.conf.CONF
 class WSGIService(service.ServiceBase):
     def __init__(self, name):
         self.name = name
+        profiler.setup("esi-leap-api")
         self.app = app.setup_app()
         self.workers = CONF.api.api_workers or processutils.get_worker_count()
 
@@ -0,0 +1,48 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from __future__ import print_function
+
+import sys
+
+from oslo_config import cfg
+
+from esi_leap.common.i18n import _
+from esi_leap.common import service
+import esi_leap.conf
+from esi_leap.manager import reconcile
+
+
+CONF = esi_leap.conf.CONF
+
+cli_opts = [
+    cfg.BoolOpt(
+        "dry-run",
+        default=False,
+        help=_("Report the nodes that drifted without changing them."),
+    ),
+]
+
+
+def main():
+    CONF.register_cli_opts(cli_opts)
+    service.prepare_service(sys.argv)
+
+    mismatches = reconcile.reconcile(
+        dry_run=CONF.dry_run, limit=CONF.reconcile.batch_size
+    )
+    for mismatch in mismatches:
+        print(
+            "%s %s: found %s, expected %s"
+            % (mismatch.action, mismatch.node_uuid, mismatch.found, mismatch.expected)
+        )
+    print("%d nodes out of sync" % len(mismatches))
@@ -0,0 +1,255 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""In-memory index of the windows in which offered resources are free.
+
+Each resource maps to the sorted, non-overlapping windows of its available
+offers minus the created and active leases on those offers. The index is
+built once from the database and then kept up to date by reloading only
+the resources whose offers or leases changed since the previous refresh.
+"""
+
+import bisect
+import collections
+import datetime
+import threading
+
+from oslo_log import log as logging
+from oslo_utils import timeutils
+
+from esi_leap.common import intervals
+from esi_leap.db import api as dbapi
+import esi_leap.conf
+
+
+CONF = esi_leap.conf.CONF
+LOG = logging.getLogger(__name__)
+
+# a row stamped just before a refresh may only commit after it; look back
+# this far when asking the database for changes
+REFRESH_MARGIN = datetime.timedelta(seconds=10)
+
+Window = collections.namedtuple(
+    "Window",
+    [
+        "start_time",
+        "end_time",
+        "offer_uuid",
+        "project_id",
+        "lessee_id",
+        "resource_type",
+        "resource_uuid",
+    ],
+)
+
+
+def _free_windows(offer, leases):
+    """Split an offer's time range around its leases.
+
+    :param offer: an offer row.
+    :param leases: the offer's leases, ordered by start time.
+    :returns: the windows of the offer not covered by any lease.
+    """
+
+    free = intervals.subtract(
+        offer.start_time,
+        offer.end_time,
+        [(lease.start_time, lease.end_time) for lease in leases],
+    )
+    return [
+        Window(
+            start,
+            end,
+            offer.uuid,
+            offer.project_id,
+            offer.lessee_id,
+            offer.resource_type,
+            offer.resource_uuid,
+        )
+        for start, end in free
+    ]
+
+
+class _WindowTree(object):
+    """The windows of one resource type, for finding those covering a range.
+
+    The windows are sorted by start time, and a segment tree over them holds
+    the latest end time in each subtree. The windows starting before a range
+    are a prefix of the list, and only the subtrees of that prefix ending
+    after the range are descended into, so a query visits O(log n) nodes
+    per window found rather than every window.
+    """
+
+    def __init__(self, windows):
+        self.windows = sorted(windows, key=lambda w: w.start_time)
+        self.starts = [w.start_time for w in self.windows]
+        self._size = 1
+        while self._size < len(self.windows):
+            self._size *= 2
+        self._max_end = [datetime.datetime.min] * (2 * self._size)
+        for i, w in enumerate(self.windows):
+            self._max_end[self._size + i] = w.end_time
+        for node in range(self._size - 1, 0, -1):
+            self._max_end[node] = max(
+                self._max_end[2 * node], self._max_end[2 * node + 1]
+            )
+
+    def covering(self, start_time, end_time):
+        """Return the windows covering the range [start_time, end_time)."""
+        count = bisect.bisect_right(self.starts, start_time)
+        found = []
+        stack = [(1, 0, self._size)]
+        while stack:
+            node, lo, hi = stack.pop()
+            if lo >= count or self._max_end[node] < end_time:
+                continue
+            if hi - lo == 1:
+                found.append(self.windows[lo])
+                continue
+            mid = (lo + hi) // 2
+            stack.append((2 * node + 1, mid, hi))
+            stack.append((2 * node, lo, mid))
+        return found
+
+
+class CapacityIndex(object):
+    def __init__(self):
+        self._lock = threading.Lock()
+        # resource_type -> resource_uuid -> windows
+        self._resources = {}
+        # resource_type -> _WindowTree, built on the first search after
+        # the windows of the type change
+        self._trees = {}
+        self._refreshed_at = None
+        self._rebuilt_at = None
+
+    def refresh(self):
+        """Bring the index up to date with the database."""
+        with self._lock:
+            now = timeutils.utcnow()
+            rebuild_interval = datetime.timedelta(
+                seconds=CONF.api.capacity_rebuild_interval
+            )
+            if self._rebuilt_at is None or now - self._rebuilt_at >= rebuild_interval:
+                LOG.debug("Rebuilding capacity index")
+                offers, leases = dbapi.resource_get_capacity()
+                self._resources = {}
+                self._trees = {}
+                self._rebuilt_at = now
+            else:
+                changed = dbapi.resource_get_changed(
+                    self._refreshed_at - REFRESH_MARGIN
+                )
+                if not changed:
+                    self._refreshed_at = now
+                    return
+                offers, leases = dbapi.resource_get_capacity(changed)
+                for resource_type, resource_uuid in changed:
+                    self._resources.get(resource_type, {}).pop(resource_uuid, None)
+                    self._trees.pop(resource_type, None)
+
+            self._refreshed_at = now
+            self._load(offers, leases)
+
+    def _load(self, offers, leases):
+        offer_leases = collections.defaultdict(list)
+        for lease in leases:
+            offer_leases[lease.offer_uuid].append(lease)
+
+        resource_windows = collections.defaultdict(list)
+        for offer in offers:
+            if offer.start_time is None or offer.end_time is None:
+                continue
+            resource_windows[(offer.resource_type, offer.resource_uuid)].extend(
+                _free_windows(offer, offer_leases[offer.uuid])
+            )
+
+        for (resource_type, resource_uuid), windows in resource_windows.items():
+            windows.sort(key=lambda w: w.start_time)
+            self._trees.pop(resource_type, None)
+            self._resources.setdefault(resource_type, {})[resource_uuid] = windows
+
+    def get_free(self, resource_type, start_time, end_time, predicate=None):
+        """Find the resources that are free for a whole time range.
+
+        :param resource_type: type of the resources to search.
+        :param start_time: start of the range.
+        :param end_time: end of the range.
+        :param predicate: optional callable taking a Window and returning
+            whether it may be used.
+        :returns: for each free resource, the window that contains the range,
+            ordered by resource uuid.
+        """
+        with self._lock:
+            tree = self._trees.get(resource_type)
+            if tree is None:
+                tree = _WindowTree(
+                    w
+                    for windows in self._resources.get(resource_type, {}).values()
+                    for w in windows
+                )
+                self._trees[resource_type] = tree
+        found = [
+            w
+            for w in tree.covering(start_time, end_time)
+            if predicate is None or predicate(w)
+        ]
+        return sorted(found, key=lambda w: w.resource_uuid)
+
+    def get_earliest(self, resource_type, duration, count, after, predicate=None):
+        """Find the earliest time at which several resources are free.
+
+        :param resource_type: type of the resources to search.
+        :param duration: a timedelta the resources must be free for.
+        :param count: the number of resources needed.
+        :param after: the earliest acceptable start time.
+        :param predicate: optional callable taking a Window and returning
+            whether it may be used.
+        :returns: a tuple of the start time and the windows of the first
+            'count' resources free from then for 'duration', ordered by
+            resource uuid; or (None, []) if there is no such time.
+        """
+        # every window long enough yields a range of feasible start times;
+        # sweep over the range boundaries until enough ranges overlap
+        events = []
+        with self._lock:
+            for windows in self._resources.get(resource_type, {}).values():
+                for w in windows:
+                    first = max(w.start_time, after)
+                    last = w.end_time - duration
+                    if first > last:
+                        continue
+                    if predicate is None or predicate(w):
+                        events.append((first, 0, w))
+                        events.append((last, 1, w))
+
+        events.sort(key=lambda e: (e[0], e[1]))
+        active = set()
+        for time, kind, w in events:
+            if kind == 1:
+                active.discard(w)
+                continue
+            active.add(w)
+            if len(active) >= count:
+                windows = sorted(active, key=lambda w: w.resource_uuid)
+                return time, windows[:count]
+        return None, []
+
+
+_index = None
+
+
+def get_index():
+    global _index
+    if _index is None:
+        _index = CapacityIndex()
+    return _index
@@ -109,6 +109,11 @@ class OfferNoTimeAvailabilities(ESILeapException):
     )
 
 
+class InsufficientOffers(ESILeapException):
+    code = http_client.CONFLICT
+    msg_fmt = _("Only %(available)d of %(count)d requested offers are available.")
+
+
 class OfferNotAvailable(ESILeapException):
     msg_fmt = _(
         "Offer %(offer_uuid)s does not have status "
@@ -173,6 +178,11 @@ class InvalidTimeRange(ESILeapException):
     )
 
 
+class InvalidLimit(ESILeapException):
+    code = http_client.BAD_REQUEST
+    msg_fmt = _("Limit must be a positive integer. Got %(limit)s.")
+
+
 class NodeNotFound(ESILeapException):
     code = http_client.NOT_FOUND
     msg_fmt = _(
@@ -181,6 +191,13 @@ class NodeNotFound(ESILeapException):
     )
 
 
+class QueryBudgetExceeded(ESILeapException):
+    msg_fmt = _(
+        "%(route)s issued %(count)s database queries, more than the "
+        "budget of %(budget)s."
+    )
+
+
 class NotificationPayloadError(ESILeapException):
     _msg_fmt = _(
         "Payload not populated when trying to send notification " '"%(class_name)s"'
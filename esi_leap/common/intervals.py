@@ -0,0 +1,105 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Operations on half-open time intervals.
+
+An interval is a (start, end) pair with start < end. Every function takes
+intervals sorted by start time and makes a single pass over them; empty
+intervals are never returned.
+"""
+
+
+def merge(intervals):
+    """Merge overlapping or touching intervals.
+
+    :param intervals: intervals sorted by start time.
+    :returns: a list of disjoint, non-touching intervals.
+    """
+    merged = []
+    for start, end in intervals:
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract(start, end, intervals):
+    """Remove intervals from the range [start, end).
+
+    :param start: start of the range.
+    :param end: end of the range.
+    :param intervals: intervals to remove, sorted by start time. They may
+        overlap each other.
+    :returns: the parts of the range not covered by any interval.
+    """
+    remaining = []
+    cursor = start
+    for i_start, i_end in intervals:
+        if cursor >= end or i_start >= end:
+            break
+        if i_end <= cursor:
+            continue
+        if i_start > cursor:
+            remaining.append((cursor, i_start))
+        cursor = i_end
+    if cursor < end:
+        remaining.append((cursor, end))
+    return remaining
+
+
+def intersect(a, b):
+    """Intersect two lists of disjoint intervals.
+
+    :param a: disjoint intervals sorted by start time.
+    :param b: disjoint intervals sorted by start time.
+    :returns: the intervals covered by both a and b.
+    """
+    common = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        start = max(a[i][0], b[j][0])
+        end = min(a[i][1], b[j][1])
+        if start < end:
+            common.append((start, end))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return common
+
+
+def gaps(intervals):
+    """Find the gaps between intervals.
+
+    :param intervals: intervals sorted by start time.
+    :returns: the intervals between the first start and the last end that
+        are not covered by any interval.
+    """
+    merged = merge(intervals)
+    return [(merged[i][1], merged[i + 1][0]) for i in range(len(merged) - 1)]
+
+
+def overlaps(start, end, intervals):
+    """Check whether any interval overlaps the range [start, end).
+
+    :param start: start of the range.
+    :param end: end of the range.
+    :param intervals: intervals sorted by start time.
+    """
+    for i_start, i_end in intervals:
+        if i_start >= end:
+            return False
+        if i_end > start:
+            return True
+    return False
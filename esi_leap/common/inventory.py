@@ -0,0 +1,113 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Local mirror of the Ironic node attributes read by the API.
+
+The manager refreshes the mirror from a full node listing every
+[inventory] sync_interval seconds; with [inventory] enabled the API reads
+node attributes from it instead of listing the nodes in Ironic.
+"""
+
+from oslo_log import log as logging
+from oslo_utils import timeutils
+
+from esi_leap.common import ironic
+import esi_leap.conf
+from esi_leap.db import api as dbapi
+
+
+CONF = esi_leap.conf.CONF
+LOG = logging.getLogger(__name__)
+
+
+class InventoryNode(object):
+    """A mirrored node, with the attributes of an Ironic node."""
+
+    def __init__(self, row):
+        self.uuid = row.uuid
+        self.name = row.name
+        self.resource_class = row.resource_class
+        self.owner = row.owner
+        self.lessee = row.lessee
+        self.provision_state = row.provision_state
+        self.maintenance = row.maintenance
+        self.properties = dict(row.properties or {})
+        if row.lease_uuid is not None:
+            self.properties["lease_uuid"] = row.lease_uuid
+
+
+def get_node_list(context=None, uuids=None, **filter_args):
+    """List the nodes, from the inventory when it is enabled.
+
+    :param context: request context to list the nodes in Ironic with.
+    :param uuids: only return the nodes with these uuids. Only applied
+        to the inventory.
+    :param filter_args: node attributes to match. With the inventory,
+        owner_or_lessee returns only the nodes owned or leased by one
+        project.
+    """
+    if not CONF.inventory.enabled:
+        return ironic.get_node_list(context, **filter_args)
+
+    if uuids is not None:
+        filter_args["uuids"] = list(uuids)
+    return [InventoryNode(row) for row in dbapi.resource_inventory_get_all(filter_args)]
+
+
+def get_version(**filter_args):
+    """Return the row count and last change time of the mirrored nodes.
+
+    :param filter_args: as for get_node_list.
+    """
+    uuids = filter_args.pop("uuids", None)
+    if uuids is not None:
+        filter_args["uuids"] = list(uuids)
+    return dbapi.resource_inventory_get_version(filter_args)
+
+
+def synced_at(nodes):
+    """Return when the inventory the nodes were read from was last synced.
+
+    Returns None unless the nodes were read from the inventory.
+    """
+    if not any(isinstance(node, InventoryNode) for node in nodes):
+        return None
+    return dbapi.resource_inventory_get_synced_at()
+
+
+def _node_values(node):
+    properties = node.properties or {}
+    return {
+        "uuid": node.uuid,
+        "name": node.name,
+        "resource_class": node.resource_class,
+        "owner": node.owner,
+        "lessee": node.lessee,
+        "provision_state": node.provision_state,
+        "maintenance": bool(node.maintenance),
+        "properties": ironic.get_condensed_properties(properties),
+        "lease_uuid": properties.get("lease_uuid"),
+    }
+
+
+def sync():
+    """Refresh the inventory from a full listing of the Ironic nodes."""
+    now = timeutils.utcnow()
+    nodes = ironic.get_node_list()
+    added, updated, deleted = dbapi.resource_inventory_sync(
+        [_node_values(node) for node in nodes], now
+    )
+    LOG.info(
+        "Synced resource inventory: %(added)d added, %(updated)d updated, "
+        "%(deleted)d deleted",
+        {"added": added, "updated": updated, "deleted": deleted},
+    )
@@ -16,12 +16,28 @@ from keystoneauth1 import token_endpoint
 
 from ironicclient import client as ironic_client
 
+from esi_leap.common import metrics
 import esi_leap.conf
 
 
 CONF = esi_leap.conf.CONF
 _cached_ironic_client = None
 
+# the node attributes esi-leap reads; nodes are requested with only these
+# fields rather than in full, which includes large blobs such as
+# driver_info, instance_info and extra
+NODE_FIELDS = (
+    "uuid",
+    "name",
+    "resource_class",
+    "properties",
+    "owner",
+    "lessee",
+    "provision_state",
+    "power_state",
+    "maintenance",
+)
+
 
 def get_ironic_client(context=None):
     session = ks_loading.load_session_from_conf_options(CONF, "ironic")
@@ -46,14 +62,17 @@ def get_ironic_client(context=None):
     return cli
 
 
-def get_node_list(context=None, **filter_args):
+def get_node_list(context=None, fields=NODE_FIELDS, **filter_args):
     client = get_ironic_client(context)
-    return client.node.list(detail=True, **filter_args)
+    with metrics.external_call("ironic", "node.list"):
+        return client.node.list(fields=list(fields), **filter_args)
 
 
-def get_node(node_uuid, node_list=None):
+def get_node(node_uuid, node_list=None, fields=NODE_FIELDS):
     if node_list is None:
-        node = get_ironic_client().node.get(node_uuid)
+        client = get_ironic_client()
+        with metrics.external_call("ironic", "node.get"):
+            node = client.node.get(node_uuid, fields=list(fields))
     else:
         node = next((n for n in node_list if n.uuid == node_uuid), None)
     return node
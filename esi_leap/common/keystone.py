@@ -15,6 +15,7 @@ from keystoneclient import client as keystone_client
 from oslo_utils import uuidutils
 
 from esi_leap.common import exception
+from esi_leap.common import metrics
 import esi_leap.conf
 
 
@@ -38,10 +39,12 @@ def get_keystone_client():
 
 def get_parent_project_id_tree(project_id):
     ks_client = get_keystone_client()
-    project = ks_client.projects.get(project_id)
+    with metrics.external_call("keystone", "projects.get"):
+        project = ks_client.projects.get(project_id)
     project_ids = [project.id]
     while project.parent_id is not None:
-        project = ks_client.projects.get(project.parent_id)
+        with metrics.external_call("keystone", "projects.get"):
+            project = ks_client.projects.get(project.parent_id)
         project_ids.append(project.id)
     return project_ids
 
@@ -50,7 +53,9 @@ def get_project_uuid_from_ident(project_ident):
     if uuidutils.is_uuid_like(project_ident):
         return project_ident
     else:
-        projects = get_keystone_client().projects.list(name=project_ident)
+        ks_client = get_keystone_client()
+        with metrics.external_call("keystone", "projects.list"):
+            projects = ks_client.projects.list(name=project_ident)
         if len(projects) > 0:
             # projects have unique names
             return projects[0].id
@@ -58,13 +63,17 @@ def get_project_uuid_from_ident(project_ident):
 
 
 def get_project_list():
-    return get_keystone_client().projects.list()
+    ks_client = get_keystone_client()
+    with metrics.external_call("keystone", "projects.list"):
+        return ks_client.projects.list()
 
 
 def get_project_name(project_id, project_list=None):
     if project_id:
         if project_list is None:
-            project = get_keystone_client().projects.get(project_id)
+            ks_client = get_keystone_client()
+            with metrics.external_call("keystone", "projects.get"):
+                project = ks_client.projects.get(project_id)
         else:
             project = next(
                 (p for p in project_list if getattr(p, "id") == project_id), None
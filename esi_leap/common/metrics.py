@@ -0,0 +1,192 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Prometheus metrics for the API and manager services."""
+
+import contextlib
+import functools
+import time
+
+from oslo_log import log as logging
+from osprofiler import profiler
+import prometheus_client
+
+from esi_leap.common import query_stats
+from esi_leap.common import retry
+import esi_leap.conf
+
+
+CONF = esi_leap.conf.CONF
+LOG = logging.getLogger(__name__)
+
+REGISTRY = prometheus_client.CollectorRegistry()
+
+API_REQUEST_DURATION = prometheus_client.Histogram(
+    "esi_leap_api_request_duration_seconds",
+    "Time spent handling API requests.",
+    ["method", "route", "status"],
+    registry=REGISTRY,
+)
+EXTERNAL_CALL_DURATION = prometheus_client.Histogram(
+    "esi_leap_external_call_duration_seconds",
+    "Time spent in calls to other services.",
+    ["service", "call", "outcome"],
+    registry=REGISTRY,
+)
+DB_QUERY_DURATION = prometheus_client.Histogram(
+    "esi_leap_db_query_duration_seconds",
+    "Time spent executing database statements.",
+    ["operation"],
+    registry=REGISTRY,
+)
+MANAGER_JOB_DURATION = prometheus_client.Gauge(
+    "esi_leap_manager_job_duration_seconds",
+    "Duration of the last run of a manager periodic job.",
+    ["job"],
+    registry=REGISTRY,
+)
+MANAGER_JOB_BACKLOG = prometheus_client.Gauge(
+    "esi_leap_manager_job_backlog",
+    "Number of items found by the last run of a manager periodic job.",
+    ["job"],
+    registry=REGISTRY,
+)
+RETRY_QUEUE_DEPTH = prometheus_client.Gauge(
+    "esi_leap_retry_queue_depth",
+    "Number of leases waiting for a transition to be retried.",
+    ["status"],
+    registry=REGISTRY,
+)
+CIRCUIT_BREAKER_OPEN = prometheus_client.Gauge(
+    "esi_leap_circuit_breaker_open",
+    "Whether lease transitions against a backend are paused.",
+    ["backend"],
+    registry=REGISTRY,
+)
+
+API_RESPONSE_COMPRESSION_RATIO = prometheus_client.Histogram(
+    "esi_leap_api_response_compression_ratio",
+    "Size of compressed API responses relative to their original size.",
+    ["encoding"],
+    buckets=(0.05, 0.1, 0.15, 0.2, 0.3, 0.4, 0.5, 0.75, 1.0),
+    registry=REGISTRY,
+)
+API_RESPONSE_COMPRESSION_CPU = prometheus_client.Histogram(
+    "esi_leap_api_response_compression_cpu_seconds",
+    "CPU time spent compressing API responses.",
+    ["encoding"],
+    registry=REGISTRY,
+)
+
+START_KEY = "esi_leap.metrics.start"
+
+
+def _is_backend_failure(error):
+    # client errors such as a missing node or project are answered by a
+    # healthy backend; connection errors and timeouts carry no status
+    status = getattr(error, "http_status", None)
+    return not status or status >= 500
+
+
+@contextlib.contextmanager
+def external_call(service, call):
+    """Time a call to another service and trace it as a profiler span.
+
+    Only connection errors, timeouts and server errors count against the
+    circuit breaker of the service.
+
+    :param service: name of the service, e.g. 'ironic'.
+    :param call: name of the remote operation, e.g. 'node.list'.
+    """
+    start = time.monotonic()
+    outcome = "success"
+    healthy = True
+    try:
+        with profiler.Trace(service, info={"call": call}):
+            yield
+    except Exception as e:
+        outcome = "error"
+        healthy = not _is_backend_failure(e)
+        raise
+    finally:
+        EXTERNAL_CALL_DURATION.labels(service, call, outcome).observe(
+            time.monotonic() - start
+        )
+        retry.get_breaker(service).record(healthy)
+
+
+def timed_job(job):
+    """Decorate a manager periodic job to record its duration."""
+
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            with MANAGER_JOB_DURATION.labels(job).time():
+                return f(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def set_backlog(job, count):
+    MANAGER_JOB_BACKLOG.labels(job).set(count)
+
+
+def set_retry_queue_depth(status, count):
+    RETRY_QUEUE_DEPTH.labels(status).set(count)
+
+
+def set_breaker_open(backend, is_open):
+    CIRCUIT_BREAKER_OPEN.labels(backend).set(1 if is_open else 0)
+
+
+def observe_compression(encoding, original, compressed, cpu_time):
+    if original:
+        API_RESPONSE_COMPRESSION_RATIO.labels(encoding).observe(
+            compressed / float(original)
+        )
+    API_RESPONSE_COMPRESSION_CPU.labels(encoding).observe(cpu_time)
+
+
+class MetricsMiddleware(object):
+    """Serve /metrics ahead of the rest of the WSGI pipeline."""
+
+    def __init__(self, app):
+        self.app = app
+        self.metrics_app = prometheus_client.make_wsgi_app(REGISTRY)
+
+    def __call__(self, environ, start_response):
+        if environ.get("PATH_INFO") == "/metrics":
+            return self.metrics_app(environ, start_response)
+        return self.app(environ, start_response)
+
+
+def _observe_query(statement, duration):
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement else ""
+    DB_QUERY_DURATION.labels(operation).observe(duration)
+
+
+def instrument_db():
+    """Time every statement run by any SQLAlchemy engine."""
+    query_stats.instrument()
+    query_stats.add_observer(_observe_query)
+
+
+def start_http_server():
+    """Serve metrics from a background listener, e.g. in the manager."""
+    LOG.info(
+        "Serving metrics on %s:%s", CONF.metrics.manager_host, CONF.metrics.manager_port
+    )
+    prometheus_client.start_http_server(
+        CONF.metrics.manager_port, addr=CONF.metrics.manager_host, registry=REGISTRY
+    )
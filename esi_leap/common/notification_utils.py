@@ -17,6 +17,7 @@ from oslo_log import log
 from oslo_messaging import exceptions as oslo_msg_exc
 from oslo_utils import excutils
 from oslo_versionedobjects import exception as oslo_vo_exc
+from osprofiler import profiler
 
 from esi_leap.common import exception
 from esi_leap.common.i18n import _
@@ -27,6 +28,7 @@ LOG = log.getLogger(__name__)
 CONF = cfg.CONF
 
 
+@profiler.trace("notification", hide_args=True)
 def _emit_notification(context, obj, action, level, status, crud_notify_obj, **kwargs):
     """Helper for emitting notifications.
 
@@ -120,7 +120,7 @@ offer_policies = [
         "esi_leap:offer:get_all",
         "rule:is_admin or rule:is_owner or rule:is_lessee",
         "Retrieve multiple offers",
-        [{"path": "/offers", "method": "GET"}],
+        [{"path": "/offers", "method": "GET"}, {"path": "/capacity", "method": "GET"}],
     ),
     policy.DocumentedRuleDefault(
         "esi_leap:offer:delete",
@@ -132,7 +132,10 @@ offer_policies = [
         "esi_leap:offer:claim",
         "rule:is_admin or rule:is_owner or rule:is_lessee",
         "Claim an offer",
-        [{"path": "/offers/{offer_ident}/claim", "method": "POST"}],
+        [
+            {"path": "/offers/{offer_ident}/claim", "method": "POST"},
+            {"path": "/offers/claim_bulk", "method": "POST"},
+        ],
     ),
 ]
 
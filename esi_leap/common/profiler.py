@@ -0,0 +1,126 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""osprofiler integration for the API and manager services."""
+
+import threading
+from urllib import parse as urlparse
+
+from oslo_log import log as logging
+from oslo_serialization import jsonutils
+from osprofiler.drivers import base as driver_base
+from osprofiler import initializer
+from osprofiler import profiler
+
+import esi_leap.conf
+
+
+CONF = esi_leap.conf.CONF
+LOG = logging.getLogger(__name__)
+
+
+class FileDriver(driver_base.Driver):
+    """Store trace points in a local file, one JSON object per line.
+
+    Selected with [profiler] connection_string = file:///path/to/traces.
+    Meant for local use; production deployments should use one of the
+    osprofiler backends such as redis or jaeger.
+    """
+
+    def __init__(self, connection_str, project=None, service=None, host=None, **kwargs):
+        super(FileDriver, self).__init__(
+            connection_str, project=project, service=service, host=host, **kwargs
+        )
+        self.path = urlparse.urlparse(connection_str).path
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_name(cls):
+        return "file"
+
+    def notify(self, info, **kwargs):
+        data = info.copy()
+        data["project"] = self.project
+        data["service"] = self.service
+        line = jsonutils.dumps(data) + "\n"
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(line)
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    yield jsonutils.loads(line)
+        except FileNotFoundError:
+            return
+
+    def list_traces(self, fields=None):
+        fields = set(fields or self.default_trace_fields)
+        traces = {}
+        for n in self._read():
+            if n["base_id"] not in traces:
+                traces[n["base_id"]] = {k: n[k] for k in fields if k in n}
+        return list(traces.values())
+
+    def get_report(self, base_id):
+        for n in self._read():
+            if n["base_id"] != base_id:
+                continue
+            self._append_results(
+                n["trace_id"],
+                n["parent_id"],
+                n["name"],
+                n["project"],
+                n["service"],
+                n["info"]["host"],
+                n["timestamp"],
+                n,
+            )
+        return self._parse_results()
+
+
+class TracedBackend(object):
+    """Proxy a DB API backend module, tracing each public function."""
+
+    def __init__(self, backend, name):
+        self._backend = backend
+        self._name = name
+        # function name -> (function, traced wrapper)
+        self._traced = {}
+
+    def __getattr__(self, key):
+        attr = getattr(self._backend, key)
+        if key.startswith("_") or not callable(attr) or isinstance(attr, type):
+            return attr
+        cached = self._traced.get(key)
+        if cached is None or cached[0] is not attr:
+            wrapper = profiler.trace(self._name, info={"db_api": key}, hide_args=True)
+            cached = self._traced[key] = (attr, wrapper(attr))
+        return cached[1]
+
+
+def setup(name):
+    """Start sending trace points for this service if profiling is on.
+
+    :param name: name of the service, e.g. 'esi-leap-api'.
+    """
+    if not CONF.profiler.enabled:
+        return
+    initializer.init_from_conf(
+        conf=CONF,
+        context={},
+        project="esi-leap",
+        service=name,
+        host=CONF.host,
+    )
+    LOG.info("osprofiler is enabled for %s", name)
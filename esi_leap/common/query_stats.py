@@ -0,0 +1,119 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Per-request database query counting, slow query log and query budget.
+
+The statement listeners here are the only ones registered on the engines;
+other consumers of statement durations, such as the metrics, register an
+observer instead.
+"""
+
+import threading
+import time
+
+from oslo_log import log as logging
+import sqlalchemy as sa
+
+from esi_leap.common import exception
+import esi_leap.conf
+
+
+CONF = esi_leap.conf.CONF
+LOG = logging.getLogger(__name__)
+
+START_KEY = "esi_leap.query_stats.start"
+
+_LOCAL = threading.local()
+_INSTRUMENTED = False
+_OBSERVERS = []
+
+
+class RequestStats(object):
+    """Statements issued while handling a single request."""
+
+    def __init__(self, route):
+        self.route = route
+        self.count = 0
+        self.duration = 0.0
+
+    @property
+    def over_budget(self):
+        budget = CONF.query_stats.request_query_budget
+        return bool(budget) and self.count > budget
+
+
+def start(route):
+    """Start counting the statements issued by the current request."""
+    _LOCAL.stats = RequestStats(route)
+    return _LOCAL.stats
+
+
+def stop():
+    """Stop counting and return the stats of the current request, if any."""
+    stats = getattr(_LOCAL, "stats", None)
+    _LOCAL.stats = None
+    return stats
+
+
+def current():
+    return getattr(_LOCAL, "stats", None)
+
+
+def add_observer(observer):
+    """Call observer(statement, duration) after every statement."""
+    if observer not in _OBSERVERS:
+        _OBSERVERS.append(observer)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    stats = current()
+    if stats is not None:
+        stats.count += 1
+        if stats.over_budget and CONF.query_stats.enforce_query_budget:
+            raise exception.QueryBudgetExceeded(
+                route=stats.route,
+                count=stats.count,
+                budget=CONF.query_stats.request_query_budget,
+            )
+    conn.info.setdefault(START_KEY, []).append(time.monotonic())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    starts = conn.info.get(START_KEY)
+    if not starts:
+        return
+    duration = time.monotonic() - starts.pop()
+    stats = current()
+    if stats is not None:
+        stats.duration += duration
+    threshold = CONF.query_stats.slow_query_threshold
+    if threshold and duration >= threshold:
+        LOG.warning(
+            "Slow query (%(duration).3fs) in %(route)s: %(statement)s",
+            {
+                "duration": duration,
+                "route": stats.route if stats is not None else "-",
+                "statement": statement,
+            },
+        )
+    for observer in _OBSERVERS:
+        observer(statement, duration)
+
+
+def instrument():
+    """Count and time every statement run by any SQLAlchemy engine."""
+    global _INSTRUMENTED
+    if _INSTRUMENTED:
+        return
+    sa.event.listen(sa.engine.Engine, "before_cursor_execute", _before_cursor_execute)
+    sa.event.listen(sa.engine.Engine, "after_cursor_execute", _after_cursor_execute)
+    _INSTRUMENTED = True
@@ -0,0 +1,108 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Backoff for failed lease transitions and circuit breakers for backends."""
+
+import collections
+import datetime
+import random
+import threading
+import time
+
+from oslo_log import log as logging
+from oslo_utils import timeutils
+
+import esi_leap.conf
+
+
+CONF = esi_leap.conf.CONF
+LOG = logging.getLogger(__name__)
+
+_BREAKERS = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def backoff_delay(attempts):
+    """Return the seconds to wait after a number of failed attempts.
+
+    The delay doubles with every attempt up to [retry]max_delay, and a
+    random half of it is dropped so that leases which failed together
+    are not all retried together.
+    """
+    delay = min(CONF.retry.max_delay, CONF.retry.base_delay * 2 ** max(0, attempts - 1))
+    return random.uniform(delay / 2.0, delay)
+
+
+def next_retry_time(attempts):
+    """Return when to try again after a number of failed attempts."""
+    return timeutils.utcnow() + datetime.timedelta(seconds=backoff_delay(attempts))
+
+
+class CircuitBreaker(object):
+    """Tracks the outcome of recent calls to a backend.
+
+    The breaker opens when at least [retry]breaker_error_rate of the calls
+    made in the last [retry]breaker_window seconds failed, once there were
+    at least [retry]breaker_min_calls of them. It closes again after
+    [retry]breaker_cooldown seconds, starting from an empty window.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = collections.deque()
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    def record(self, success):
+        now = time.monotonic()
+        with self._lock:
+            self._calls.append((now, success))
+            while self._calls[0][0] <= now - CONF.retry.breaker_window:
+                self._calls.popleft()
+            if self._opened_at is None and self._tripped():
+                LOG.warning("Opening circuit breaker for %s", self.name)
+                self._opened_at = now
+
+    def _tripped(self):
+        if len(self._calls) < CONF.retry.breaker_min_calls:
+            return False
+        errors = sum(1 for _, success in self._calls if not success)
+        return errors >= CONF.retry.breaker_error_rate * len(self._calls)
+
+    @property
+    def is_open(self):
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            if time.monotonic() - self._opened_at < CONF.retry.breaker_cooldown:
+                return True
+            LOG.info("Closing circuit breaker for %s", self.name)
+            self._opened_at = None
+            self._calls.clear()
+            return False
+
+
+def get_breaker(name):
+    with _BREAKERS_LOCK:
+        if name not in _BREAKERS:
+            _BREAKERS[name] = CircuitBreaker(name)
+        return _BREAKERS[name]
+
+
+def get_breakers():
+    with _BREAKERS_LOCK:
+        return list(_BREAKERS.values())
+
+
+def is_open(backend):
+    """Return whether calls to a backend are paused; None is never paused."""
+    return backend is not None and get_breaker(backend).is_open
@@ -22,3 +22,4 @@ WAIT_FULFILL = "wait fulfill"
 
 OFFER_CAN_DELETE = [AVAILABLE, ERROR]
 LEASE_CAN_DELETE = [ACTIVE, CREATED, ERROR, WAIT_FULFILL]
+LEASE_WAIT = [WAIT_CANCEL, WAIT_EXPIRE, WAIT_FULFILL]
@@ -10,10 +10,27 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import contextlib
+
 from oslo_concurrency import lockutils
 
+from esi_leap.db import api as dbapi
+from esi_leap.objects import base as objects_base
+
 _prefix = "esileap"
-lock = lockutils.lock_with_prefix(_prefix)
+_lock = lockutils.lock_with_prefix(_prefix)
+
+
+@contextlib.contextmanager
+def lock(name, external=False):
+    """Take a resource lock, reading from the primary database while held.
+
+    Availability and status checks made under the lock must not see a
+    lagging replica, nor objects cached before the lock was taken.
+    """
+    with _lock(name, external=external), dbapi.primary_reads():
+        objects_base.clear_read_cache()
+        yield
 
 
 def get_resource_lock_name(resource_type, resource_uuid):
@@ -12,22 +12,38 @@
 
 
 from esi_leap.conf import api
+from esi_leap.conf import compression
 from esi_leap.conf import dummy_node
+from esi_leap.conf import inventory
 from esi_leap.conf import ironic
 from esi_leap.conf import keystone
+from esi_leap.conf import metrics
 from esi_leap.conf import netconf
 from esi_leap.conf import notification
+from esi_leap.conf import outbox
 from esi_leap.conf import pecan
+from esi_leap.conf import query_stats
+from esi_leap.conf import reconcile
+from esi_leap.conf import retry
 from oslo_config import cfg
+from osprofiler import opts as profiler_opts
 
 CONF = cfg.CONF
 
 
 CONF.register_group(cfg.OptGroup(name="database"))
 api.register_opts(CONF)
+compression.register_opts(CONF)
 dummy_node.register_opts(CONF)
+inventory.register_opts(CONF)
 ironic.register_opts(CONF)
 keystone.register_opts(CONF)
+metrics.register_opts(CONF)
 netconf.register_opts(CONF)
 notification.register_opts(CONF)
+outbox.register_opts(CONF)
 pecan.register_opts(CONF)
+query_stats.register_opts(CONF)
+reconcile.register_opts(CONF)
+retry.register_opts(CONF)
+profiler_opts.set_defaults(CONF)
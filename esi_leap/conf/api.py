@@ -23,6 +23,8 @@ opts = [
     cfg.StrOpt("default_resource_type", default="ironic_node"),
     cfg.IntOpt("max_lease_time", default=21),
     cfg.IntOpt("default_lease_time", default=7),
+    cfg.IntOpt("capacity_rebuild_interval", default=3600),
+    cfg.BoolOpt("fast_json", default=False),
 ]
 
 
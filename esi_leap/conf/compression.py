@@ -0,0 +1,28 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_config import cfg
+
+
+opts = [
+    cfg.BoolOpt("enabled", default=True),
+    cfg.IntOpt("min_size", default=1024, min=0),
+    cfg.IntOpt("gzip_level", default=6, min=1, max=9),
+    cfg.IntOpt("zstd_level", default=3, min=1, max=22),
+]
+
+
+compression_group = cfg.OptGroup("compression", title="Compression Options")
+
+
+def register_opts(conf):
+    conf.register_opts(opts, group=compression_group)
@@ -0,0 +1,27 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_config import cfg
+
+
+opts = [
+    cfg.BoolOpt("enabled", default=False),
+    cfg.HostAddressOpt("manager_host", default="127.0.0.1"),
+    cfg.PortOpt("manager_port", default=9101),
+]
+
+
+metrics_group = cfg.OptGroup("metrics", title="Metrics Options")
+
+
+def register_opts(conf):
+    conf.register_opts(opts, group=metrics_group)
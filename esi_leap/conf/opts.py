@@ -10,17 +10,26 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from osprofiler import opts as profiler_opts
+
 import esi_leap.conf
 
 _opts = [
     ("DEFAULT", esi_leap.conf.netconf.opts),
     ("api", esi_leap.conf.api.opts),
+    ("compression", esi_leap.conf.compression.opts),
     ("dummy_node", esi_leap.conf.dummy_node.opts),
+    ("inventory", esi_leap.conf.inventory.opts),
     ("ironic", esi_leap.conf.ironic.list_opts()),
     ("keystone", esi_leap.conf.keystone.list_opts()),
+    ("metrics", esi_leap.conf.metrics.opts),
     ("pecan", esi_leap.conf.pecan.opts),
     ("notification", esi_leap.conf.notification.opts),
-]
+    ("outbox", esi_leap.conf.outbox.opts),
+    ("query_stats", esi_leap.conf.query_stats.opts),
+    ("reconcile", esi_leap.conf.reconcile.opts),
+    ("retry", esi_leap.conf.retry.opts),
+] + profiler_opts.list_opts()
 
 
 def list_opts():
@@ -0,0 +1,27 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_config import cfg
+
+
+opts = [
+    cfg.FloatOpt("slow_query_threshold", default=0.5, min=0),
+    cfg.IntOpt("request_query_budget", default=0, min=0),
+    cfg.BoolOpt("enforce_query_budget", default=False),
+]
+
+
+query_stats_group = cfg.OptGroup("query_stats", title="Query Statistics Options")
+
+
+def register_opts(conf):
+    conf.register_opts(opts, group=query_stats_group)
@@ -0,0 +1,28 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_config import cfg
+
+
+opts = [
+    cfg.BoolOpt("enabled", default=False),
+    cfg.IntOpt("interval", default=600, min=1),
+    cfg.BoolOpt("dry_run", default=False),
+    cfg.IntOpt("batch_size", default=100, min=1),
+]
+
+
+reconcile_group = cfg.OptGroup("reconcile", title="Node Reconciliation Options")
+
+
+def register_opts(conf):
+    conf.register_opts(opts, group=reconcile_group)
@@ -0,0 +1,30 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_config import cfg
+
+
+opts = [
+    cfg.IntOpt("base_delay", default=60, min=1),
+    cfg.IntOpt("max_delay", default=3600, min=1),
+    cfg.FloatOpt("breaker_error_rate", default=0.5, min=0, max=1),
+    cfg.IntOpt("breaker_min_calls", default=10, min=1),
+    cfg.IntOpt("breaker_window", default=60, min=1),
+    cfg.IntOpt("breaker_cooldown", default=300, min=1),
+]
+
+
+retry_group = cfg.OptGroup("retry", title="Retry Options")
+
+
+def register_opts(conf):
+    conf.register_opts(opts, group=retry_group)
@@ -54,6 +54,29 @@ def not_equal(*values):
     return IMPL.not_equal(*values)
 
 
+# Read routing
+
+
+def allow_replica_reads(allowed):
+    """Let lookups and listings in this thread read from the replica."""
+    return IMPL.allow_replica_reads(allowed)
+
+
+def replica_reads_active():
+    """Return whether lookups and listings in this thread use the replica."""
+    return IMPL.replica_reads_active()
+
+
+def primary_reads():
+    """Return a context manager reading from the primary database."""
+    return IMPL.primary_reads()
+
+
+def read_transaction():
+    """Return a context manager running its reads on a single session."""
+    return IMPL.read_transaction()
+
+
 def to_dict(func):
     def decorator(*args, **kwargs):
         res = func(*args, **kwargs)
@@ -85,9 +108,30 @@ def offer_get_all():
     return IMPL.offer_get_all()
 
 
+def offer_get_version(filters):
+    return IMPL.offer_get_version(filters)
+
+
+def offer_get_next_change_time(filters, now):
+    return IMPL.offer_get_next_change_time(filters, now)
+
+
+@to_dict
+def offer_get_claimable(
+    start, end, resource_type=None, lessee_id=None, offer_uuids=None
+):
+    return IMPL.offer_get_claimable(
+        start,
+        end,
+        resource_type=resource_type,
+        lessee_id=lessee_id,
+        offer_uuids=offer_uuids,
+    )
+
+
 @to_dict
-def offer_get_conflict_times(offer_ref):
-    return IMPL.offer_get_conflict_times(offer_ref)
+def offer_get_conflict_times(offer_ref, start=None):
+    return IMPL.offer_get_conflict_times(offer_ref, start)
 
 
 def offer_get_next_lease_start_time(offer_uuid, start):
@@ -102,6 +146,10 @@ def offer_create(values):
     return IMPL.offer_create(values)
 
 
+def offer_create_bulk(values_list):
+    return IMPL.offer_create_bulk(values_list)
+
+
 def offer_update(context, offer_uuid, values):
     return IMPL.offer_update(context, offer_uuid, values)
 
@@ -126,10 +174,23 @@ def lease_get_all():
     return IMPL.lease_get_all()
 
 
+def lease_get_version(filters):
+    return IMPL.lease_get_version(filters)
+
+
+@to_dict
+def lease_get_expiring(start, end, status):
+    return IMPL.lease_get_expiring(start, end, status)
+
+
 def lease_create(values):
     return IMPL.lease_create(values)
 
 
+def lease_create_bulk(values_list):
+    return IMPL.lease_create_bulk(values_list)
+
+
 def lease_update(lease_uuid, values):
     return IMPL.lease_update(lease_uuid, values)
 
@@ -142,11 +203,43 @@ def lease_verify_child_availability(lease_ref, start, end):
     return IMPL.lease_verify_child_availability(lease_ref, start, end)
 
 
+def lease_get_subtree(lease_uuid=None, offer_uuid=None):
+    return IMPL.lease_get_subtree(lease_uuid, offer_uuid)
+
+
+def lease_offer_bulk_update(lease_updates, offer_updates, operations=None):
+    return IMPL.lease_offer_bulk_update(lease_updates, offer_updates, operations)
+
+
+def lease_schedule_retry(lease_uuids, schedule):
+    return IMPL.lease_schedule_retry(lease_uuids, schedule)
+
+
+def lease_reset_retry(lease_uuids):
+    return IMPL.lease_reset_retry(lease_uuids)
+
+
+def lease_get_retry_queue_depth():
+    return IMPL.lease_get_retry_queue_depth()
+
+
 # Resource object
 def resource_verify_availability(r_type, r_uuid, start, end):
     return IMPL.resource_verify_availability(r_type, r_uuid, start, end)
 
 
+def resource_get_conflicts(r_type, r_uuids, start, end):
+    return IMPL.resource_get_conflicts(r_type, r_uuids, start, end)
+
+
+def resource_get_changed(since):
+    return IMPL.resource_get_changed(since)
+
+
+def resource_get_capacity(resources=None):
+    return IMPL.resource_get_capacity(resources)
+
+
 def resource_check_admin(
     resource_type,
     resource_uuid,
@@ -165,11 +258,45 @@ def resource_check_admin(
     )
 
 
+# Resource inventory
+def resource_inventory_get_all(filters):
+    return IMPL.resource_inventory_get_all(filters)
+
+
+def resource_inventory_get_version(filters):
+    return IMPL.resource_inventory_get_version(filters)
+
+
+def resource_inventory_get_synced_at():
+    return IMPL.resource_inventory_get_synced_at()
+
+
+def resource_inventory_sync(values_list, synced_at):
+    return IMPL.resource_inventory_sync(values_list, synced_at)
+
+
+# Resource operation
+def resource_operation_get_all(filters):
+    return IMPL.resource_operation_get_all(filters)
+
+
+def resource_operation_complete(operation_ids, lease_updates):
+    return IMPL.resource_operation_complete(operation_ids, lease_updates)
+
+
+def resource_operation_fail(operation_id, error, next_attempt_time=None):
+    return IMPL.resource_operation_fail(operation_id, error, next_attempt_time)
+
+
 # Event
 @to_dict
 def event_get_all():
     return IMPL.event_get_all()
 
 
+def event_get_version(filters):
+    return IMPL.event_get_version(filters)
+
+
 def event_create(values):
     return IMPL.event_create(values)
@@ -0,0 +1,36 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""add lease end_time index
+
+Revision ID: 3b7c1c9a5f2e
+Revises: a1ea63fec697
+Create Date: 2026-10-19 09:12:41.208316
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "3b7c1c9a5f2e"
+down_revision = "a1ea63fec697"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("lease_end_time_idx", "leases", ["end_time"], unique=False)
+
+
+def downgrade():
+    op.drop_index("lease_end_time_idx", table_name="leases")
@@ -0,0 +1,51 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""add event polling indexes
+
+Revision ID: 49fd4cb7bac4
+Revises: 7d2e4f1b9c3a
+Create Date: 2026-10-19 16:47:05.301174
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "49fd4cb7bac4"
+down_revision = "7d2e4f1b9c3a"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # databases created from the models by create_schema already have it
+    indexes = sa.inspect(op.get_bind()).get_indexes("events")
+    if "event_time_idx" not in {index["name"] for index in indexes}:
+        op.create_index("event_time_idx", "events", ["event_time"], unique=False)
+    op.create_index(
+        "event_lessee_id_id_idx", "events", ["lessee_id", "id"], unique=False
+    )
+    op.create_index("event_owner_id_id_idx", "events", ["owner_id", "id"], unique=False)
+    op.drop_index("event_lessee_id_idx", table_name="events")
+    op.drop_index("event_owner_id_idx", table_name="events")
+
+
+def downgrade():
+    op.create_index("event_owner_id_idx", "events", ["owner_id"], unique=False)
+    op.create_index("event_lessee_id_idx", "events", ["lessee_id"], unique=False)
+    op.drop_index("event_owner_id_id_idx", table_name="events")
+    op.drop_index("event_lessee_id_id_idx", table_name="events")
+    # event_time_idx is left alone, as the models declared it before this
+    # revision and databases created by create_schema had it already
@@ -0,0 +1,41 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""add lease offer_uuid, status, end_time index
+
+Revision ID: 7d2e4f1b9c3a
+Revises: 3b7c1c9a5f2e
+Create Date: 2026-10-19 14:03:27.518902
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "7d2e4f1b9c3a"
+down_revision = "3b7c1c9a5f2e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "lease_offer_status_end_time_idx",
+        "leases",
+        ["offer_uuid", "status", "end_time"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index("lease_offer_status_end_time_idx", table_name="leases")
@@ -0,0 +1,42 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""add changes_since indexes
+
+Revision ID: b8d3f0a6c2e9
+Revises: f4c1b6e8a2d5
+Create Date: 2026-10-19 23:04:17.531872
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "b8d3f0a6c2e9"
+down_revision = "f4c1b6e8a2d5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("offer_created_at_idx", "offers", ["created_at"], unique=False)
+    op.create_index("offer_updated_at_idx", "offers", ["updated_at"], unique=False)
+    op.create_index("lease_created_at_idx", "leases", ["created_at"], unique=False)
+    op.create_index("lease_updated_at_idx", "leases", ["updated_at"], unique=False)
+
+
+def downgrade():
+    op.drop_index("lease_updated_at_idx", table_name="leases")
+    op.drop_index("lease_created_at_idx", table_name="leases")
+    op.drop_index("offer_updated_at_idx", table_name="offers")
+    op.drop_index("offer_created_at_idx", table_name="offers")
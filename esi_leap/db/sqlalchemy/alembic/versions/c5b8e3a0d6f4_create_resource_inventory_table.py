@@ -0,0 +1,70 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""create resource inventory table
+
+Revision ID: c5b8e3a0d6f4
+Revises: 49fd4cb7bac4
+Create Date: 2026-10-19 18:12:40.518327
+
+"""
+
+from alembic import op
+from oslo_db.sqlalchemy import types as db_types
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c5b8e3a0d6f4"
+down_revision = "49fd4cb7bac4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "resource_inventory",
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column("uuid", sa.String(length=36), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=True),
+        sa.Column("resource_class", sa.String(length=80), nullable=True),
+        sa.Column("owner", sa.String(length=255), nullable=True),
+        sa.Column("lessee", sa.String(length=255), nullable=True),
+        sa.Column("provision_state", sa.String(length=32), nullable=True),
+        sa.Column("maintenance", sa.Boolean(), nullable=False),
+        sa.Column("properties", db_types.JsonEncodedDict(), nullable=True),
+        sa.Column("lease_uuid", sa.String(length=36), nullable=True),
+        sa.Column("synced_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("uuid"),
+    )
+    op.create_index(
+        "resource_inventory_name_idx", "resource_inventory", ["name"], unique=False
+    )
+    op.create_index(
+        "resource_inventory_owner_idx", "resource_inventory", ["owner"], unique=False
+    )
+    op.create_index(
+        "resource_inventory_lessee_idx", "resource_inventory", ["lessee"], unique=False
+    )
+    op.create_index(
+        "resource_inventory_resource_class_idx",
+        "resource_inventory",
+        ["resource_class"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_table("resource_inventory")
@@ -0,0 +1,50 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""move inventory synced_at to a single row
+
+Revision ID: d7a2c9e4b1f6
+Revises: b8d3f0a6c2e9
+Create Date: 2026-10-19 09:41:03.207514
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d7a2c9e4b1f6"
+down_revision = "b8d3f0a6c2e9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "resource_inventory_sync",
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column("synced_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    # the next sync records its time; until then responses carry none
+    with op.batch_alter_table("resource_inventory") as batch_op:
+        batch_op.drop_column("synced_at")
+
+
+def downgrade():
+    op.add_column(
+        "resource_inventory", sa.Column("synced_at", sa.DateTime(), nullable=True)
+    )
+    op.drop_table("resource_inventory_sync")
@@ -0,0 +1,61 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""create resource operations table
+
+Revision ID: e2a9d4c7f1b3
+Revises: c5b8e3a0d6f4
+Create Date: 2026-10-19 20:41:07.104582
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e2a9d4c7f1b3"
+down_revision = "c5b8e3a0d6f4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "resource_operations",
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column("action", sa.String(length=16), nullable=False),
+        sa.Column("resource_type", sa.String(length=36), nullable=False),
+        sa.Column("resource_uuid", sa.String(length=36), nullable=False),
+        sa.Column("lease_uuid", sa.String(length=36), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "resource_operation_resource_idx",
+        "resource_operations",
+        ["resource_type", "resource_uuid"],
+        unique=False,
+    )
+    op.create_index(
+        "resource_operation_lease_uuid_idx",
+        "resource_operations",
+        ["lease_uuid"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_table("resource_operations")
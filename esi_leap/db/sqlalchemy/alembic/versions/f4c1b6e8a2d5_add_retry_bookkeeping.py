@@ -0,0 +1,47 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""add retry bookkeeping
+
+Revision ID: f4c1b6e8a2d5
+Revises: e2a9d4c7f1b3
+Create Date: 2026-10-19 21:37:52.660913
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f4c1b6e8a2d5"
+down_revision = "e2a9d4c7f1b3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "leases",
+        sa.Column("retry_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column("leases", sa.Column("next_retry_time", sa.DateTime(), nullable=True))
+    op.add_column(
+        "resource_operations",
+        sa.Column("next_attempt_time", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_column("resource_operations", "next_attempt_time")
+    op.drop_column("leases", "next_retry_time")
+    op.drop_column("leases", "retry_count")
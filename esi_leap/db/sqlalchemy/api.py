@@ -10,19 +10,24 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import contextlib
 import sys
 import threading
 
 from oslo_config import cfg
 from oslo_db.sqlalchemy import enginefacade
 from oslo_log import log as logging
+from osprofiler import sqlalchemy as osp_sqlalchemy
 
 import sqlalchemy as sa
+from sqlalchemy import and_
 from sqlalchemy import or_
 
 from esi_leap.common import constants
 from esi_leap.common import exception
 from esi_leap.common import keystone
+from esi_leap.common import profiler
+from esi_leap.common import query_stats
 from esi_leap.common import statuses
 from esi_leap.db.sqlalchemy import models
 
@@ -31,31 +36,112 @@ CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
 
 _CONTEXT = threading.local()
+_READS = threading.local()
 
 
 def get_backend():
     """The backend is this module itself."""
+    if CONF.profiler.enabled:
+        return profiler.TracedBackend(sys.modules[__name__], "db_api")
     return sys.modules[__name__]
 
 
+def _wrap_session(session):
+    query_stats.instrument()
+    if CONF.profiler.enabled and CONF.profiler.trace_sqlalchemy:
+        session = osp_sqlalchemy.wrap_session(sa, session)
+    return session
+
+
 def _session_for_read():
-    return enginefacade.reader.using(_CONTEXT)
+    return _wrap_session(enginefacade.reader.using(_CONTEXT))
 
 
 def _session_for_write():
-    return enginefacade.writer.using(_CONTEXT)
+    return _wrap_session(enginefacade.writer.using(_CONTEXT))
+
+
+def _session_for_replica_read():
+    if replica_reads_active():
+        return _wrap_session(enginefacade.reader.async_.using(_CONTEXT))
+    return _session_for_read()
+
+
+def allow_replica_reads(allowed):
+    """Let lookups and listings in this thread read from the replica.
+
+    Reads go to [database] slave_connection when it is set, and to the
+    primary otherwise.
+    """
+    _READS.replica = allowed
+
+
+def replica_reads_active():
+    return getattr(_READS, "replica", False)
+
+
+@contextlib.contextmanager
+def primary_reads():
+    """Read from the primary database for the duration of the block."""
+    previous = replica_reads_active()
+    _READS.replica = False
+    try:
+        yield
+    finally:
+        _READS.replica = previous
+
+
+@contextlib.contextmanager
+def read_transaction():
+    """Run the lookups and listings of the block on a single session.
+
+    The session reads from the replica when replica reads are active.
+    """
+    with _session_for_replica_read():
+        yield
 
 
-def model_query(model, *args):
+def model_query(model, *args, replica=False):
     """Query helper.
 
     :param model: base model to query
+    :param replica: whether the query may read from the replica
     """
-    with _session_for_read() as session:
+    get_session = _session_for_replica_read if replica else _session_for_read
+    with get_session() as session:
         query = session.query(model, *args)
         return query
 
 
+def _get_version(*queries):
+    """Return the row count and last change time of the rows of queries.
+
+    The rows of all the queries are counted in a single statement, run on
+    the session of the first query.
+    """
+    selects = []
+    for query in queries:
+        rows = query.subquery()
+        changed = sa.func.coalesce(rows.c.updated_at, rows.c.created_at)
+        selects.append(sa.select(changed.label("changed")))
+    rows = sa.union_all(*selects).subquery()
+    return (
+        queries[0]
+        .session.query(sa.func.count(), sa.func.max(rows.c.changed))
+        .select_from(rows)
+        .one()
+    )
+
+
+def _changed_since(model, since):
+    """Match the rows created or updated at or after a time.
+
+    Rows that were never updated have no updated_at, so both columns are
+    checked, each through its own index.
+    """
+    return or_(model.created_at >= since, model.updated_at >= since)
+
+
 # Helpers for building constraints / equality checks
 
 
@@ -100,19 +186,19 @@ class InequalityCondition(object):
 
 # Offer
 def offer_get_by_uuid(offer_uuid):
-    query = model_query(models.Offer)
+    query = model_query(models.Offer, replica=True)
     offer_ref = query.filter_by(uuid=offer_uuid).one_or_none()
     return offer_ref
 
 
 def offer_get_by_name(name):
-    query = model_query(models.Offer)
+    query = model_query(models.Offer, replica=True)
     offers = query.filter_by(name=name).all()
     return offers
 
 
 def offer_get_all(filters):
-    query = model_query(models.Offer)
+    query = model_query(models.Offer, replica=True)
 
     lessee_id = filters.pop("lessee_id", None)
     start = filters.pop("start_time", None)
@@ -121,9 +207,13 @@ def offer_get_all(filters):
     a_start = filters.pop("available_start_time", None)
     status = filters.pop("status", None)
     a_end = filters.pop("available_end_time", None)
+    changes_since = filters.pop("changes_since", None)
 
     query = query.filter_by(**filters)
 
+    if changes_since:
+        query = query.filter(_changed_since(models.Offer, changes_since))
+
     if status:
         query = query.filter((models.Offer.status.in_(status)))
 
@@ -149,29 +239,87 @@ def offer_get_all(filters):
             )
 
     if a_start and a_end:
-        for o in query:
-            try:
-                offer_verify_availability(o, a_start, a_end)
-            except exception.OfferNoTimeAvailabilities:
-                query = query.filter(models.Offer.uuid != o.uuid)
+        query = query.filter(
+            models.Offer.start_time <= a_start,
+            models.Offer.end_time >= a_end,
+            ~_offer_lease_conflict(a_start, a_end).exists(),
+        )
 
     return query
 
 
-def offer_get_conflict_times(offer_ref):
+def offer_get_version(filters):
+    """Return the version of a filtered set of offers.
+
+    The version covers the offers and the leases on them, whose times
+    bound the availabilities of the offers.
+
+    :param filters: as for offer_get_all.
+    """
+    offers = offer_get_all(dict(filters))
+    leases = model_query(models.Lease, replica=True).filter(
+        models.Lease.offer_uuid.in_(offers.with_entities(models.Offer.uuid))
+    )
+    return _get_version(offers, leases)
+
+
+def offer_get_next_change_time(filters, now):
+    """Return the first time after now that one of the offers starts or ends.
+
+    :param filters: as for offer_get_all.
+    :param now: the current time.
+    """
+    offers = offer_get_all(dict(filters))
+    next_start, next_end = offers.with_entities(
+        sa.func.min(sa.case((models.Offer.start_time > now, models.Offer.start_time))),
+        sa.func.min(sa.case((models.Offer.end_time >= now, models.Offer.end_time))),
+    ).one()
+    times = [t for t in (next_start, next_end) if t is not None]
+    return min(times) if times else None
+
+
+def offer_get_claimable(
+    start, end, resource_type=None, lessee_id=None, offer_uuids=None
+):
+    filters = {
+        "status": [statuses.AVAILABLE],
+        "available_start_time": start,
+        "available_end_time": end,
+    }
+    if resource_type:
+        filters["resource_type"] = resource_type
+    if lessee_id:
+        filters["lessee_id"] = lessee_id
+
+    query = offer_get_all(filters)
+    if offer_uuids is not None:
+        query = query.filter(models.Offer.uuid.in_(offer_uuids))
+
+    return query.order_by(models.Offer.id).all()
+
+
+def _offer_lease_conflict(start, end):
+    # created or active leases of the outer offer overlapping [start, end)
+    l_query = model_query(models.Lease).filter(
+        models.Lease.offer_uuid == models.Offer.uuid,
+        models.Lease.status.in_([statuses.CREATED, statuses.ACTIVE]),
+    )
+    return add_lease_conflict_filter(l_query, start, end)
+
+
+def offer_get_conflict_times(offer_ref, start=None):
     l_query = model_query(models.Lease)
 
-    return (
-        l_query.with_entities(models.Lease.start_time, models.Lease.end_time)
-        .join(models.Offer, models.Offer.uuid == models.Lease.offer_uuid)
-        .order_by(models.Lease.start_time)
-        .filter(
-            models.Lease.offer_uuid == offer_ref.uuid,
-            (models.Lease.status != statuses.EXPIRED)
-            & (models.Lease.status != statuses.DELETED),
-        )
-        .all()
+    l_query = l_query.with_entities(
+        models.Lease.start_time, models.Lease.end_time
+    ).filter(
+        models.Lease.offer_uuid == offer_ref.uuid,
+        models.Lease.status.notin_([statuses.EXPIRED, statuses.DELETED]),
     )
+    if start is not None:
+        l_query = l_query.filter(models.Lease.end_time > start)
+
+    return l_query.order_by(models.Lease.start_time).all()
 
 
 def offer_get_next_lease_start_time(offer_uuid, start):
@@ -224,6 +372,19 @@ def offer_create(values):
         return offer_ref
 
 
+def offer_create_bulk(values_list):
+    offer_refs = []
+    for values in values_list:
+        offer_ref = models.Offer()
+        offer_ref.update(values)
+        offer_refs.append(offer_ref)
+
+    with _session_for_write() as session:
+        session.add_all(offer_refs)
+        session.flush()
+        return offer_refs
+
+
 def offer_update(offer_uuid, values):
     with _session_for_write() as session:
         query = model_query(models.Offer)
@@ -272,31 +433,47 @@ def add_offer_conflict_filter(query, start, end):
 
 # Leases
 def lease_get_by_uuid(lease_uuid):
-    query = model_query(models.Lease)
+    query = model_query(models.Lease, replica=True)
     result = query.filter_by(uuid=lease_uuid).one_or_none()
     return result
 
 
 def lease_get_by_name(name):
-    query = model_query(models.Lease)
+    query = model_query(models.Lease, replica=True)
     leases = query.filter_by(name=name).all()
     return leases
 
 
 def lease_get_all(filters):
-    query = model_query(models.Lease)
+    query = model_query(models.Lease, replica=True)
 
     start = filters.pop("start_time", None)
     end = filters.pop("end_time", None)
     time_filter_type = filters.pop("time_filter_type", None)
     status = filters.pop("status", None)
     project_or_owner_id = filters.pop("project_or_owner_id", None)
+    retry_due = filters.pop("retry_due", None)
+    retry_status = filters.pop("retry_status", None)
+    changes_since = filters.pop("changes_since", None)
 
     query = query.filter_by(**filters)
 
+    if changes_since:
+        query = query.filter(_changed_since(models.Lease, changes_since))
+
     if status:
         query = query.filter((models.Lease.status.in_(status)))
 
+    if retry_due:
+        due = or_(
+            models.Lease.next_retry_time.is_(None),
+            models.Lease.next_retry_time <= retry_due,
+        )
+        if retry_status:
+            # only a retry of the same transition waits out the backoff
+            due = or_(due, models.Lease.status.notin_(retry_status))
+        query = query.filter(due)
+
     if start and end:
         if time_filter_type == constants.WITHIN_TIME_FILTER:
             query = query.filter(
@@ -319,6 +496,24 @@ def lease_get_all(filters):
     return query
 
 
+def lease_get_version(filters):
+    """Return the row count and last change time of a filtered set of leases.
+
+    :param filters: as for lease_get_all.
+    """
+    return _get_version(lease_get_all(dict(filters)))
+
+
+def lease_get_expiring(start, end, status):
+    query = model_query(models.Lease)
+
+    return query.filter(
+        models.Lease.status.in_(status),
+        models.Lease.end_time > start,
+        models.Lease.end_time <= end,
+    ).order_by(models.Lease.end_time)
+
+
 def lease_create(values):
     lease_ref = models.Lease()
     lease_ref.update(values)
@@ -329,6 +524,19 @@ def lease_create(values):
         return lease_ref
 
 
+def lease_create_bulk(values_list):
+    lease_refs = []
+    for values in values_list:
+        lease_ref = models.Lease()
+        lease_ref.update(values)
+        lease_refs.append(lease_ref)
+
+    with _session_for_write() as session:
+        session.add_all(lease_refs)
+        session.flush()
+        return lease_refs
+
+
 def lease_update(lease_uuid, values):
     with _session_for_write() as session:
         query = model_query(models.Lease)
@@ -404,6 +612,153 @@ def lease_verify_child_availability(lease_ref, start, end):
         )
 
 
+def _child_lease_select(depth, parent_uuid):
+    return (
+        sa.select(models.Lease.uuid.label("uuid"), depth.label("depth"))
+        .select_from(models.Lease)
+        .outerjoin(models.Offer, models.Lease.offer_uuid == models.Offer.uuid)
+        .where(
+            models.Lease.status.in_(statuses.LEASE_CAN_DELETE),
+            or_(
+                models.Lease.parent_lease_uuid == parent_uuid,
+                and_(
+                    models.Offer.parent_lease_uuid == parent_uuid,
+                    models.Offer.status.in_(statuses.OFFER_CAN_DELETE),
+                ),
+            ),
+        )
+    )
+
+
+def lease_get_subtree(lease_uuid=None, offer_uuid=None):
+    """Return every deletable lease and offer beneath a lease or offer.
+
+    Leases are collected with a single recursive query and are returned
+    deepest first, so that each lease is ordered before its parent.
+
+    :param lease_uuid: uuid of the lease at the root of the subtree.
+    :param offer_uuid: uuid of the offer at the root of the subtree.
+    :returns: a tuple of (leases, offers).
+    """
+    if lease_uuid is not None:
+        seed = _child_lease_select(sa.literal(1), lease_uuid)
+    else:
+        seed = (
+            sa.select(models.Lease.uuid.label("uuid"), sa.literal(1).label("depth"))
+            .where(models.Lease.offer_uuid == offer_uuid)
+            .where(models.Lease.status.in_(statuses.LEASE_CAN_DELETE))
+        )
+
+    tree = seed.cte("lease_tree", recursive=True)
+    tree = tree.union(_child_lease_select(tree.c.depth + 1, tree.c.uuid))
+
+    depths = (
+        sa.select(tree.c.uuid, sa.func.max(tree.c.depth).label("depth"))
+        .group_by(tree.c.uuid)
+        .subquery()
+    )
+
+    with _session_for_read() as session:
+        leases = (
+            session.query(models.Lease)
+            .join(depths, models.Lease.uuid == depths.c.uuid)
+            .order_by(depths.c.depth.desc(), models.Lease.id)
+            .all()
+        )
+
+        parent_uuids = [lease.uuid for lease in leases]
+        if lease_uuid is not None:
+            parent_uuids.append(lease_uuid)
+
+        offers = []
+        if parent_uuids:
+            offers = (
+                session.query(models.Offer)
+                .filter(
+                    models.Offer.parent_lease_uuid.in_(parent_uuids),
+                    models.Offer.status.in_(statuses.OFFER_CAN_DELETE),
+                )
+                .all()
+            )
+
+    return leases, offers
+
+
+def lease_offer_bulk_update(lease_updates, offer_updates, operations=None):
+    """Apply status changes to many leases and offers in one transaction.
+
+    :param lease_updates: a list of (lease uuids, values) pairs.
+    :param offer_updates: a list of (offer uuids, values) pairs.
+    :param operations: values of resource operations to queue along with
+        the status changes.
+    """
+    with _session_for_write() as session:
+        for model, updates in (
+            (models.Lease, lease_updates),
+            (models.Offer, offer_updates),
+        ):
+            for uuids, values in updates:
+                if uuids:
+                    session.query(model).filter(model.uuid.in_(uuids)).update(
+                        values, synchronize_session=False
+                    )
+        for values in operations or []:
+            operation = models.ResourceOperation()
+            operation.update(values)
+            session.add(operation)
+        session.flush()
+
+
+def lease_schedule_retry(lease_uuids, schedule):
+    """Count a failed transition of each lease and schedule the next try.
+
+    :param lease_uuids: uuids of the leases whose transition failed.
+    :param schedule: function returning the time of the next try, given
+        the number of failed tries so far.
+    """
+    if not lease_uuids:
+        return
+    with _session_for_write() as session:
+        rows = session.query(models.Lease.id, models.Lease.retry_count).filter(
+            models.Lease.uuid.in_(lease_uuids)
+        )
+        session.bulk_update_mappings(
+            models.Lease,
+            [
+                {
+                    "id": id,
+                    "retry_count": count + 1,
+                    "next_retry_time": schedule(count + 1),
+                }
+                for id, count in rows
+            ],
+        )
+        session.flush()
+
+
+def lease_reset_retry(lease_uuids):
+    """Clear the failed transition count of leases that moved on."""
+    if not lease_uuids:
+        return
+    with _session_for_write() as session:
+        session.query(models.Lease).filter(models.Lease.uuid.in_(lease_uuids)).update(
+            {"retry_count": 0, "next_retry_time": None}, synchronize_session=False
+        )
+        session.flush()
+
+
+def lease_get_retry_queue_depth():
+    """Return the number of leases in each wait status."""
+    query = (
+        model_query(models.Lease.status, sa.func.count(models.Lease.id), replica=True)
+        .filter(models.Lease.status.in_(statuses.LEASE_WAIT))
+        .group_by(models.Lease.status)
+    )
+    depth = dict.fromkeys(statuses.LEASE_WAIT, 0)
+    depth.update(query.all())
+    return depth
+
+
 def add_lease_conflict_filter(query, start, end):
     return query.filter(
         (
@@ -449,29 +804,274 @@ def resource_verify_availability(r_type, r_uuid, start, end):
         raise exception.ResourceTimeConflict(resource_uuid=r_uuid, resource_type=r_type)
 
 
+def resource_get_conflicts(r_type, r_uuids, start, end):
+    o_query = model_query(models.Offer)
+
+    offers = o_query.with_entities(models.Offer.resource_uuid).filter(
+        (models.Offer.resource_uuid.in_(r_uuids)),
+        (models.Offer.resource_type == r_type),
+        (models.Offer.status == statuses.AVAILABLE),
+    )
+    offers = add_offer_conflict_filter(offers, start, end)
+
+    l_query = model_query(models.Lease)
+
+    leases = l_query.with_entities(models.Lease.resource_uuid).filter(
+        (models.Lease.resource_uuid.in_(r_uuids)),
+        (models.Lease.resource_type == r_type),
+        (models.Lease.status.in_([statuses.CREATED, statuses.ACTIVE])),
+    )
+    leases = add_lease_conflict_filter(leases, start, end)
+
+    return {r_uuid for (r_uuid,) in offers.union(leases).all()}
+
+
+def resource_get_changed(since):
+    o_query = model_query(models.Offer)
+    offers = o_query.with_entities(
+        models.Offer.resource_type, models.Offer.resource_uuid
+    ).filter(_changed_since(models.Offer, since))
+
+    l_query = model_query(models.Lease)
+    leases = l_query.with_entities(
+        models.Lease.resource_type, models.Lease.resource_uuid
+    ).filter(_changed_since(models.Lease, since))
+
+    return offers.union(leases).all()
+
+
+def resource_get_capacity(resources=None):
+    o_query = model_query(models.Offer)
+    offers = o_query.with_entities(
+        models.Offer.uuid,
+        models.Offer.project_id,
+        models.Offer.lessee_id,
+        models.Offer.resource_type,
+        models.Offer.resource_uuid,
+        models.Offer.start_time,
+        models.Offer.end_time,
+    ).filter(models.Offer.status == statuses.AVAILABLE)
+
+    l_query = model_query(models.Lease)
+    leases = (
+        l_query.with_entities(
+            models.Lease.offer_uuid, models.Lease.start_time, models.Lease.end_time
+        )
+        .join(models.Offer, models.Offer.uuid == models.Lease.offer_uuid)
+        .filter(
+            models.Offer.status == statuses.AVAILABLE,
+            models.Lease.status.in_([statuses.CREATED, statuses.ACTIVE]),
+        )
+    )
+
+    if resources is not None:
+        resource_filter = sa.tuple_(
+            models.Offer.resource_type, models.Offer.resource_uuid
+        ).in_([tuple(r) for r in resources])
+        offers = offers.filter(resource_filter)
+        leases = leases.filter(resource_filter)
+
+    return offers.all(), leases.order_by(models.Lease.start_time).all()
+
+
+# Resource inventory
+
+
+def resource_inventory_get_all(filters):
+    """Return the mirrored nodes.
+
+    :param filters: column values to match, and optionally uuids to
+        return only the nodes with those uuids and owner_or_lessee to
+        return only the nodes owned or leased by one project.
+    """
+    uuids = filters.pop("uuids", None)
+    owner_or_lessee = filters.pop("owner_or_lessee", None)
+
+    query = model_query(models.ResourceInventory, replica=True).filter_by(**filters)
+    if uuids is not None:
+        query = query.filter(models.ResourceInventory.uuid.in_(uuids))
+    if owner_or_lessee:
+        query = query.filter(
+            or_(
+                models.ResourceInventory.owner == owner_or_lessee,
+                models.ResourceInventory.lessee == owner_or_lessee,
+            )
+        )
+    return query
+
+
+def resource_inventory_get_version(filters):
+    """Return the row count and last change time of the mirrored nodes.
+
+    :param filters: as for resource_inventory_get_all.
+    """
+    return _get_version(resource_inventory_get_all(dict(filters)))
+
+
+def resource_inventory_get_synced_at():
+    """Return the time of the last refresh of the inventory, if any."""
+    sync = model_query(models.ResourceInventorySync, replica=True).first()
+    return sync.synced_at if sync is not None else None
+
+
+def resource_inventory_sync(values_list, synced_at):
+    """Bring the inventory in line with a full listing of the nodes.
+
+    Only rows whose values changed are written; rows of nodes missing
+    from the listing are deleted. The time of the listing is kept in the
+    single row of resource_inventory_sync.
+
+    :param values_list: the inventory values of every node.
+    :param synced_at: the time the nodes were listed.
+    :returns: the numbers of added, updated and deleted rows.
+    """
+    added = updated = 0
+    with _session_for_write() as session:
+        rows = {row.uuid: row for row in session.query(models.ResourceInventory)}
+        for values in values_list:
+            row = rows.pop(values["uuid"], None)
+            if row is None:
+                row = models.ResourceInventory()
+                row.update(values)
+                session.add(row)
+                added += 1
+            elif any(row[k] != v for k, v in values.items()):
+                row.update(values)
+                updated += 1
+        if rows:
+            session.query(models.ResourceInventory).filter(
+                models.ResourceInventory.uuid.in_(list(rows))
+            ).delete(synchronize_session=False)
+        sync = session.query(models.ResourceInventorySync).first()
+        if sync is None:
+            sync = models.ResourceInventorySync()
+            session.add(sync)
+        sync.synced_at = synced_at
+    return added, updated, len(rows)
+
+
+# Resource operations
+
+
+def resource_operation_get_all(filters):
+    """Return pending resource operations in the order they were queued.
+
+    :param filters: column values to match, and optionally due to return
+        only the operations not backing off at that time, and limit to
+        return at most that many operations.
+    """
+    due = filters.pop("due", None)
+    limit = filters.pop("limit", None)
+
+    query = (
+        model_query(models.ResourceOperation)
+        .filter_by(**filters)
+        .order_by(models.ResourceOperation.id)
+    )
+    if due:
+        query = query.filter(
+            or_(
+                models.ResourceOperation.next_attempt_time.is_(None),
+                models.ResourceOperation.next_attempt_time <= due,
+            )
+        )
+    if limit:
+        query = query.limit(limit)
+    return query
+
+
+def resource_operation_complete(operation_ids, lease_updates):
+    """Remove applied operations and record their results in one transaction.
+
+    :param operation_ids: ids of the applied operations.
+    :param lease_updates: a list of (lease uuids, values) pairs.
+    """
+    with _session_for_write() as session:
+        for uuids, values in lease_updates:
+            if uuids:
+                session.query(models.Lease).filter(models.Lease.uuid.in_(uuids)).update(
+                    values, synchronize_session=False
+                )
+        if operation_ids:
+            session.query(models.ResourceOperation).filter(
+                models.ResourceOperation.id.in_(operation_ids)
+            ).delete(synchronize_session=False)
+        session.flush()
+
+
+def resource_operation_fail(operation_id, error, next_attempt_time=None):
+    """Count a failed attempt at applying an operation.
+
+    :param operation_id: id of the failed operation.
+    :param error: description of the failure.
+    :param next_attempt_time: time before which neither the operation nor
+        any later operation on the same resource is attempted again.
+    """
+    with _session_for_write() as session:
+        query = session.query(models.ResourceOperation)
+        operation = query.filter_by(id=operation_id).one_or_none()
+        if operation is None:
+            return
+        operation.attempts += 1
+        operation.last_error = error
+        query.filter_by(
+            resource_type=operation.resource_type,
+            resource_uuid=operation.resource_uuid,
+        ).update({"next_attempt_time": next_attempt_time}, synchronize_session=False)
+        session.flush()
+
+
 # Events
 
 
 def event_get_all(filters):
-    query = model_query(models.Event)
+    """Return events in id order, optionally a page of them.
 
+    :param filters: column values to match, and optionally last_event_id
+        and last_event_time to return only newer events, lessee_or_owner_id
+        to return only events of one project, and limit to return at most
+        that many events.
+    """
     last_event_time = filters.pop("last_event_time", None)
     last_event_id = filters.pop("last_event_id", None)
     lessee_or_owner_id = filters.pop("lessee_or_owner_id", None)
+    limit = filters.pop("limit", None)
 
-    query = query.filter_by(**filters)
-
+    conditions = [getattr(models.Event, k) == v for k, v in filters.items()]
     if last_event_time:
-        query = query.filter(last_event_time < models.Event.event_time)
+        conditions.append(last_event_time < models.Event.event_time)
     if last_event_id:
-        query = query.filter(last_event_id < models.Event.id)
+        conditions.append(last_event_id < models.Event.id)
+
+    query = model_query(models.Event, replica=True)
+
     if lessee_or_owner_id:
-        query = query.filter(
-            (lessee_or_owner_id == models.Event.lessee_id)
-            | (lessee_or_owner_id == models.Event.owner_id)
-        )
+        # walk the (lessee_id, id) and (owner_id, id) indexes separately,
+        # each stopping after one page, rather than OR the two columns,
+        # which no index can return in id order
+        pages = []
+        for column in (models.Event.lessee_id, models.Event.owner_id):
+            page = (
+                sa.select(models.Event.id)
+                .where(column == lessee_or_owner_id, *conditions)
+                .order_by(models.Event.id)
+                .limit(limit)
+                .subquery()
+            )
+            pages.append(sa.select(page.c.id))
+        query = query.filter(models.Event.id.in_(sa.union(*pages)))
+    else:
+        query = query.filter(*conditions)
 
-    return query
+    return query.order_by(models.Event.id).limit(limit)
+
+
+def event_get_version(filters):
+    """Return the row count and last change time of a page of events.
+
+    :param filters: as for event_get_all.
+    """
+    return _get_version(event_get_all(dict(filters)))
 
 
 def event_create(values):
@@ -16,8 +16,8 @@ from oslo_db.sqlalchemy import types as db_types
 from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import orm
-from sqlalchemy import Column, DateTime, ForeignKey
-from sqlalchemy import Index, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey
+from sqlalchemy import Index, Integer, String, Text
 
 from esi_leap.common import statuses
 
@@ -49,6 +49,8 @@ class Offer(Base):
         Index("offer_project_id_idx", "project_id"),
         Index("offer_resource_idx", "resource_type", "resource_uuid"),
         Index("offer_status_idx", "status"),
+        Index("offer_created_at_idx", "created_at"),
+        Index("offer_updated_at_idx", "updated_at"),
     )
 
     id = Column(Integer, primary_key=True, nullable=False, autoincrement=True)
@@ -78,6 +80,10 @@ class Lease(Base):
         Index("lease_project_id_idx", "project_id"),
         Index("lease_owner_id_idx", "owner_id"),
         Index("lease_status_idx", "status"),
+        Index("lease_end_time_idx", "end_time"),
+        Index("lease_offer_status_end_time_idx", "offer_uuid", "status", "end_time"),
+        Index("lease_created_at_idx", "created_at"),
+        Index("lease_updated_at_idx", "updated_at"),
     )
 
     id = Column(Integer, primary_key=True, nullable=False, autoincrement=True)
@@ -96,6 +102,8 @@ class Lease(Base):
     properties = Column(db_types.JsonEncodedDict, nullable=True)
     offer_uuid = Column(String(36), ForeignKey("offers.uuid"), nullable=True)
     parent_lease_uuid = Column(String(36), ForeignKey("leases.uuid"), nullable=True)
+    retry_count = Column(Integer, nullable=False, default=0)
+    next_retry_time = Column(DateTime, nullable=True)
     offer = orm.relationship(
         Offer,
         backref=orm.backref("offers"),
@@ -114,8 +122,8 @@ class Event(Base):
     __tablename__ = "events"
     __table_args__ = (
         Index("event_type_idx", "event_type"),
-        Index("event_lessee_id_idx", "lessee_id"),
-        Index("event_owner_id_idx", "owner_id"),
+        Index("event_lessee_id_id_idx", "lessee_id", "id"),
+        Index("event_owner_id_id_idx", "owner_id", "id"),
         Index("event_resource_idx", "resource_type", "resource_uuid"),
         Index("event_time_idx", "event_time"),
     )
@@ -129,3 +137,54 @@ class Event(Base):
     resource_uuid = Column(String(36), nullable=True)
     lessee_id = Column(String(255), nullable=True)
     owner_id = Column(String(255), nullable=True)
+
+
+class ResourceInventory(Base):
+    """Represents the last known state of an Ironic node."""
+
+    __tablename__ = "resource_inventory"
+    __table_args__ = (
+        Index("resource_inventory_name_idx", "name"),
+        Index("resource_inventory_owner_idx", "owner"),
+        Index("resource_inventory_lessee_idx", "lessee"),
+        Index("resource_inventory_resource_class_idx", "resource_class"),
+    )
+
+    id = Column(Integer, primary_key=True, nullable=False, autoincrement=True)
+    uuid = Column(String(36), nullable=False, unique=True)
+    name = Column(String(255), nullable=True)
+    resource_class = Column(String(80), nullable=True)
+    owner = Column(String(255), nullable=True)
+    lessee = Column(String(255), nullable=True)
+    provision_state = Column(String(32), nullable=True)
+    maintenance = Column(Boolean, nullable=False, default=False)
+    properties = Column(db_types.JsonEncodedDict, nullable=True)
+    lease_uuid = Column(String(36), nullable=True)
+
+
+class ResourceInventorySync(Base):
+    """Represents the last refresh of the resource inventory; a single row."""
+
+    __tablename__ = "resource_inventory_sync"
+
+    id = Column(Integer, primary_key=True, nullable=False, autoincrement=True)
+    synced_at = Column(DateTime, nullable=False)
+
+
+class ResourceOperation(Base):
+    """Represents a pending change to a resource, applied by the manager."""
+
+    __tablename__ = "resource_operations"
+    __table_args__ = (
+        Index("resource_operation_resource_idx", "resource_type", "resource_uuid"),
+        Index("resource_operation_lease_uuid_idx", "lease_uuid"),
+    )
+
+    id = Column(Integer, primary_key=True, nullable=False, autoincrement=True)
+    action = Column(String(16), nullable=False)
+    resource_type = Column(String(36), nullable=False)
+    resource_uuid = Column(String(36), nullable=False)
+    lease_uuid = Column(String(36), nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    next_attempt_time = Column(DateTime, nullable=True)
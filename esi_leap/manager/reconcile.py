@@ -0,0 +1,175 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Reconciliation of the Ironic nodes with the active leases.
+
+One projected listing of the nodes is compared with the active leases in
+the database. A node that does not carry the lease it should is given the
+lease again; a node still carrying a lease that is no longer active has
+the lease removed, as expiring the lease would have done. Nodes carrying
+a lease that is waiting on a transition are left to the manager, which
+retries the transition.
+"""
+
+import collections
+
+from oslo_log import log as logging
+
+from esi_leap.common import ironic
+from esi_leap.common import statuses
+from esi_leap.common import utils
+from esi_leap.objects import lease as lease_obj
+from esi_leap.resource_objects import ironic_node
+
+
+LOG = logging.getLogger(__name__)
+
+RESOURCE_TYPE = ironic_node.IronicNode.resource_type
+SET_LEASE = "set_lease"
+REMOVE_LEASE = "remove_lease"
+
+Mismatch = collections.namedtuple(
+    "Mismatch", ["node_uuid", "expected", "found", "action"]
+)
+
+
+def _expected_leases(leases):
+    """Return the lease each node should carry, keyed by node uuid.
+
+    A node carries the innermost of the active leases on it, that is the
+    one that is not the parent of another. Nodes where that is not a single
+    lease are returned separately, and are left alone.
+
+    :returns: a tuple of (leases by node uuid, uuids of unclear nodes).
+    """
+    by_node = collections.defaultdict(list)
+    for lease in leases:
+        by_node[lease.resource_uuid].append(lease)
+
+    expected = {}
+    unclear = set()
+    for node_uuid, node_leases in by_node.items():
+        parents = {lease.parent_lease_uuid for lease in node_leases}
+        holders = [lease for lease in node_leases if lease.uuid not in parents]
+        if len(holders) == 1:
+            expected[node_uuid] = holders[0]
+        else:
+            LOG.warning(
+                "Not reconciling node %s: %d active leases could hold it",
+                node_uuid,
+                len(holders),
+            )
+            unclear.add(node_uuid)
+    return expected, unclear
+
+
+def _compare(node_uuid, lease, found, lessee):
+    if lease is not None:
+        if found != lease.uuid or lessee != lease.project_id:
+            return Mismatch(node_uuid, lease.uuid, found, SET_LEASE)
+    elif found is not None:
+        return Mismatch(node_uuid, None, found, REMOVE_LEASE)
+    return None
+
+
+def find_mismatches(nodes, leases, waiting=()):
+    """Return the nodes whose lease does not match the active leases.
+
+    :param nodes: the Ironic nodes.
+    :param leases: the active leases on the nodes.
+    :param waiting: uuids of the leases waiting on a transition.
+    """
+    expected, unclear = _expected_leases(leases)
+    mismatches = []
+    for node in nodes:
+        found = (node.properties or {}).get("lease_uuid")
+        if node.uuid in unclear or found in waiting:
+            continue
+        mismatch = _compare(node.uuid, expected.get(node.uuid), found, node.lessee)
+        if mismatch is not None:
+            mismatches.append(mismatch)
+    return mismatches
+
+
+def _get_leases(context, node_uuid=None):
+    """Return the active leases, and the uuids of the waiting leases."""
+    filters = {
+        "status": [statuses.ACTIVE] + statuses.LEASE_WAIT,
+        "resource_type": RESOURCE_TYPE,
+    }
+    if node_uuid is not None:
+        filters["resource_uuid"] = node_uuid
+    leases = lease_obj.Lease.get_all(filters, context)
+    active = [lease for lease in leases if lease.status == statuses.ACTIVE]
+    waiting = {lease.uuid for lease in leases if lease.status in statuses.LEASE_WAIT}
+    return active, waiting
+
+
+def _fix(context, node_uuid):
+    """Bring one node in line with its active leases.
+
+    The node and its leases are read again under the resource lock, as
+    either may have changed since the listing.
+    """
+    with utils.lock(
+        utils.get_resource_lock_name(RESOURCE_TYPE, node_uuid), external=True
+    ):
+        active, waiting = _get_leases(context, node_uuid)
+        expected, unclear = _expected_leases(active)
+        if node_uuid in unclear:
+            return
+        lease = expected.get(node_uuid)
+        node = ironic_node.IronicNode(node_uuid)
+        found = node.get_lease_uuid()
+        if found in waiting:
+            return
+        mismatch = _compare(node_uuid, lease, found, node.get_lessee_project_id())
+        if mismatch is None:
+            return
+
+        if mismatch.action == SET_LEASE:
+            LOG.info("Setting lease %s on node %s", lease.uuid, node_uuid)
+            node.set_lease(lease)
+            return
+
+        stale = lease_obj.Lease.get(mismatch.found, context)
+        if stale is None:
+            LOG.warning(
+                "Not removing unknown lease %s from node %s", mismatch.found, node_uuid
+            )
+            return
+        LOG.info("Removing lease %s from node %s", stale.uuid, node_uuid)
+        stale.deactivate(context, node)
+
+
+def reconcile(context=None, dry_run=False, limit=None):
+    """Find the nodes that drifted from the active leases and fix them.
+
+    :param context: request context.
+    :param dry_run: only report the mismatches.
+    :param limit: the most nodes to fix; the rest wait for the next run.
+    :returns: the mismatches found.
+    """
+    nodes = ironic.get_node_list()
+    mismatches = find_mismatches(nodes, *_get_leases(context))
+    if dry_run:
+        return mismatches
+
+    for mismatch in mismatches[:limit]:
+        try:
+            _fix(context, mismatch.node_uuid)
+        except Exception as e:
+            LOG.info(
+                "Error reconciling node %s: %s: %s"
+                % (mismatch.node_uuid, type(e).__name__, e)
+            )
+    return mismatches
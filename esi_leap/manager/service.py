@@ -11,11 +11,18 @@
 #    under the License.
 
 
+from esi_leap.common import inventory
+from esi_leap.common import metrics
+from esi_leap.common import profiler
+from esi_leap.common import retry
 from esi_leap.common import statuses
 import esi_leap.conf
+from esi_leap.manager import reconcile
 from esi_leap.manager import utils
+from esi_leap.objects import base as objects_base
 from esi_leap.objects import lease as lease_obj
 from esi_leap.objects import offer as offer_obj
+from esi_leap import resource_objects
 from oslo_context import context as ctx
 from oslo_log import log as logging
 import oslo_messaging as messaging
@@ -27,9 +34,14 @@ EVENT_INTERVAL = 60
 LOG = logging.getLogger(__name__)
 
 
+def _paused(resource_type):
+    return retry.is_open(resource_objects.get_type(resource_type).backend)
+
+
 class ManagerService(service.Service):
     def __init__(self):
         super(ManagerService, self).__init__()
+        profiler.setup("esi-leap-manager")
         LOG.info("Creating esi-leap manager RPC server")
         self._server = messaging.get_rpc_server(
             target=utils.get_target(),
@@ -43,6 +55,9 @@ class ManagerService(service.Service):
 
     def start(self):
         super(ManagerService, self).start()
+        if CONF.metrics.enabled:
+            metrics.instrument_db()
+            metrics.start_http_server()
         LOG.info("Starting esi-leap manager RPC server")
         self.tg.add_thread(self._server.start)
         LOG.info("Starting _fulfill_leases periodic job")
@@ -53,31 +68,50 @@ class ManagerService(service.Service):
         self.tg.add_timer(EVENT_INTERVAL, self._cancel_leases)
         LOG.info("Starting _expire_offers periodic job")
         self.tg.add_timer(EVENT_INTERVAL, self._expire_offers)
+        LOG.info("Starting _report_retries periodic job")
+        self.tg.add_timer(EVENT_INTERVAL, self._report_retries)
+        if CONF.outbox.enabled:
+            LOG.info("Starting _apply_resource_operations periodic job")
+            self.tg.add_timer(CONF.outbox.interval, self._apply_resource_operations)
+        if CONF.reconcile.enabled:
+            LOG.info("Starting _reconcile_nodes periodic job")
+            self.tg.add_timer(CONF.reconcile.interval, self._reconcile_nodes)
+        if CONF.inventory.enabled:
+            LOG.info("Starting _sync_inventory periodic job")
+            self.tg.add_timer(CONF.inventory.sync_interval, self._sync_inventory)
 
     def stop(self):
         super(ManagerService, self).stop()
         LOG.info("Shutting down esi-leap manager RPC server")
         self._server.stop()
 
+    @metrics.timed_job("fulfill_leases")
     def _fulfill_leases(self):
         LOG.info("Checking for leases to fulfill")
+        now = timeutils.utcnow()
         leases = lease_obj.Lease.get_all(
-            {"status": [statuses.CREATED, statuses.WAIT_FULFILL]}, self._context
+            {"status": [statuses.CREATED, statuses.WAIT_FULFILL], "retry_due": now},
+            self._context,
         )
-        now = timeutils.utcnow()
+        metrics.set_backlog("fulfill_leases", len(leases))
         for lease in leases:
             if lease.start_time <= now and now <= lease.end_time:
                 try:
+                    if _paused(lease.resource_type):
+                        continue
                     LOG.info("Fulfilling lease %s", lease.uuid)
-                    lease.fulfill(self._context)
+                    with objects_base.read_cache():
+                        lease.fulfill(self._context)
                 except Exception as e:
                     LOG.info("Error fulfilling lease: %s: %s" % (type(e).__name__, e))
                     LOG.info("Setting lease status to ERROR")
                     lease.status = statuses.ERROR
                     lease.save()
 
+    @metrics.timed_job("expire_leases")
     def _expire_leases(self):
         LOG.info("Checking for expiring leases")
+        now = timeutils.utcnow()
         leases = lease_obj.Lease.get_all(
             {
                 "status": [
@@ -85,58 +119,130 @@ class ManagerService(service.Service):
                     statuses.CREATED,
                     statuses.WAIT_EXPIRE,
                     statuses.WAIT_FULFILL,
-                ]
+                ],
+                "retry_due": now,
+                "retry_status": [statuses.WAIT_EXPIRE],
             },
             self._context,
         )
-        now = timeutils.utcnow()
+        metrics.set_backlog("expire_leases", len(leases))
         for lease in leases:
             if lease.end_time <= now:
                 try:
+                    if _paused(lease.resource_type):
+                        continue
                     LOG.info("Expiring lease %s", lease.uuid)
-                    lease.expire(self._context)
+                    with objects_base.read_cache():
+                        lease.expire(self._context)
                 except Exception as e:
                     LOG.info("Error expiring lease: %s: %s" % (type(e).__name__, e))
                     LOG.info("Setting lease status to ERROR")
                     lease.status = statuses.ERROR
                     lease.save()
 
+    @metrics.timed_job("cancel_leases")
     def _cancel_leases(self):
         LOG.info("Checking for leases to cancel")
         leases = lease_obj.Lease.get_all(
-            {"status": [statuses.WAIT_CANCEL]}, self._context
+            {"status": [statuses.WAIT_CANCEL], "retry_due": timeutils.utcnow()},
+            self._context,
         )
+        if CONF.outbox.enabled:
+            # leave leases with queued operations to the outbox
+            queued = lease_obj.get_queued_lease_uuids()
+            leases = [lease for lease in leases if lease.uuid not in queued]
+        metrics.set_backlog("cancel_leases", len(leases))
         for lease in leases:
             try:
+                if _paused(lease.resource_type):
+                    continue
                 LOG.info("Cancelling lease %s", lease.uuid)
-                lease.cancel()
+                with objects_base.read_cache():
+                    lease.cancel()
             except Exception as e:
                 LOG.info("Error cancelling lease: %s: %s" % (type(e).__name__, e))
                 LOG.info("Setting lease status to ERROR")
                 lease.status = statuses.ERROR
                 lease.save()
 
+    @metrics.timed_job("expire_offers")
     def _expire_offers(self):
         LOG.info("Checking for expiring offers")
         offers = offer_obj.Offer.get_all(
             {"status": statuses.OFFER_CAN_DELETE}, self._context
         )
+        metrics.set_backlog("expire_offers", len(offers))
 
         for offer in offers:
             if offer.end_time and offer.end_time <= timeutils.utcnow():
                 try:
+                    if _paused(offer.resource_type):
+                        continue
                     LOG.info(
                         "Expiring offer %s for %s %s",
                         offer.uuid,
                         offer.resource_type,
                         offer.resource_uuid,
                     )
-                    offer.expire(self._context)
+                    with objects_base.read_cache():
+                        offer.expire(self._context)
                 except Exception as e:
                     LOG.info("Error expiring offer: %s: %s" % (type(e).__name__, e))
                     offer.status = statuses.ERROR
                     offer.save()
 
+    @metrics.timed_job("apply_resource_operations")
+    def _apply_resource_operations(self):
+        LOG.info("Applying queued resource operations")
+        try:
+            with objects_base.read_cache():
+                count = lease_obj.apply_resource_operations(
+                    self._context, CONF.outbox.batch_size
+                )
+            metrics.set_backlog("apply_resource_operations", count)
+        except Exception as e:
+            LOG.info(
+                "Error applying resource operations: %s: %s" % (type(e).__name__, e)
+            )
+
+    @metrics.timed_job("report_retries")
+    def _report_retries(self):
+        for status, count in lease_obj.get_retry_queue_depth().items():
+            metrics.set_retry_queue_depth(status, count)
+        for breaker in retry.get_breakers():
+            metrics.set_breaker_open(breaker.name, breaker.is_open)
+
+    @metrics.timed_job("reconcile_nodes")
+    def _reconcile_nodes(self):
+        LOG.info("Reconciling nodes with active leases")
+        try:
+            mismatches = reconcile.reconcile(
+                self._context,
+                dry_run=CONF.reconcile.dry_run,
+                limit=CONF.reconcile.batch_size,
+            )
+        except Exception as e:
+            LOG.info("Error reconciling nodes: %s: %s" % (type(e).__name__, e))
+            return
+        metrics.set_backlog("reconcile_nodes", len(mismatches))
+        for mismatch in mismatches:
+            LOG.info(
+                "Node %(node)s has lease %(found)s, expected %(expected)s",
+                {
+                    "node": mismatch.node_uuid,
+                    "found": mismatch.found,
+                    "expected": mismatch.expected,
+                },
+            )
+
+    @metrics.timed_job("sync_inventory")
+    def _sync_inventory(self):
+        LOG.info("Syncing resource inventory")
+        try:
+            inventory.sync()
+        except Exception as e:
+            LOG.info("Error syncing resource inventory: %s: %s" % (type(e).__name__, e))
+
 
 class ManagerEndpoint(object):
     target = utils.get_target()
@@ -9,6 +9,9 @@
 #    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 #    License for the specific language governing permissions and limitations
 #    under the License.
+import contextlib
+import threading
+
 from oslo_log import log
 from oslo_versionedobjects import base as object_base
 
@@ -17,6 +20,44 @@ from esi_leap.objects import fields as object_fields
 
 LOG = log.getLogger(__name__)
 
+_LOCAL = threading.local()
+
+
+def start_read_cache():
+    """Start caching single-object lookups by uuid in this thread.
+
+    Used for the span of an API request or of one manager unit of work, so
+    that an object looked up several times is read from the database once.
+    """
+    _LOCAL.cache = {}
+
+
+def stop_read_cache():
+    _LOCAL.cache = None
+
+
+def clear_read_cache():
+    """Drop the objects cached so far, keeping the cache active."""
+    cache = getattr(_LOCAL, "cache", None)
+    if cache is not None:
+        cache.clear()
+
+
+@contextlib.contextmanager
+def read_cache():
+    """Cache single-object lookups for the duration of the block.
+
+    Nested blocks share the outermost cache.
+    """
+    if getattr(_LOCAL, "cache", None) is not None:
+        yield
+        return
+    start_read_cache()
+    try:
+        yield
+    finally:
+        stop_read_cache()
+
 
 class ESILEAPObject(object_base.VersionedObject):
     OBJ_SERIAL_NAMESPACE = "esi_leap_object"
@@ -39,6 +80,43 @@ class ESILEAPObject(object_base.VersionedObject):
     def _from_db_object_list(cls, context, db_objs):
         return [cls._from_db_object(context, cls(), db_obj) for db_obj in db_objs]
 
+    @classmethod
+    def _get_cached(cls, uuid, context, get_db_obj):
+        """Look up an object by uuid through the read cache, if one is active.
+
+        Callers get their own copy of the cached object, so changes they
+        make are not seen by later lookups until they are saved.
+
+        :param uuid: uuid of the object.
+        :param context: request context to set on the returned object.
+        :param get_db_obj: function reading the object from the database.
+        """
+        cache = getattr(_LOCAL, "cache", None)
+        # objects read from the replica are not reused for primary reads
+        key = (cls.obj_name(), uuid, cls.dbapi.replica_reads_active())
+        if cache is not None and key in cache:
+            obj = cache[key].obj_clone()
+            obj._context = context
+            return obj
+
+        db_obj = get_db_obj(uuid)
+        if not db_obj:
+            return None
+        obj = cls._from_db_object(context, cls(), db_obj)
+        if cache is not None:
+            cache[key] = obj.obj_clone()
+        return obj
+
+    def _invalidate_cached(self):
+        cache = getattr(_LOCAL, "cache", None)
+        if cache is not None:
+            cache.pop((self.obj_name(), self.uuid, False), None)
+            cache.pop((self.obj_name(), self.uuid, True), None)
+
+    @staticmethod
+    def _invalidate_all_cached():
+        clear_read_cache()
+
     def to_dict(self):
         return dict(
             (k, getattr(self, k)) for k in self.fields if self.obj_attr_is_set(k)
@@ -43,6 +43,10 @@ class Event(base.ESILEAPObject):
         db_events = cls.dbapi.event_get_all(filters)
         return cls._from_db_object_list(context, db_events)
 
+    @classmethod
+    def get_version(cls, filters):
+        return cls.dbapi.event_get_version(filters)
+
     def create(self, context=None):
         updates = self.obj_get_changes()
 
@@ -10,10 +10,13 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import contextlib
 import datetime
 
 from esi_leap.common import exception
 from esi_leap.common import notification_utils as notify
+from esi_leap.common import retry
 from esi_leap.common import statuses
 from esi_leap.common import utils
 from esi_leap.db import api as dbapi
@@ -22,9 +25,11 @@ from esi_leap.objects import fields
 from esi_leap.objects import notification
 from esi_leap.objects import offer as offer_obj
 from esi_leap.resource_objects import get_resource_object
+from esi_leap.resource_objects import get_type
 
 from oslo_config import cfg
 from oslo_log import log as logging
+from oslo_utils import timeutils
 from oslo_versionedobjects import base as versioned_objects_base
 
 CONF = cfg.CONF
@@ -124,6 +129,24 @@ CRUD_NOTIFY_OBJ = {
     "lease": (LeaseCRUDNotification, LeaseCRUDPayload),
 }
 
+# action: (log verb, error verb, lease status, lease wait status, offer status)
+SUBTREE_ACTIONS = {
+    "cancel": (
+        "Deleting",
+        "canceling",
+        statuses.DELETED,
+        statuses.WAIT_CANCEL,
+        statuses.DELETED,
+    ),
+    "expire": (
+        "Expiring",
+        "expiring",
+        statuses.EXPIRED,
+        statuses.WAIT_EXPIRE,
+        statuses.EXPIRED,
+    ),
+}
+
 
 @versioned_objects_base.VersionedObjectRegistry.register
 class Lease(base.ESILEAPObject):
@@ -150,15 +173,22 @@ class Lease(base.ESILEAPObject):
 
     @classmethod
     def get(cls, lease_uuid, context=None):
-        db_lease = cls.dbapi.lease_get_by_uuid(lease_uuid)
-        if db_lease:
-            return cls._from_db_object(context, cls(), db_lease)
+        return cls._get_cached(lease_uuid, context, cls.dbapi.lease_get_by_uuid)
 
     @classmethod
     def get_all(cls, filters, context=None):
         db_leases = cls.dbapi.lease_get_all(filters)
         return cls._from_db_object_list(context, db_leases)
 
+    @classmethod
+    def get_version(cls, filters):
+        return cls.dbapi.lease_get_version(filters)
+
+    @classmethod
+    def get_expiring(cls, start, end, status, context=None):
+        db_leases = cls.dbapi.lease_get_expiring(start, end, status)
+        return cls._from_db_object_list(context, db_leases)
+
     def create(self, context=None):
         updates = self.obj_get_changes()
         resource_type = updates["resource_type"]
@@ -180,6 +210,53 @@ class Lease(base.ESILEAPObject):
             db_lease = self.dbapi.lease_create(updates)
             self._from_db_object(context, self, db_lease)
 
+    @classmethod
+    def create_bulk(cls, leases, context=None):
+        """Create leases on distinct offers sharing a time window.
+
+        Either every lease is created or, if any of the offers can no longer
+        be claimed for the window, none of them is.
+        """
+        if not leases:
+            return []
+
+        updates = [lease.obj_get_changes() for lease in leases]
+        start_time = updates[0]["start_time"]
+        end_time = updates[0]["end_time"]
+        offer_uuids = [u["offer_uuid"] for u in updates]
+
+        if start_time >= end_time:
+            raise exception.InvalidTimeRange(
+                resource="lease", start_time=str(start_time), end_time=str(end_time)
+            )
+
+        lock_names = sorted(
+            set(
+                utils.get_resource_lock_name(u["resource_type"], u["resource_uuid"])
+                for u in updates
+            )
+        )
+        with contextlib.ExitStack() as stack:
+            # acquire locks in a fixed order so concurrent bulk claims over
+            # overlapping resources cannot deadlock
+            for lock_name in lock_names:
+                stack.enter_context(utils.lock(lock_name, external=True))
+
+            available = offer_obj.Offer.get_claimable(
+                start_time, end_time, offer_uuids=offer_uuids
+            )
+            if len(available) != len(offer_uuids):
+                raise exception.InsufficientOffers(
+                    available=len(available), count=len(offer_uuids)
+                )
+
+            LOG.info("Creating %d leases", len(leases))
+            db_leases = cls.dbapi.lease_create_bulk(updates)
+            for lease, db_lease in zip(leases, db_leases):
+                cls._from_db_object(context, lease, db_lease)
+
+        return leases
+
     def update(self, updates, context=None):
         # only allow updates to end_time right now
         if "end_time" not in updates:
@@ -212,40 +289,16 @@ class Lease(base.ESILEAPObject):
             self.end_time = new_end_time
             self.save(context)
 
-    def cancel(self, context=None):
-        leases = Lease.get_all(
-            {"parent_lease_uuid": self.uuid, "status": statuses.LEASE_CAN_DELETE}, None
-        )
-        for lease in leases:
-            lease.cancel()
-        offers = offer_obj.Offer.get_all(
-            {"parent_lease_uuid": self.uuid, "status": statuses.OFFER_CAN_DELETE}, None
-        )
-        for offer in offers:
-            offer.cancel()
-
-        with utils.lock(
-            utils.get_resource_lock_name(self.resource_type, self.resource_uuid),
-            external=True,
-        ):
-            LOG.info("Deleting lease %s", self.uuid)
-            try:
-                resource = self.resource_object()
-                self.deactivate(context, resource)
-                self.status = statuses.DELETED
-                self.expire_time = datetime.datetime.now()
-
-            except Exception as e:
-                LOG.info("Error canceling lease: %s: %s" % (type(e).__name__, e))
-                LOG.info("Setting lease status to WAIT")
-                self.status = statuses.WAIT_CANCEL
-            self.save(context)
+    def cancel(self, context=None, deferred=False):
+        deactivate_subtree(context, self, "cancel", deferred)
 
     def destroy(self):
+        self._invalidate_cached()
         self.dbapi.lease_destroy(self.uuid)
         self.obj_reset_changes()
 
     def save(self, context=None):
+        self._invalidate_cached()
         updates = self.obj_get_changes()
         db_lease = self.dbapi.lease_update(self.uuid, updates)
         self._from_db_object(context, self, db_lease)
@@ -256,6 +309,7 @@ class Lease(base.ESILEAPObject):
             external=True,
         ):
             LOG.info("Fulfilling lease %s", self.uuid)
+            retried = self.status == statuses.WAIT_FULFILL
             try:
                 resource = self.resource_object()
                 notify.emit_start_notification(
@@ -278,36 +332,13 @@ class Lease(base.ESILEAPObject):
                 LOG.info("Setting lease status to WAIT")
                 self.status = statuses.WAIT_FULFILL
             self.save(context)
+            if self.status == statuses.WAIT_FULFILL:
+                self.dbapi.lease_schedule_retry([self.uuid], retry.next_retry_time)
+            elif retried:
+                self.dbapi.lease_reset_retry([self.uuid])
 
     def expire(self, context=None):
-        leases = Lease.get_all(
-            {"parent_lease_uuid": self.uuid, "status": statuses.LEASE_CAN_DELETE}, None
-        )
-        for lease in leases:
-            lease.expire(context)
-        offers = offer_obj.Offer.get_all(
-            {"parent_lease_uuid": self.uuid, "status": statuses.OFFER_CAN_DELETE}, None
-        )
-        for offer in offers:
-            offer.expire(context)
-
-        with utils.lock(
-            utils.get_resource_lock_name(self.resource_type, self.resource_uuid),
-            external=True,
-        ):
-            LOG.info("Expiring lease %s", self.uuid)
-            try:
-                # expire lease
-                resource = self.resource_object()
-                self.deactivate(context, resource)
-                self.status = statuses.EXPIRED
-                self.expire_time = datetime.datetime.now()
-
-            except Exception as e:
-                LOG.info("Error expiring lease: %s: %s" % (type(e).__name__, e))
-                LOG.info("Setting lease status to WAIT")
-                self.status = statuses.WAIT_EXPIRE
-            self.save(context)
+        deactivate_subtree(context, self, "expire")
 
     def resource_object(self):
         return get_resource_object(self.resource_type, self.resource_uuid)
@@ -324,11 +355,11 @@ class Lease(base.ESILEAPObject):
             context, self, "delete", CRUD_NOTIFY_OBJ, node=resource
         ):
             if resource.get_lease_uuid() == self.uuid:
-                resource.remove_lease(self)
-
                 if self.parent_lease_uuid is not None:
                     parent_lease = Lease.get(self.parent_lease_uuid)
-                    resource.set_lease(parent_lease)
+                    resource.replace_lease(self, parent_lease)
+                else:
+                    resource.remove_lease(self)
 
         notify.emit_end_notification(
             context, self, "delete", CRUD_NOTIFY_OBJ, node=resource
@@ -367,3 +398,209 @@ class Lease(base.ESILEAPObject):
             ro = get_resource_object(resource_type, resource_uuid)
             ro.verify_availability(start_time, end_time)
         return
+
+
+def deactivate_subtree(context, root, action, deferred=False):
+    """Cancel or expire a lease or offer along with everything beneath it.
+
+    All descendant leases and offers are fetched with one query. Leases are
+    deactivated deepest first, so that a child lease hands its resource back
+    to its parent before the parent is deactivated; the resulting status
+    changes are then committed together in a single transaction.
+
+    If deferred, the resources are left alone: the leases are set to their
+    wait status and one resource operation per lease is queued in the same
+    transaction, for the manager to apply with apply_resource_operations.
+
+    :param context: request context.
+    :param root: the Lease or Offer object being cancelled or expired.
+    :param action: either "cancel" or "expire".
+    :param deferred: whether to queue the resource changes.
+    """
+    log_verb, err_verb, lease_status, wait_status, offer_status = SUBTREE_ACTIONS[
+        action
+    ]
+
+    if isinstance(root, Lease):
+        db_leases, db_offers = Lease.dbapi.lease_get_subtree(lease_uuid=root.uuid)
+        leases = Lease._from_db_object_list(context, db_leases) + [root]
+        offer_uuids = [o["uuid"] for o in db_offers]
+    else:
+        db_leases, db_offers = Lease.dbapi.lease_get_subtree(offer_uuid=root.uuid)
+        leases = Lease._from_db_object_list(context, db_leases)
+        offer_uuids = [o["uuid"] for o in db_offers] + [root.uuid]
+
+    if deferred:
+        _queue_deactivation(root, leases, offer_uuids, action)
+        return
+
+    deactivated = []
+    waiting = []
+    for lease in leases:
+        with utils.lock(
+            utils.get_resource_lock_name(lease.resource_type, lease.resource_uuid),
+            external=True,
+        ):
+            LOG.info("%s lease %s", log_verb, lease.uuid)
+            try:
+                lease.deactivate(context, lease.resource_object())
+                deactivated.append(lease)
+            except Exception as e:
+                LOG.info("Error %s lease: %s: %s" % (err_verb, type(e).__name__, e))
+                LOG.info("Setting lease status to WAIT")
+                waiting.append(lease)
+
+    expire_time = datetime.datetime.now()
+    Lease._invalidate_all_cached()
+    Lease.dbapi.lease_offer_bulk_update(
+        [
+            (
+                [lease.uuid for lease in deactivated],
+                {
+                    "status": lease_status,
+                    "expire_time": expire_time,
+                    "retry_count": 0,
+                    "next_retry_time": None,
+                },
+            ),
+            ([lease.uuid for lease in waiting], {"status": wait_status}),
+        ],
+        [(offer_uuids, {"status": offer_status})],
+    )
+    Lease.dbapi.lease_schedule_retry(
+        [lease.uuid for lease in waiting], retry.next_retry_time
+    )
+
+    for lease in deactivated:
+        lease.status = lease_status
+        lease.expire_time = expire_time
+        lease.obj_reset_changes(["status", "expire_time"])
+    for lease in waiting:
+        lease.status = wait_status
+        lease.obj_reset_changes(["status"])
+    if not isinstance(root, Lease):
+        root.status = offer_status
+        root.obj_reset_changes(["status"])
+
+
+def _queue_deactivation(root, leases, offer_uuids, action):
+    wait_status, offer_status = SUBTREE_ACTIONS[action][3:]
+
+    LOG.info("Queueing %s of %d leases", action, len(leases))
+    Lease._invalidate_all_cached()
+    Lease.dbapi.lease_offer_bulk_update(
+        [([lease.uuid for lease in leases], {"status": wait_status})],
+        [(offer_uuids, {"status": offer_status})],
+        operations=[
+            {
+                "action": action,
+                "resource_type": lease.resource_type,
+                "resource_uuid": lease.resource_uuid,
+                "lease_uuid": lease.uuid,
+            }
+            for lease in leases
+        ],
+    )
+
+    for lease in leases:
+        lease.status = wait_status
+        lease.obj_reset_changes(["status"])
+    if not isinstance(root, Lease):
+        root.status = offer_status
+        root.obj_reset_changes(["status"])
+
+
+def get_queued_lease_uuids():
+    """Return the uuids of the leases with queued resource operations."""
+    return {op.lease_uuid for op in Lease.dbapi.resource_operation_get_all({})}
+
+
+def apply_resource_operations(context, limit):
+    """Apply a batch of the resource operations queued by deactivate_subtree.
+
+    Operations are grouped by resource and applied in the order they were
+    queued, holding the resource lock once per resource. Deactivating a
+    lease that no longer holds its resource does nothing, so an operation
+    may safely be applied again. If an operation fails, the attempt is
+    counted and the remaining operations on that resource back off along
+    with it; once it has failed [outbox]max_attempts times, its lease is
+    set to ERROR and the operation dropped. Resources whose backend
+    circuit breaker is open are skipped. The applied and dropped
+    operations are removed, and their leases set to their final status,
+    in a single transaction.
+
+    :param context: request context.
+    :param limit: the most operations to apply.
+    :returns: the number of operations found.
+    """
+    operations = Lease.dbapi.resource_operation_get_all(
+        {"due": timeutils.utcnow(), "limit": limit}
+    ).all()
+
+    by_resource = collections.OrderedDict()
+    for op in operations:
+        by_resource.setdefault((op.resource_type, op.resource_uuid), []).append(op)
+
+    applied = []
+    done = collections.defaultdict(list)
+    failed = []
+    for (resource_type, resource_uuid), ops in by_resource.items():
+        if retry.is_open(get_type(resource_type).backend):
+            continue
+        with utils.lock(
+            utils.get_resource_lock_name(resource_type, resource_uuid),
+            external=True,
+        ):
+            for op in ops:
+                try:
+                    lease = Lease.get(op.lease_uuid, context)
+                    if lease is not None:
+                        LOG.info("Applying %s of lease %s", op.action, lease.uuid)
+                        lease.deactivate(context, lease.resource_object())
+                        done[op.action].append(lease.uuid)
+                except Exception as e:
+                    error = "%s: %s" % (type(e).__name__, e)
+                    LOG.info("Error applying %s of lease: %s" % (op.action, error))
+                    if op.attempts + 1 < CONF.outbox.max_attempts:
+                        Lease.dbapi.resource_operation_fail(
+                            op.id, error, retry.next_retry_time(op.attempts + 1)
+                        )
+                        break
+                    LOG.info("Setting lease status to ERROR")
+                    failed.append(op.lease_uuid)
+                applied.append(op.id)
+
+    if applied:
+        expire_time = datetime.datetime.now()
+        Lease._invalidate_all_cached()
+        Lease.dbapi.resource_operation_complete(
+            applied,
+            [
+                (
+                    uuids,
+                    {
+                        "status": SUBTREE_ACTIONS[action][2],
+                        "expire_time": expire_time,
+                        "retry_count": 0,
+                        "next_retry_time": None,
+                    },
+                )
+                for action, uuids in done.items()
+            ]
+            + [
+                (
+                    failed,
+                    {
+                        "status": statuses.ERROR,
+                        "retry_count": 0,
+                        "next_retry_time": None,
+                    },
+                )
+            ],
+        )
+    return len(operations)
+
+
+def get_retry_queue_depth():
+    """Return the number of leases in each wait status."""
+    return Lease.dbapi.lease_get_retry_queue_depth()
@@ -10,9 +10,11 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import contextlib
 import datetime
 
 from esi_leap.common import exception
+from esi_leap.common import intervals
 from esi_leap.common import statuses
 from esi_leap.common import utils
 from esi_leap.db import api as dbapi
@@ -50,67 +52,52 @@ class Offer(base.ESILEAPObject):
 
     @classmethod
     def get(cls, offer_uuid, context=None):
-        db_offer = cls.dbapi.offer_get_by_uuid(offer_uuid)
-        if db_offer:
-            return cls._from_db_object(context, cls(), db_offer)
+        return cls._get_cached(offer_uuid, context, cls.dbapi.offer_get_by_uuid)
 
     @classmethod
     def get_all(cls, filters, context=None):
         db_offers = cls.dbapi.offer_get_all(filters)
         return cls._from_db_object_list(context, db_offers)
 
+    @classmethod
+    def get_version(cls, filters):
+        return cls.dbapi.offer_get_version(filters)
+
+    @classmethod
+    def get_next_change_time(cls, filters, now):
+        return cls.dbapi.offer_get_next_change_time(filters, now)
+
+    @classmethod
+    def get_claimable(
+        cls,
+        start_time,
+        end_time,
+        resource_type=None,
+        lessee_id=None,
+        offer_uuids=None,
+        context=None,
+    ):
+        db_offers = cls.dbapi.offer_get_claimable(
+            start_time,
+            end_time,
+            resource_type=resource_type,
+            lessee_id=lessee_id,
+            offer_uuids=offer_uuids,
+        )
+        return cls._from_db_object_list(context, db_offers)
+
     def get_availabilities(self):
         if self.status != statuses.AVAILABLE:
             return []
 
-        conflicts = self.dbapi.offer_get_conflict_times(self)
         now = datetime.datetime.now()
         start_time = self.start_time if self.start_time >= now else now
+        conflicts = self.dbapi.offer_get_conflict_times(self, start_time)
 
-        if conflicts:
-            # if the conflicts are all in the past:
-            if conflicts[-1][1] <= start_time:
-                avails = [[start_time, self.end_time]]
-            else:
-                # if the offer starts in the future or
-                # the first conflict time is in the future,
-                # add the $start_time and first conflict start_time
-                # in the array
-                if start_time < conflicts[0][0]:
-                    times = [start_time, conflicts[0][0]]
-                    for i in range(len(conflicts) - 1):
-                        times.append(conflicts[i][1])
-                        times.append(conflicts[i + 1][0])
-                else:
-                    times = []
-                    for i in range(len(conflicts) - 1):
-                        # Find the conflict timeframe that started
-                        # in the past and will end in the future.
-                        # add all times after this
-                        if (
-                            conflicts[i][0] <= start_time
-                            and conflicts[i][1] > start_time
-                        ) or conflicts[i][0] > start_time:
-                            times.append(conflicts[i][1])
-                            times.append(conflicts[i + 1][0])
-
-                times.append(conflicts[-1][1])
-                times.append(self.end_time)
-
-                i = 0
-                while i < len(times) - 1:
-                    if times[i] == times[i + 1]:
-                        times.pop(i)
-                        times.pop(i)
-                    else:
-                        i += 1
-
-                avails = [[times[j], times[j + 1]] for j in range(0, len(times) - 1, 2)]
-
-        else:
-            avails = [[start_time, self.end_time]]
-
-        return avails
+        return [
+            [start, end]
+            for start, end in intervals.subtract(start_time, self.end_time, conflicts)
+        ]
 
     def get_next_lease_start_time(self, start):
         return self.dbapi.offer_get_next_lease_start_time(self.uuid, start)
@@ -151,44 +138,79 @@ class Offer(base.ESILEAPObject):
             db_offer = self.dbapi.offer_create(updates)
             self._from_db_object(context, self, db_offer)
 
-    def cancel(self):
-        LOG.info("Deleting offer %s", self.uuid)
-        leases = lease_obj.Lease.get_all(
-            {"offer_uuid": self.uuid, "status": statuses.LEASE_CAN_DELETE}, None
-        )
-        for lease in leases:
-            lease.cancel()
+    @classmethod
+    def create_bulk(cls, offers, context=None):
+        """Create offers for distinct resources sharing a time window.
+
+        Offers whose resource has a conflicting offer or lease are not
+        created. Returns the created offers and a dict mapping the resource
+        uuid of each rejected offer to the error that rejected it.
+        """
+        if not offers:
+            return [], {}
+
+        updates = [o.obj_get_changes() for o in offers]
+        resource_type = updates[0]["resource_type"]
+        start_time = updates[0]["start_time"]
+        end_time = updates[0]["end_time"]
+        resource_uuids = sorted(u["resource_uuid"] for u in updates)
+
+        if start_time >= end_time:
+            raise exception.InvalidTimeRange(
+                resource="offer",
+                start_time=str(start_time),
+                end_time=str(end_time),
+            )
+
+        with contextlib.ExitStack() as stack:
+            # acquire locks in a fixed order so concurrent bulk requests
+            # over overlapping resources cannot deadlock
+            for resource_uuid in resource_uuids:
+                stack.enter_context(
+                    utils.lock(
+                        utils.get_resource_lock_name(resource_type, resource_uuid),
+                        external=True,
+                    )
+                )
 
-        with utils.lock(
-            utils.get_resource_lock_name(self.resource_type, self.resource_uuid),
-            external=True,
-        ):
-            self.status = statuses.DELETED
-            self.save(None)
+            LOG.info("Creating %d offers", len(offers))
+            conflicts = cls.dbapi.resource_get_conflicts(
+                resource_type, resource_uuids, start_time, end_time
+            )
+            errors = {
+                resource_uuid: exception.ResourceTimeConflict(
+                    resource_uuid=resource_uuid, resource_type=resource_type
+                )
+                for resource_uuid in conflicts
+            }
+
+            created = [o for o in offers if o.resource_uuid not in errors]
+            db_offers = cls.dbapi.offer_create_bulk(
+                [u for u in updates if u["resource_uuid"] not in errors]
+            )
+            for offer, db_offer in zip(created, db_offers):
+                cls._from_db_object(context, offer, db_offer)
+
+        return created, errors
+
+    def cancel(self, deferred=False):
+        LOG.info("Deleting offer %s", self.uuid)
+        lease_obj.deactivate_subtree(None, self, "cancel", deferred)
 
     def expire(self, context=None):
         LOG.info("Expiring offer %s", self.uuid)
-        leases = lease_obj.Lease.get_all(
-            {"offer_uuid": self.uuid, "status": statuses.LEASE_CAN_DELETE}, None
-        )
-        for lease in leases:
-            lease.expire(context)
-
-        with utils.lock(
-            utils.get_resource_lock_name(self.resource_type, self.resource_uuid),
-            external=True,
-        ):
-            self.status = statuses.EXPIRED
-            self.save(context)
+        lease_obj.deactivate_subtree(context, self, "expire")
 
     def verify_availability(self, start_time, end_time):
         return self.dbapi.offer_verify_availability(self, start_time, end_time)
 
     def destroy(self):
+        self._invalidate_cached()
         self.dbapi.offer_destroy(self.uuid)
         self.obj_reset_changes()
 
     def save(self, context=None):
+        self._invalidate_cached()
         updates = self.obj_get_changes()
         db_offer = self.dbapi.offer_update(self.uuid, updates)
         self._from_db_object(context, self, db_offer)
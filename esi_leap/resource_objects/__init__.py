@@ -33,3 +33,7 @@ def get_type(resource_type):
 
 def get_resource_object(resource_type, resource_ident):
     return get_type(resource_type)(resource_ident)
+
+
+def get_many(resource_type, idents, resource_list=None):
+    return get_type(resource_type).get_many(idents, resource_list)
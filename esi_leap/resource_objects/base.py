@@ -19,6 +19,23 @@ class ResourceObjectInterface(object, metaclass=abc.ABCMeta):
     dbapi = dbapi.get_instance()
 
     resource_type = "base"
+    # remote service the resources live in, whose circuit breaker pauses
+    # the manager's lease transitions while the service is failing
+    backend = None
+
+    @classmethod
+    def get_many(cls, idents, resource_list=None):
+        """Return the resources with the given uuids or names, keyed by ident.
+
+        Resource types backed by a remote service override this to resolve
+        all of the idents with a single call. Idents which cannot be
+        resolved may be left out of the result.
+
+        :param idents: uuids or names of the resources.
+        :param resource_list: optional list of resources already fetched
+            from the backend, to resolve the idents from.
+        """
+        return {ident: cls(ident) for ident in idents}
 
     @abc.abstractmethod
     def get_uuid(self):
@@ -37,7 +54,7 @@ class ResourceObjectInterface(object, metaclass=abc.ABCMeta):
         """Return resource's associated properties, if any"""
 
     @abc.abstractmethod
-    def get_owner_project_id(self):
+    def get_owner_project_id(self, resource_list=None):
         """Return the project id of the resource's owner"""
 
     @abc.abstractmethod
@@ -64,6 +81,16 @@ class ResourceObjectInterface(object, metaclass=abc.ABCMeta):
     def remove_lease(self, lease):
         """Disassociates a lease from the resource"""
 
+    def replace_lease(self, lease, new_lease):
+        """Disassociates a lease and associates another in its place
+
+        Used to hand a resource back to the parent lease of an ending
+        sub-lease. Resource types that can make both changes in a single
+        update override this.
+        """
+        self.remove_lease(lease)
+        self.set_lease(new_lease)
+
     def verify_availability(self, start_time, end_time):
         self.dbapi.resource_verify_availability(
             self.resource_type,
@@ -14,6 +14,7 @@ import json
 import os.path
 
 from oslo_log import log as logging
+from osprofiler import profiler
 
 from esi_leap.common import exception
 import esi_leap.conf
@@ -27,6 +28,7 @@ DUMMY_NODE_DIR = CONF.dummy_node.dummy_node_dir
 LOG = logging.getLogger(__name__)
 
 
+@profiler.trace_cls("resource", hide_args=True)
 class DummyNode(base.ResourceObjectInterface):
     resource_type = "dummy_node"
 
@@ -57,10 +59,11 @@ class DummyNode(base.ResourceObjectInterface):
             err_val=error.UNKNOWN["properties"],
         )
 
-    def get_owner_project_id(self):
+    def get_owner_project_id(self, resource_list=None):
         return self._get_node_attr(
             "project_owner_id",
             None,
+            resource_list=resource_list,
             err_msg="Error getting owner project id",
             err_val=error.UNKNOWN["owner_project_id"],
         )
@@ -13,9 +13,11 @@
 from ironicclient.common.apiclient import exceptions as ir_exception
 from oslo_log import log as logging
 from oslo_utils.uuidutils import is_uuid_like
+from osprofiler import profiler
 
 from esi_leap.common import exception
 from esi_leap.common import ironic
+from esi_leap.common import metrics
 import esi_leap.conf
 from esi_leap.resource_objects import base
 from esi_leap.resource_objects import error
@@ -34,17 +36,57 @@ def get_ironic_client():
     return _cached_ironic_client
 
 
+@profiler.trace_cls("resource", hide_args=True)
 class IronicNode(base.ResourceObjectInterface):
     resource_type = "ironic_node"
-
-    def __init__(self, ident):
-        if not is_uuid_like(ident):
-            self._node = get_ironic_client().node.get(ident)
+    backend = "ironic"
+
+    def __init__(self, ident, node=None):
+        if node is not None:
+            self._node = node
+            self._uuid = node.uuid
+        elif not is_uuid_like(ident):
+            client = get_ironic_client()
+            with metrics.external_call("ironic", "node.get"):
+                self._node = client.node.get(ident, fields=list(ironic.NODE_FIELDS))
             self._uuid = self._node.uuid
         else:
             self._node = None
             self._uuid = ident
 
+    @classmethod
+    def get_many(cls, idents, resource_list=None):
+        """Return the nodes with the given uuids or names, keyed by ident.
+
+        The nodes are resolved from resource_list, or from a single node
+        list call, and are returned with their node data loaded. Idents
+        matching no node are left out.
+        """
+        idents = set(idents)
+        if not idents:
+            return {}
+        if resource_list is None:
+            if len(idents) == 1:
+                # a single node get is cheaper than listing every node
+                ident = idents.pop()
+                try:
+                    return {ident: cls(ident, node=ironic.get_node(ident))}
+                except ir_exception.NotFound:
+                    return {}
+            resource_list = ironic.get_node_list()
+
+        by_ident = {}
+        for node in resource_list:
+            if node.name:
+                by_ident.setdefault(node.name, node)
+        by_ident.update((node.uuid, node) for node in resource_list)
+
+        return {
+            ident: cls(ident, node=by_ident[ident])
+            for ident in idents
+            if ident in by_ident
+        }
+
     def get_uuid(self):
         return self._uuid
 
@@ -76,10 +118,11 @@ class IronicNode(base.ResourceObjectInterface):
         )
         return ironic.get_condensed_properties(properties)
 
-    def get_owner_project_id(self):
+    def get_owner_project_id(self, resource_list=None):
         return self._get_node_attr(
             "owner",
             "",
+            resource_list=resource_list,
             err_msg="Error getting owner project id",
             err_val=error.UNKNOWN["owner_project_id"],
         )
@@ -118,6 +161,18 @@ class IronicNode(base.ResourceObjectInterface):
         )
 
     def set_lease(self, lease):
+        client = get_ironic_client()
+        with metrics.external_call("ironic", "node.update"):
+            client.node.update(self._uuid, self._set_lease_patches(lease))
+
+    def remove_lease(self, lease):
+        self._remove_lease(lease)
+
+    def replace_lease(self, lease, new_lease):
+        # one node update rather than a removal followed by a set
+        self._remove_lease(lease, new_lease)
+
+    def _set_lease_patches(self, lease):
         patches = []
         patches.append(
             {
@@ -133,32 +188,37 @@ class IronicNode(base.ResourceObjectInterface):
                 "value": lease.project_id,
             }
         )
-        get_ironic_client().node.update(self._uuid, patches)
+        return patches
 
-    def remove_lease(self, lease):
+    def _remove_lease(self, lease, new_lease=None):
         patches = []
         uuid = self.get_lease_uuid()
         if uuid != lease.uuid:
             return
-        if uuid:
-            patches.append(
-                {
-                    "op": "remove",
-                    "path": "/properties/lease_uuid",
-                }
-            )
-        if self.get_lessee_project_id():
-            patches.append(
-                {
-                    "op": "remove",
-                    "path": "/lessee",
-                }
-            )
+        if new_lease is not None:
+            patches = self._set_lease_patches(new_lease)
+        else:
+            if uuid:
+                patches.append(
+                    {
+                        "op": "remove",
+                        "path": "/properties/lease_uuid",
+                    }
+                )
+            if self.get_lessee_project_id():
+                patches.append(
+                    {
+                        "op": "remove",
+                        "path": "/lessee",
+                    }
+                )
         if len(patches) > 0:
-            get_ironic_client().node.update(self._uuid, patches)
+            with metrics.external_call("ironic", "node.update"):
+                get_ironic_client().node.update(self._uuid, patches)
         state = self._get_node().provision_state
         if state == "active":
-            get_ironic_client().node.set_provision_state(self._uuid, "deleted")
+            with metrics.external_call("ironic", "node.set_provision_state"):
+                get_ironic_client().node.set_provision_state(self._uuid, "deleted")
 
     def _get_node(self, resource_list=None):
         try:
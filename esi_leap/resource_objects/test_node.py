@@ -32,7 +32,7 @@ class TestNode(base.ResourceObjectInterface):
     def get_properties(self, resource_list=None):
         return {}
 
-    def get_owner_project_id(self):
+    def get_owner_project_id(self, resource_list=None):
         return self._project_id
 
     def get_lease_uuid(self):
@@ -27,6 +27,12 @@ Before running, ensure the following environment variables are set:
 - LEASE_EXPIRE_TEMPLATE: Path to the email template for lease expiration
   warnings. Default is esi_leap/templates/lease_expire_email.txt
 
+Leases about to expire are read directly from the esi-leap database, so the
+script must be able to load the esi-leap configuration file (for example
+/etc/esi-leap/esi-leap.conf). Leases that have already been warned about are
+recorded in a local SQLite file (.esi-warned-leases.db) next to
+.esi-last-event-id, so each lease is only warned once per end time.
+
 After esi-leap package is installed, set up a periodic cron job to run
 this script at regular intervals. For example, to run the script every day
 at 8:00 AM using the Linux cron utility, add the following line:
@@ -35,13 +41,19 @@ in /etc/crontab file
 """
 
 import datetime
-from dateutil import parser
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 import json
 import os
 import smtplib
+import sqlite3
 import subprocess
+import sys
+
+from esi_leap.common import keystone
+from esi_leap.common import service as esi_leap_service
+from esi_leap.common import statuses
+from esi_leap.objects import lease as lease_obj
 
 try:
     # For python 3.7 and later
@@ -58,6 +70,8 @@ smtp_server = os.getenv("SMTP_SERVER", "localhost")
 email_sender = os.getenv("EMAIL_SENDER")
 lease_warning_days = int(os.getenv("LEASE_WARNING_DAYS", 1))
 
+LEASE_WARNING_STATUSES = [statuses.CREATED, statuses.ACTIVE]
+
 
 def get_template_path(default_template_path, env_var):
     custom_path = os.getenv(env_var)
@@ -88,6 +102,37 @@ def write_last_event_id(last_event_id, file_name=".esi-last-event-id"):
         f.write(str(last_event_id))
 
 
+def get_warned_lease_db(file_name=".esi-warned-leases.db"):
+    conn = sqlite3.connect(file_name)
+    with conn:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS warned_leases ("
+            "lease_uuid TEXT NOT NULL, "
+            "end_time TEXT NOT NULL, "
+            "warned_at TEXT NOT NULL, "
+            "PRIMARY KEY (lease_uuid, end_time))"
+        )
+    return conn
+
+
+def get_warned_leases(conn, now):
+    # leases that have ended can never be warned about again
+    with conn:
+        conn.execute(
+            "DELETE FROM warned_leases WHERE end_time <= ?", (now.isoformat(),)
+        )
+    rows = conn.execute("SELECT lease_uuid, end_time FROM warned_leases")
+    return set(rows.fetchall())
+
+
+def write_warned_lease(conn, lease_uuid, end_time, now):
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO warned_leases VALUES (?, ?, ?)",
+            (lease_uuid, end_time, now.isoformat()),
+        )
+
+
 def notify_lease(project_name, email_body):
     try:
         project = run_openstack_command("openstack project show %s" % project_name)
@@ -120,7 +165,35 @@ def fill_email_template(template_path, **kwargs):
         print("email template path not found")
 
 
+def warn_expiring_leases(conn, now):
+    warned_leases = get_warned_leases(conn, now)
+    leases = lease_obj.Lease.get_expiring(
+        now, now + datetime.timedelta(lease_warning_days), LEASE_WARNING_STATUSES
+    )
+    for lease in leases:
+        end_time = lease.end_time.isoformat()
+        if (lease.uuid, end_time) in warned_leases:
+            continue
+        print("Lease %s is expiring in %s day(s)" % (lease.uuid, lease_warning_days))
+        if enable_email:
+            project_name = keystone.get_project_name(lease.project_id)
+            lease_expire_template_path = get_template_path(
+                "templates/lease_expire_email.txt", "LEASE_EXPIRE_TEMPLATE"
+            )
+            email_body_lease_expire = fill_email_template(
+                lease_expire_template_path,
+                project=project_name,
+                lease_uuid=lease.uuid,
+                end_time=end_time,
+                node_name=lease.resource_object().get_name(),
+            )
+            notify_lease(project_name, email_body_lease_expire)
+        write_warned_lease(conn, lease.uuid, end_time, now)
+
+
 def main():
+    esi_leap_service.prepare_service(sys.argv)
+
     last_event_id = get_last_event_id()
     events = run_openstack_command(
         "openstack esi event list --last-event-id %s" % last_event_id
@@ -154,27 +227,9 @@ def main():
     write_last_event_id(new_last_event_id)
 
     # Checking for leases expire soon
-    leases = run_openstack_command("openstack esi lease list --all")
-    now = datetime.datetime.utcnow()
-    for lease in leases:
-        lease_end = parser.parse(lease["End Time"])
-        if lease_end - now <= datetime.timedelta(lease_warning_days):
-            print(
-                "Lease %s is expiring in %s day(s)"
-                % (lease["UUID"], lease_warning_days)
-            )
-            if enable_email:
-                lease_expire_template_path = get_template_path(
-                    "templates/lease_expire_email.txt", "LEASE_EXPIRE_TEMPLATE"
-                )
-                email_body_lease_expire = fill_email_template(
-                    lease_expire_template_path,
-                    project=lease["Project"],
-                    lease_uuid=lease["UUID"],
-                    end_time=lease["End Time"],
-                    node_name=lease["Resource"],
-                )
-                notify_lease(lease["Project"], email_body_lease_expire)
+    conn = get_warned_lease_db()
+    warn_expiring_leases(conn, datetime.datetime.utcnow())
+    conn.close()
 
 
 if __name__ == "__main__":
@@ -29,6 +29,9 @@ class APITestCase(base.DBTestCase):
         super(APITestCase, self).setUp()
 
         CONF.set_override("auth_enable", False, group="pecan")
+        # fail tests whose requests start issuing a query per row
+        CONF.set_override("request_query_budget", 50, group="query_stats")
+        CONF.set_override("enforce_query_budget", True, group="query_stats")
 
         self.app = pecan.testing.load_test_app(dict(app.get_pecan_config()))
 
@@ -10,9 +10,13 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import datetime
+
 from esi_leap.api.controllers import types as types
+from esi_leap.api.controllers.v1 import offer
 import mock as mock
 import unittest as unittest
+from wsme.rest import json as wjson
 from wsme import types as wtypes
 
 
@@ -38,3 +42,49 @@ class TestCollection(unittest.TestCase):
         )
         self.assertEqual(self.test_collection.get_next(2, kwargs), wtypes.Unset)
         self.assertEqual(self.test_collection.get_next(3, kwargs), link)
+
+
+class TestToJson(unittest.TestCase):
+    def setUp(self):
+        start = datetime.datetime(2016, 7, 16, 19, 20, 30)
+        self.values = {
+            "uuid": "11111",
+            "name": None,
+            "project_id": "0wn3r",
+            "resource_type": "ironic_node",
+            "resource_uuid": "1111",
+            "resource_properties": {"cpus": 40, "traits": ["a", "b"]},
+            "start_time": start,
+            "end_time": start + datetime.timedelta(days=1),
+            "status": "available",
+            "properties": {},
+            "availabilities": [[start, start + datetime.timedelta(hours=1)]],
+            "not_an_attribute": "ignored",
+        }
+
+    def test_to_json(self):
+        expected = wjson.tojson(offer.Offer, offer.Offer(**self.values))
+
+        result = types.to_json(offer.Offer, self.values)
+
+        self.assertEqual(expected, result)
+        self.assertEqual(list(expected), list(result))
+        self.assertEqual(
+            wjson.encode_result(offer.Offer(**self.values), offer.Offer),
+            wjson.encode_result(result, types.jsontype),
+        )
+
+    def test_to_json_collection(self):
+        collection = offer.OfferCollection()
+        collection.resources_synced_at = datetime.datetime(2016, 7, 16)
+        collection.offers = [offer.Offer(**self.values)]
+        expected = wjson.encode_result(collection, offer.OfferCollection)
+
+        collection.offers = wtypes.Unset
+        result = types.to_json(
+            offer.OfferCollection,
+            collection,
+            offers=[types.to_json(offer.Offer, self.values)],
+        )
+
+        self.assertEqual(expected, wjson.encode_result(result, types.jsontype))
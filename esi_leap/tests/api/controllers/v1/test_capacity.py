@@ -0,0 +1,125 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import http.client as http_client
+import mock
+
+from esi_leap.common import capacity
+from esi_leap.common import exception
+from esi_leap.tests.api import base as test_api_base
+
+
+class TestCapacityController(test_api_base.APITestCase):
+    def setUp(self):
+        super(TestCapacityController, self).setUp()
+
+        self.start = datetime.datetime(2016, 7, 16)
+        self.window = capacity.Window(
+            self.start,
+            self.start + datetime.timedelta(days=100),
+            "offer-uuid",
+            "0wn3r",
+            None,
+            "test_node",
+            "node-uuid",
+        )
+        self.window_lessee = self.window._replace(
+            offer_uuid="offer-uuid-2",
+            lessee_id="other-lessee",
+            resource_uuid="node-uuid-2",
+        )
+        self.expected = {
+            "offer_uuid": "offer-uuid",
+            "resource_type": "test_node",
+            "resource_uuid": "node-uuid",
+            "resource": "test-node-node-uuid",
+            "resource_class": "fake",
+            "availability": ["2016-07-16T00:00:00", "2016-10-24T00:00:00"],
+        }
+
+    @mock.patch("esi_leap.common.capacity.get_index")
+    def test_get_free(self, mock_gi):
+        index = mock_gi.return_value
+        index.get_free.return_value = [self.window]
+
+        data = self.get_json(
+            "/capacity?resource_type=test_node&resource_class=fake"
+            "&start_time=2016-07-20T00:00:00&end_time=2016-07-25T00:00:00"
+        )
+
+        index.refresh.assert_called_once_with()
+        index.get_free.assert_called_once_with(
+            "test_node",
+            datetime.datetime(2016, 7, 20),
+            datetime.datetime(2016, 7, 25),
+            mock.ANY,
+        )
+        usable = index.get_free.call_args[0][3]
+        self.assertTrue(usable(self.window))
+        self.assertTrue(usable(self.window_lessee))
+
+        self.expected["start_time"] = "2016-07-20T00:00:00"
+        self.expected["end_time"] = "2016-07-25T00:00:00"
+        self.assertEqual({"capacity": [self.expected]}, data)
+
+    @mock.patch("esi_leap.common.capacity.get_index")
+    def test_get_free_no_time(self, mock_gi):
+        request = self.get_json(
+            "/capacity?resource_type=test_node&start_time=2016-07-20T00:00:00",
+            expect_errors=True,
+        )
+
+        mock_gi.assert_not_called()
+        self.assertEqual(http_client.INTERNAL_SERVER_ERROR, request.status_int)
+
+    @mock.patch("esi_leap.common.keystone.get_parent_project_id_tree")
+    @mock.patch("esi_leap.api.controllers.v1.utils.policy_authorize")
+    @mock.patch("esi_leap.common.capacity.get_index")
+    def test_get_earliest(self, mock_gi, mock_pa, mock_gppit):
+        mock_pa.side_effect = [
+            None,
+            exception.HTTPForbidden(rule="esi_leap:offer:offer_admin"),
+        ]
+        mock_gppit.return_value = [self.context.project_id]
+        index = mock_gi.return_value
+        index.get_earliest.return_value = (self.start, [self.window])
+
+        data = self.get_json(
+            "/capacity?resource_type=test_node&duration=3600&count=1"
+            "&start_time=2016-07-16T00:00:00"
+        )
+
+        index.get_earliest.assert_called_once_with(
+            "test_node",
+            datetime.timedelta(hours=1),
+            1,
+            self.start,
+            mock.ANY,
+        )
+        usable = index.get_earliest.call_args[0][4]
+        self.assertTrue(usable(self.window))
+        self.assertFalse(usable(self.window_lessee))
+
+        self.expected["start_time"] = "2016-07-16T00:00:00"
+        self.expected["end_time"] = "2016-07-16T01:00:00"
+        self.assertEqual({"capacity": [self.expected]}, data)
+
+    @mock.patch("esi_leap.common.capacity.get_index")
+    def test_get_earliest_none(self, mock_gi):
+        index = mock_gi.return_value
+        index.get_earliest.return_value = (None, [])
+
+        data = self.get_json("/capacity?resource_type=test_node&duration=3600&count=5")
+
+        self.assertEqual(5, index.get_earliest.call_args[0][2])
+        self.assertEqual({"capacity": []}, data)
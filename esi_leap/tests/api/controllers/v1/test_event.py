@@ -11,6 +11,7 @@
 #    under the License.
 
 from datetime import datetime
+import http.client as http_client
 import mock
 
 from esi_leap.common import exception
@@ -41,7 +42,7 @@ class TestEventsController(test_api_base.APITestCase):
     @mock.patch("esi_leap.objects.event.Event.get_all")
     def test_get_all(self, mock_ega, mock_gro, mock_gpufi, mock_pa):
         fake_event = FakeEvent()
-        expected_filters = {}
+        expected_filters = {"limit": 1000}
         mock_pa.side_effect = None
         mock_ega.return_value = [fake_event]
 
@@ -53,6 +54,33 @@ class TestEventsController(test_api_base.APITestCase):
         mock_ega.assert_called_once_with(expected_filters, self.context)
 
         self.assertEqual(data["events"][0]["id"], 1)
+        self.assertEqual(data["next_event_id"], 1)
+
+    @mock.patch("esi_leap.objects.event.Event.get_all")
+    def test_get_all_fast_json(self, mock_ega):
+        mock_ega.return_value = [FakeEvent(), FakeEvent()]
+
+        expected = self.get_json("/events", expect_errors=True).body
+        self.config(fast_json=True, group="api")
+        response = self.get_json("/events", expect_errors=True)
+
+        self.assertEqual(http_client.OK, response.status_int)
+        self.assertEqual(expected, response.body)
+
+    @mock.patch("esi_leap.objects.event.Event.get_version")
+    @mock.patch("esi_leap.objects.event.Event.get_all")
+    def test_get_all_not_modified(self, mock_ega, mock_egv):
+        mock_ega.return_value = [FakeEvent()]
+        mock_egv.return_value = (1, datetime(2016, 7, 16, 19, 20, 30))
+
+        etag = self.get_json("/events", expect_errors=True).headers["ETag"]
+        response = self.get_json(
+            "/events", headers={"If-None-Match": etag}, expect_errors=True
+        )
+
+        self.assertEqual(http_client.NOT_MODIFIED, response.status_int)
+        mock_egv.assert_called_with({"limit": 1000})
+        mock_ega.assert_called_once()
 
     @mock.patch("esi_leap.api.controllers.v1.utils.policy_authorize")
     @mock.patch("esi_leap.common.keystone.get_project_uuid_from_ident")
@@ -60,7 +88,7 @@ class TestEventsController(test_api_base.APITestCase):
     @mock.patch("esi_leap.objects.event.Event.get_all")
     def test_get_all_not_admin(self, mock_ega, mock_gro, mock_gpufi, mock_pa):
         fake_event = FakeEvent()
-        expected_filters = {"lessee_or_owner_id": "fake-lessee-id"}
+        expected_filters = {"lessee_or_owner_id": "fake-lessee-id", "limit": 1000}
         mock_pa.side_effect = exception.HTTPForbidden(rule="esi_leap:offer:offer_admin")
         mock_gpufi.return_value = "fake-lessee-id"
         mock_ega.return_value = [fake_event]
@@ -73,6 +101,7 @@ class TestEventsController(test_api_base.APITestCase):
         mock_ega.assert_called_once_with(expected_filters, self.context)
 
         self.assertEqual(data["events"][0]["id"], 1)
+        self.assertEqual(data["next_event_id"], 1)
 
     @mock.patch("esi_leap.api.controllers.v1.utils.policy_authorize")
     @mock.patch("esi_leap.common.keystone.get_project_uuid_from_ident")
@@ -80,7 +109,11 @@ class TestEventsController(test_api_base.APITestCase):
     @mock.patch("esi_leap.objects.event.Event.get_all")
     def test_get_all_resource_filter(self, mock_ega, mock_gro, mock_gpufi, mock_pa):
         fake_event = FakeEvent()
-        expected_filters = {"resource_type": "test_node", "resource_uuid": "1111"}
+        expected_filters = {
+            "resource_type": "test_node",
+            "resource_uuid": "1111",
+            "limit": 1000,
+        }
         mock_pa.side_effect = None
         mock_gro.return_value = TestNode("1111")
         mock_ega.return_value = [fake_event]
@@ -93,3 +126,30 @@ class TestEventsController(test_api_base.APITestCase):
         mock_ega.assert_called_once_with(expected_filters, self.context)
 
         self.assertEqual(data["events"][0]["id"], 1)
+        self.assertEqual(data["next_event_id"], 1)
+
+    @mock.patch("esi_leap.api.controllers.v1.utils.policy_authorize")
+    @mock.patch("esi_leap.objects.event.Event.get_all")
+    def test_get_all_limit(self, mock_ega, mock_pa):
+        mock_ega.return_value = []
+
+        data = self.get_json("/events?last_event_id=7&limit=5000")
+
+        mock_ega.assert_called_once_with(
+            {"last_event_id": 7, "limit": 1000}, self.context
+        )
+        self.assertEqual([], data["events"])
+        self.assertEqual(7, data["next_event_id"])
+
+        mock_ega.reset_mock()
+        data = self.get_json("/events?limit=20")
+
+        mock_ega.assert_called_once_with({"limit": 20}, self.context)
+        self.assertNotIn("next_event_id", data)
+
+    @mock.patch("esi_leap.objects.event.Event.get_all")
+    def test_get_all_invalid_limit(self, mock_ega):
+        response = self.get_json("/events?limit=0", expect_errors=True)
+
+        self.assertEqual(400, response.status_int)
+        mock_ega.assert_not_called()
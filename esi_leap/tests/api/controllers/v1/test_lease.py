@@ -17,6 +17,7 @@ from oslo_context import context as ctx
 from oslo_utils import uuidutils
 import testtools
 
+from esi_leap.api.controllers import types
 from esi_leap.api.controllers.v1.lease import LeasesController
 from esi_leap.common import constants
 from esi_leap.common import exception
@@ -83,6 +84,86 @@ class TestLeasesController(test_api_base.APITestCase):
         mock_gnl.assert_called_once()
         mock_lgdwai.assert_called_once()
 
+    @mock.patch("esi_leap.common.ironic.get_node_list")
+    @mock.patch("esi_leap.common.keystone.get_project_list")
+    @mock.patch("esi_leap.api.controllers.v1.utils." "lease_get_dict_with_added_info")
+    @mock.patch("esi_leap.objects.lease.Lease.get_all")
+    def test_get_all_fast_json(self, mock_ga, mock_lgdwai, mock_gpl, mock_gnl):
+        mock_ga.return_value = [self.test_lease, self.test_lease_with_parent]
+        mock_lgdwai.side_effect = lambda lease, *args, **kwargs: dict(
+            lease.to_dict(),
+            project="lessee",
+            owner="owner",
+            resource="node",
+            resource_class="baremetal",
+            resource_properties={"cpus": 40, "traits": ["a"]},
+            properties={},
+            purpose=None,
+        )
+        mock_gpl.return_value = []
+        mock_gnl.return_value = []
+
+        expected = self.get_json("/leases", expect_errors=True).body
+        self.config(fast_json=True, group="api")
+        with mock.patch(
+            "esi_leap.api.controllers.types.to_json", wraps=types.to_json
+        ) as mock_tj:
+            response = self.get_json("/leases", expect_errors=True)
+
+        self.assertEqual(http_client.OK, response.status_int)
+        self.assertEqual("application/json", response.content_type)
+        self.assertEqual(expected, response.body)
+        self.assertEqual(3, mock_tj.call_count)
+
+    @mock.patch("esi_leap.common.inventory.get_version")
+    @mock.patch("esi_leap.objects.lease.Lease.get_version")
+    @mock.patch("esi_leap.objects.lease.Lease.get_all")
+    def test_get_all_not_modified(self, mock_ga, mock_gv, mock_igv):
+        self.config(enabled=True, group="inventory")
+        mock_ga.return_value = []
+        mock_gv.return_value = (1, datetime.datetime(2016, 7, 16, 19, 20, 30))
+        mock_igv.return_value = (2, datetime.datetime(2016, 7, 16, 19, 20, 30))
+
+        etag = self.get_json("/leases", expect_errors=True).headers["ETag"]
+        response = self.get_json(
+            "/leases", headers={"If-None-Match": etag}, expect_errors=True
+        )
+
+        self.assertEqual(http_client.NOT_MODIFIED, response.status_int)
+        self.assertEqual(etag, response.headers["ETag"])
+        self.assertEqual(b"", response.body)
+        mock_ga.assert_called_once()
+
+        mock_gv.return_value = (2, datetime.datetime(2016, 7, 16, 19, 20, 30))
+        response = self.get_json(
+            "/leases", headers={"If-None-Match": etag}, expect_errors=True
+        )
+
+        self.assertEqual(http_client.OK, response.status_int)
+        self.assertNotEqual(etag, response.headers["ETag"])
+
+    @mock.patch("esi_leap.objects.lease.Lease.get_all")
+    def test_get_all_changes_since(self, mock_ga):
+        mock_ga.return_value = []
+
+        data = self.get_json("/leases?changes_since=2016-07-20T00:00:00")
+
+        mock_ga.assert_called_once_with(
+            {
+                "changes_since": datetime.datetime(2016, 7, 20),
+                "project_or_owner_id": self.context.project_id,
+                "time_filter_type": constants.WITHIN_TIME_FILTER,
+            },
+            self.context,
+        )
+        # with nothing changed the next poll starts from the same place
+        self.assertEqual("2016-07-20T00:00:00", data["next_changes_since"])
+
+    def test_get_all_no_etag_without_inventory(self):
+        response = self.get_json("/leases", expect_errors=True)
+
+        self.assertNotIn("ETag", response.headers)
+
     @mock.patch("esi_leap.api.controllers.v1.utils." "lease_get_dict_with_added_info")
     @mock.patch("esi_leap.api.controllers.v1.lease.get_resource_object")
     @mock.patch("esi_leap.common.keystone.get_project_uuid_from_ident")
@@ -361,6 +442,7 @@ class TestLeasesController(test_api_base.APITestCase):
             owner_id=None,
             resource_type=None,
             resource_uuid=None,
+            changes_since=None,
         )
         mock_get_all.assert_called_once()
         mock_gpl.assert_called_once()
@@ -397,6 +479,7 @@ class TestLeasesController(test_api_base.APITestCase):
             owner_id=None,
             resource_type=None,
             resource_uuid=None,
+            changes_since=None,
         )
         mock_get_all.assert_called_once()
         mock_gpl.assert_called_once()
@@ -434,6 +517,7 @@ class TestLeasesController(test_api_base.APITestCase):
             owner_id="54321",
             resource_type=None,
             resource_uuid=None,
+            changes_since=None,
         )
 
         mock_get_all.assert_called_once()
@@ -472,6 +556,7 @@ class TestLeasesController(test_api_base.APITestCase):
             owner_id=None,
             resource_type="test_node",
             resource_uuid="54321",
+            changes_since=None,
         )
 
         mock_get_all.assert_called_once()
@@ -537,6 +622,7 @@ class TestLeasesController(test_api_base.APITestCase):
             owner_id=None,
             resource_type=None,
             resource_uuid=None,
+            changes_since=None,
         )
 
         mock_get_all.assert_called_once()
@@ -577,6 +663,7 @@ class TestLeasesController(test_api_base.APITestCase):
             owner_id=None,
             resource_type="ironic_node",
             resource_uuid=fake_uuid,
+            changes_since=None,
         )
 
         mock_get_all.assert_called_once()
@@ -597,7 +684,17 @@ class TestLeasesController(test_api_base.APITestCase):
             self.test_lease.uuid,
             statuses.LEASE_CAN_DELETE,
         )
-        mock_cancel.assert_called_once()
+        mock_cancel.assert_called_once_with(self.context, deferred=False)
+
+    @mock.patch("esi_leap.api.controllers.v1.utils." "check_lease_policy_and_retrieve")
+    @mock.patch("esi_leap.objects.lease.Lease.cancel")
+    def test_lease_delete_deferred(self, mock_cancel, mock_clpar):
+        self.config(enabled=True, group="outbox")
+        mock_clpar.return_value = self.test_lease
+
+        self.delete_json("/leases/" + self.test_lease.uuid)
+
+        mock_cancel.assert_called_once_with(self.context, deferred=True)
 
 
 class TestLeaseControllersGetAllFilters(testtools.TestCase):
@@ -648,6 +745,29 @@ class TestLeaseControllersGetAllFilters(testtools.TestCase):
             offer_uuid="offeruuid",
         )
 
+    def test_lease_get_all_changes_since(self):
+        changes_since = datetime.datetime(2016, 7, 20)
+        expected_filters = {
+            "status": ["random"],
+            "changes_since": changes_since,
+            "project_or_owner_id": self.lessee_ctx.project_id,
+            "time_filter_type": constants.WITHIN_TIME_FILTER,
+        }
+
+        filters = LeasesController._lease_get_all_authorize_filters(
+            self.lessee_ctx.to_policy_values(),
+            status="random",
+            changes_since=changes_since,
+        )
+        self.assertEqual(expected_filters, filters)
+
+        # leases in every status are returned unless a status is given
+        del expected_filters["status"]
+        filters = LeasesController._lease_get_all_authorize_filters(
+            self.lessee_ctx.to_policy_values(), changes_since=changes_since
+        )
+        self.assertEqual(expected_filters, filters)
+
     def test_lease_get_all_no_view_project_no_owner(self):
         expected_filters = {
             "status": ["random"],
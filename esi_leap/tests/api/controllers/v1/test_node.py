@@ -10,8 +10,13 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import datetime
+import http.client as http_client
+
 import mock
 
+from esi_leap.common import exception
+from esi_leap.db.sqlalchemy import api as db_api
 from esi_leap.tests.api import base as test_api_base
 
 
@@ -113,3 +118,81 @@ class TestNodesController(test_api_base.APITestCase):
         mock_get_project_uuid.assert_called_once_with("fake-project")
 
         self.assertEqual(data["nodes"][0]["lessee"], "fake-project")
+
+    def _sync_inventory(self, lessee=None):
+        values = {
+            "uuid": "fake-uuid",
+            "name": "fake-node",
+            "resource_class": "baremetal",
+            "owner": "fake-project-uuid",
+            "lessee": lessee,
+            "provision_state": "active",
+            "maintenance": False,
+            "properties": {"cpu": "40"},
+            "lease_uuid": "fake-lease-uuid",
+        }
+        db_api.resource_inventory_sync(
+            [
+                values,
+                dict(values, uuid="fake-uuid-2", owner=self.context.project_id),
+            ],
+            datetime.datetime(2016, 7, 16, 19, 20, 30),
+        )
+
+    @mock.patch("esi_leap.common.ironic.get_node_list")
+    @mock.patch("esi_leap.common.keystone.get_project_list")
+    def test_get_all_inventory(self, mock_gpl, mock_gnl):
+        self.config(enabled=True, group="inventory")
+        self._sync_inventory()
+        mock_gpl.return_value = [FakeProject()]
+
+        data = self.get_json("/nodes?resource_class=baremetal")
+
+        mock_gnl.assert_not_called()
+        self.assertEqual(
+            ["fake-uuid", "fake-uuid-2"], sorted(n["uuid"] for n in data["nodes"])
+        )
+        node = next(n for n in data["nodes"] if n["uuid"] == "fake-uuid")
+        self.assertEqual("fake-project", node["owner"])
+        self.assertEqual("fake-lease-uuid", node["lease_uuid"])
+        self.assertEqual({"cpu": "40"}, node["properties"])
+        self.assertEqual("2016-07-16T19:20:30", data["resources_synced_at"])
+
+    @mock.patch("esi_leap.common.keystone.get_project_list")
+    def test_get_all_inventory_not_modified(self, mock_gpl):
+        self.config(enabled=True, group="inventory")
+        with mock.patch(
+            "oslo_utils.timeutils.utcnow",
+            return_value=datetime.datetime(2016, 7, 16, 19, 20, 30),
+        ):
+            self._sync_inventory()
+        mock_gpl.return_value = [FakeProject()]
+
+        etag = self.get_json("/nodes", expect_errors=True).headers["ETag"]
+        response = self.get_json(
+            "/nodes", headers={"If-None-Match": etag}, expect_errors=True
+        )
+
+        self.assertEqual(http_client.NOT_MODIFIED, response.status_int)
+        mock_gpl.assert_called_once()
+
+        # no ETag is given while the rows may still change within a tick
+        self._sync_inventory(lessee="l3ss33")
+        response = self.get_json(
+            "/nodes", headers={"If-None-Match": etag}, expect_errors=True
+        )
+
+        self.assertEqual(http_client.OK, response.status_int)
+        self.assertNotIn("ETag", response.headers)
+
+    @mock.patch("esi_leap.api.controllers.v1.utils.policy_authorize")
+    @mock.patch("esi_leap.common.keystone.get_project_list")
+    def test_get_all_inventory_not_admin(self, mock_gpl, mock_pa):
+        self.config(enabled=True, group="inventory")
+        self._sync_inventory()
+        mock_gpl.return_value = [FakeProject()]
+        mock_pa.side_effect = exception.HTTPForbidden(rule="esi_leap:offer:offer_admin")
+
+        data = self.get_json("/nodes")
+
+        self.assertEqual(["fake-uuid-2"], [n["uuid"] for n in data["nodes"]])
@@ -116,6 +116,33 @@ class TestOffersController(test_api_base.APITestCase):
         data = self.get_json("/offers")
         self.assertEqual([], data["offers"])
 
+    @mock.patch("esi_leap.common.inventory.get_version")
+    @mock.patch("esi_leap.objects.offer.Offer.get_version")
+    @mock.patch("esi_leap.objects.offer.Offer.get_all")
+    def test_get_all_not_modified(self, mock_ga, mock_gv, mock_igv):
+        self.config(enabled=True, group="inventory")
+        mock_ga.return_value = []
+        mock_gv.return_value = (1, datetime.datetime(2016, 7, 16))
+        mock_igv.return_value = (2, datetime.datetime(2016, 7, 16))
+
+        etag = self.get_json("/offers", expect_errors=True).headers["ETag"]
+        response = self.get_json(
+            "/offers", headers={"If-None-Match": etag}, expect_errors=True
+        )
+
+        self.assertEqual(http_client.NOT_MODIFIED, response.status_int)
+        mock_ga.assert_called_once()
+
+        # other filters select another collection
+        response = self.get_json(
+            "/offers?resource_type=test_node",
+            headers={"If-None-Match": etag},
+            expect_errors=True,
+        )
+
+        self.assertEqual(http_client.OK, response.status_int)
+        self.assertNotEqual(etag, response.headers["ETag"])
+
     @mock.patch("esi_leap.api.controllers.v1.offer.get_resource_object")
     @mock.patch("oslo_utils.uuidutils.generate_uuid")
     @mock.patch("esi_leap.api.controllers.v1.utils.check_resource_admin")
@@ -359,6 +386,83 @@ class TestOffersController(test_api_base.APITestCase):
         mock_ogdwai.assert_not_called()
         self.assertEqual(http_client.FORBIDDEN, request.status_int)
 
+    @mock.patch("esi_leap.common.keystone.get_project_list")
+    @mock.patch("esi_leap.api.controllers.v1.utils.check_resource_admin")
+    @mock.patch("esi_leap.objects.offer.Offer.create_bulk")
+    @mock.patch("esi_leap.api.controllers.v1.utils." "offer_get_dict_with_added_info")
+    def test_bulk(self, mock_ogdwai, mock_create_bulk, mock_cra, mock_gpl):
+        r_uuids = [uuidutils.generate_uuid() for _ in range(3)]
+        forbidden = exception.HTTPResourceForbidden(
+            resource_type="test_node", resource=r_uuids[1]
+        )
+        conflict = exception.ResourceTimeConflict(
+            resource_type="test_node", resource_uuid=r_uuids[2]
+        )
+        mock_cra.side_effect = [None, forbidden, None]
+        mock_create_bulk.return_value = ([], {r_uuids[2]: conflict})
+        mock_ogdwai.return_value = self.test_offer.to_dict()
+        mock_gpl.return_value = []
+
+        data = {
+            "resource_type": "test_node",
+            "resource_uuids": r_uuids + [r_uuids[0]],
+            "name": "bulk_offer",
+            "start_time": "2016-07-16T00:00:00",
+            "end_time": "2016-10-24T00:00:00",
+        }
+
+        request = self.post_json("/offers/bulk", data)
+
+        self.assertEqual(3, mock_cra.call_count)
+        offers = mock_create_bulk.call_args[0][0]
+        self.assertEqual([r_uuids[0], r_uuids[2]], [o.resource_uuid for o in offers])
+        for o in offers:
+            self.assertEqual(self.context.project_id, o.project_id)
+            self.assertEqual("bulk_offer", o.name)
+            self.assertEqual(datetime.datetime(2016, 7, 16), o.start_time)
+            self.assertEqual(datetime.datetime(2016, 10, 24), o.end_time)
+        mock_ogdwai.assert_called_once_with(offers[0], [], None, resource=mock.ANY)
+        resource = mock_ogdwai.call_args[1]["resource"]
+        self.assertEqual(r_uuids[0], resource.get_uuid())
+
+        results = request.json["results"]
+        self.assertEqual(http_client.OK, request.status_int)
+        self.assertEqual(r_uuids + [r_uuids[0]], [r["resource_uuid"] for r in results])
+        self.assertEqual(self.test_offer.uuid, results[0]["offer"]["uuid"])
+        self.assertEqual(str(forbidden), results[1]["error"])
+        self.assertEqual(str(conflict), results[2]["error"])
+        self.assertIn("Time conflict", results[3]["error"])
+        self.assertNotIn("offer", results[3])
+
+    @mock.patch("esi_leap.common.ironic.get_node_list")
+    @mock.patch("esi_leap.common.keystone.get_project_list")
+    @mock.patch("esi_leap.objects.offer.Offer.create_bulk")
+    @mock.patch("esi_leap.api.controllers.v1.utils." "offer_get_dict_with_added_info")
+    def test_bulk_ironic_node(self, mock_ogdwai, mock_create_bulk, mock_gpl, mock_gnl):
+        node = mock.Mock(uuid=uuidutils.generate_uuid(), owner=self.context.project_id)
+        node.name = "node-1"
+        mock_gnl.return_value = [node]
+        mock_gpl.return_value = []
+        mock_create_bulk.return_value = ([], {})
+        mock_ogdwai.return_value = self.test_offer_drt.to_dict()
+
+        data = {"resource_uuids": ["node-1", "node-2"]}
+
+        request = self.post_json("/offers/bulk", data)
+
+        mock_gnl.assert_called_once_with()
+        offers = mock_create_bulk.call_args[0][0]
+        self.assertEqual(1, len(offers))
+        self.assertEqual("ironic_node", offers[0].resource_type)
+        self.assertEqual(node.uuid, offers[0].resource_uuid)
+        mock_ogdwai.assert_called_once_with(offers[0], [], [node], resource=mock.ANY)
+        resource = mock_ogdwai.call_args[1]["resource"]
+        self.assertEqual("node-1", resource.get_name())
+
+        results = request.json["results"]
+        self.assertEqual(self.test_offer_drt.uuid, results[0]["offer"]["uuid"])
+        self.assertIn("node-2", results[1]["error"])
+
     @mock.patch("esi_leap.common.ironic.get_node_list")
     @mock.patch("esi_leap.common.keystone.get_project_list")
     @mock.patch("esi_leap.api.controllers.v1.utils." "offer_get_dict_with_added_info")
@@ -446,6 +550,39 @@ class TestOffersController(test_api_base.APITestCase):
         assert mock_ogdwai.call_count == 2
         self.assertEqual(request, expected_resp)
 
+    @mock.patch("esi_leap.common.ironic.get_node_list")
+    @mock.patch("esi_leap.common.keystone.get_project_list")
+    @mock.patch("esi_leap.api.controllers.v1.utils." "offer_get_dict_with_added_info")
+    @mock.patch("esi_leap.objects.offer.Offer.get_all")
+    def test_get_changes_since(self, mock_get_all, mock_ogdwai, mock_gpl, mock_gnl):
+        # the cursor is the last change time of the offers listed
+        self.test_offer.created_at = datetime.datetime(2016, 7, 20, 6, 0, 0)
+        self.test_offer.updated_at = datetime.datetime(2016, 7, 20, 12, 0, 0)
+        self.test_offer_2.created_at = datetime.datetime(2016, 7, 20, 9, 0, 0)
+        self.test_offer_2.updated_at = None
+        mock_get_all.return_value = [self.test_offer, self.test_offer_2]
+        mock_ogdwai.side_effect = [
+            _get_offer_response(offer, use_datetime=True)
+            for offer in (self.test_offer, self.test_offer_2)
+        ]
+        mock_gpl.return_value = []
+        mock_gnl.return_value = []
+
+        # offers in every status are returned, including deleted ones
+        expected_filters = {"changes_since": datetime.datetime(2016, 7, 20)}
+        expected_resp = {
+            "offers": [
+                _get_offer_response(self.test_offer),
+                _get_offer_response(self.test_offer_2),
+            ],
+            "next_changes_since": "2016-07-20T12:00:00",
+        }
+
+        request = self.get_json("/offers/?changes_since=2016-07-20T00:00:00")
+
+        mock_get_all.assert_called_once_with(expected_filters, self.context)
+        self.assertEqual(expected_resp, request)
+
     @mock.patch("esi_leap.common.ironic.get_node_list")
     @mock.patch("esi_leap.common.keystone.get_project_list")
     @mock.patch("esi_leap.common.keystone.get_project_uuid_from_ident")
@@ -730,4 +867,80 @@ class TestOffersController(test_api_base.APITestCase):
             self.test_offer.uuid,
             statuses.OFFER_CAN_DELETE,
         )
-        mock_cancel.assert_called_once()
+        mock_cancel.assert_called_once_with(deferred=False)
+
+    @mock.patch("esi_leap.api.controllers.v1.utils." "check_offer_policy_and_retrieve")
+    @mock.patch("esi_leap.objects.offer.Offer.cancel")
+    def test_delete_deferred(self, mock_cancel, mock_copar):
+        self.config(enabled=True, group="outbox")
+        mock_copar.return_value = self.test_offer
+
+        self.delete_json("/offers/" + self.test_offer.uuid)
+
+        mock_cancel.assert_called_once_with(deferred=True)
+
+    @mock.patch("esi_leap.common.keystone.get_project_list")
+    @mock.patch("esi_leap.objects.lease.Lease.create_bulk")
+    @mock.patch("esi_leap.objects.offer.Offer.get_claimable")
+    @mock.patch("esi_leap.api.controllers.v1.utils." "lease_get_dict_with_added_info")
+    def test_claim_bulk(self, mock_lgdwai, mock_ogc, mock_create_bulk, mock_gpl):
+        same_resource = offer.Offer(
+            **dict(self.test_offer.to_dict(), uuid=uuidutils.generate_uuid())
+        )
+        mock_ogc.return_value = [
+            self.test_offer,
+            same_resource,
+            self.test_offer_with_parent,
+            self.test_offer_lessee,
+        ]
+        mock_lgdwai.side_effect = lambda lease, *args, **kwargs: lease.to_dict()
+        mock_gpl.return_value = []
+        data = {
+            "count": 2,
+            "resource_type": "test_node",
+            "resource_class": "fake",
+            "name": "lease_claim",
+            "start_time": "2016-07-16T19:20:30",
+            "end_time": "2016-08-16T19:20:30",
+        }
+
+        request = self.post_json("/offers/claim_bulk", data)
+
+        mock_ogc.assert_called_once_with(
+            datetime.datetime(2016, 7, 16, 19, 20, 30),
+            datetime.datetime(2016, 8, 16, 19, 20, 30),
+            resource_type="test_node",
+            lessee_id=None,
+        )
+        leases = mock_create_bulk.call_args[0][0]
+        self.assertEqual(
+            [self.test_offer.uuid, self.test_offer_with_parent.uuid],
+            [lease.offer_uuid for lease in leases],
+        )
+        self.assertEqual(
+            [None, self.test_offer_with_parent.parent_lease_uuid],
+            [lease.parent_lease_uuid for lease in leases],
+        )
+        for lease in leases:
+            self.assertEqual(self.context.project_id, lease.project_id)
+            self.assertEqual("lease_claim", lease.name)
+        self.assertEqual(http_client.CREATED, request.status_int)
+        self.assertEqual(
+            [lease.uuid for lease in leases],
+            [lease["uuid"] for lease in request.json["leases"]],
+        )
+
+    @mock.patch("esi_leap.objects.lease.Lease.create_bulk")
+    @mock.patch("esi_leap.objects.offer.Offer.get_claimable")
+    def test_claim_bulk_insufficient_offers(self, mock_ogc, mock_create_bulk):
+        mock_ogc.return_value = [self.test_offer, self.test_offer_lessee]
+        data = {
+            "count": 2,
+            "resource_type": "test_node",
+            "resource_properties": {"cpu_arch": "x86_64"},
+        }
+
+        request = self.post_json("/offers/claim_bulk", data, expect_errors=True)
+
+        mock_create_bulk.assert_not_called()
+        self.assertEqual(http_client.CONFLICT, request.status_int)
@@ -246,6 +246,38 @@ class TestGetObjectUtils(testtools.TestCase):
         )
 
 
+class TestGetResourceObjectsUtils(testtools.TestCase):
+    @mock.patch("esi_leap.api.controllers.v1.utils.get_many")
+    def test_get_resource_objects(self, mock_gm):
+        node = mock.Mock()
+        offers = [
+            test_offer,
+            offer.Offer(resource_type="ironic_node", resource_uuid="node-1"),
+            offer.Offer(resource_type="ironic_node", resource_uuid="node-2"),
+            test_offer,
+        ]
+        mock_gm.side_effect = lambda resource_type, uuids, resource_list: {
+            "test_node": {test_node_1._uuid: test_node_1},
+            "ironic_node": {"node-1": node},
+        }[resource_type]
+
+        with mock.patch.object(
+            offer.Offer, "resource_object", return_value="fallback"
+        ) as mock_ro:
+            resources = utils.get_resource_objects(offers, ["node"])
+
+        self.assertEqual([test_node_1, node, "fallback", test_node_1], resources)
+        mock_gm.assert_has_calls(
+            [
+                mock.call("test_node", {test_node_1._uuid}, ["node"]),
+                mock.call("ironic_node", {"node-1", "node-2"}, ["node"]),
+            ],
+            any_order=True,
+        )
+        self.assertEqual(2, mock_gm.call_count)
+        mock_ro.assert_called_once_with()
+
+
 class TestCheckResourceAdminUtils(testtools.TestCase):
     @mock.patch.object(test_node_1, "get_owner_project_id")
     @mock.patch("esi_leap.api.controllers.v1.utils.resource_policy_authorize")
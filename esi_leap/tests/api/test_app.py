@@ -0,0 +1,100 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+import pecan.testing
+
+from esi_leap.api import app
+from esi_leap.common import exception
+from esi_leap.common import metrics
+from esi_leap.common import query_stats
+from esi_leap.tests.api import base as test_api_base
+
+
+class TestMetricsHook(test_api_base.APITestCase):
+    def setUp(self):
+        super(TestMetricsHook, self).setUp()
+        self.config(enabled=True, group="metrics")
+        self.app = pecan.testing.load_test_app(dict(app.get_pecan_config()))
+
+    def test_request_metrics(self):
+        labels = {
+            "method": "GET",
+            "route": "OffersController.get_all",
+            "status": "200",
+        }
+        name = "esi_leap_api_request_duration_seconds_count"
+        before = metrics.REGISTRY.get_sample_value(name, labels) or 0
+
+        self.get_json("/offers")
+
+        self.assertEqual(before + 1, metrics.REGISTRY.get_sample_value(name, labels))
+        response = self.app.get("/metrics")
+        self.assertIn('route="OffersController.get_all"', response.text)
+
+    def test_metrics_disabled(self):
+        self.config(enabled=False, group="metrics")
+        self.app = pecan.testing.load_test_app(dict(app.get_pecan_config()))
+
+        response = self.app.get("/metrics", expect_errors=True)
+
+        self.assertNotIn("esi_leap_api_request_duration_seconds", response.text)
+
+
+class TestContextHook(test_api_base.APITestCase):
+    @mock.patch.object(app.LOG, "debug")
+    def test_query_count_logged(self, mock_debug):
+        self.get_json("/offers")
+
+        values = mock_debug.call_args[0][1]
+        self.assertEqual("GET", values["method"])
+        self.assertEqual("OffersController.get_all", values["route"])
+        self.assertGreater(values["count"], 0)
+        self.assertIsNone(query_stats.current())
+
+    @mock.patch.object(app.LOG, "warning")
+    def test_query_budget_exceeded(self, mock_warning):
+        self.config(request_query_budget=1, group="query_stats")
+        self.config(enforce_query_budget=False, group="query_stats")
+        self.get_json("/leases")
+
+        mock_warning.assert_called_once()
+        self.assertEqual(
+            "LeasesController.get_all", mock_warning.call_args[0][1]["route"]
+        )
+
+    def test_query_budget_enforced(self):
+        self.config(request_query_budget=1, group="query_stats")
+        response = self.get_json("/leases", expect_errors=True)
+
+        self.assertEqual(500, response.status_int)
+        self.assertIn(
+            exception.QueryBudgetExceeded.msg_fmt.split("%")[0], response.text
+        )
+
+    @mock.patch.object(app.dbapi, "allow_replica_reads")
+    def test_replica_reads(self, mock_allow):
+        self.get_json("/offers")
+        self.get_json("/offers", headers={app.PRIMARY_READ_HEADER: "true"})
+        self.post_json("/offers/claim", {}, expect_errors=True)
+
+        self.assertEqual(
+            [
+                mock.call(True),
+                mock.call(False),
+                mock.call(False),
+                mock.call(False),
+                mock.call(False),
+                mock.call(False),
+            ],
+            mock_allow.call_args_list,
+        )
@@ -0,0 +1,199 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import gzip
+import json
+import zlib
+
+import mock
+import webob
+
+from esi_leap.api import compression
+from esi_leap.common import metrics
+from esi_leap.tests.api import base as test_api_base
+from esi_leap.tests import base
+
+
+BODY = [b'{"offers": [', b'{"resource_properties": {"cpus": 40}}, ' * 100, b"{}]}"]
+
+
+def _sample(name, labels):
+    return metrics.REGISTRY.get_sample_value(name, labels) or 0
+
+
+class TestChooseEncoding(base.TestCase):
+    def test_choose_encoding(self):
+        encodings = ("zstd", "gzip")
+        for header, expected in [
+            (None, None),
+            ("", None),
+            ("identity", None),
+            ("gzip", "gzip"),
+            ("GZIP, deflate", "gzip"),
+            ("gzip, zstd", "zstd"),
+            ("gzip;q=1.0, zstd;q=0.5", "gzip"),
+            ("zstd;q=0, gzip", "gzip"),
+            ("*", "zstd"),
+            ("*;q=0.5, zstd;q=0", "gzip"),
+            ("gzip;q=bad", None),
+        ]:
+            self.assertEqual(
+                expected, compression.choose_encoding(header, encodings), header
+            )
+
+    def test_choose_encoding_no_zstd(self):
+        self.assertEqual("gzip", compression.choose_encoding("zstd, gzip", ("gzip",)))
+
+
+class TestCompressionMiddleware(base.TestCase):
+    def setUp(self):
+        super(TestCompressionMiddleware, self).setUp()
+        self.config(min_size=1024, group="compression")
+        self.start_response = mock.Mock()
+
+    def _call(self, headers, status="200 OK", body=BODY, accept="gzip"):
+        def app(environ, start_response):
+            start_response(status, list(headers))
+            return list(body)
+
+        middleware = compression.CompressionMiddleware(app)
+        environ = {"REQUEST_METHOD": "GET", "HTTP_ACCEPT_ENCODING": accept}
+        chunks = list(middleware(environ, self.start_response))
+        return self.start_response.call_args[0][1], chunks
+
+    def test_compress(self):
+        labels = {"encoding": "gzip"}
+        name = "esi_leap_api_response_compression_ratio"
+        before = (_sample(name + "_count", labels), _sample(name + "_sum", labels))
+        length = str(len(b"".join(BODY)))
+
+        headers, chunks = self._call(
+            [("Content-Type", "application/json"), ("Content-Length", length)]
+        )
+
+        self.assertEqual(
+            [
+                ("Content-Type", "application/json"),
+                ("Vary", "Accept-Encoding"),
+                ("Content-Encoding", "gzip"),
+            ],
+            headers,
+        )
+        compressed = b"".join(chunks)
+        self.assertEqual(b"".join(BODY), gzip.decompress(compressed))
+        self.assertLess(len(compressed), int(length))
+        self.assertEqual(before[0] + 1, _sample(name + "_count", labels))
+        self.assertAlmostEqual(
+            len(compressed) / float(length),
+            _sample(name + "_sum", labels) - before[1],
+        )
+        self.assertGreater(
+            _sample("esi_leap_api_response_compression_cpu_seconds_count", labels), 0
+        )
+
+    def test_compress_streaming(self):
+        headers, chunks = self._call([("Content-Type", "application/json")])
+
+        self.assertIn(("Content-Encoding", "gzip"), headers)
+        # every chunk can be decoded as soon as it arrives
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        for original, chunk in zip(BODY, chunks):
+            self.assertEqual(original, decompressor.decompress(chunk))
+        self.assertEqual(b"", decompressor.decompress(b"".join(chunks[len(BODY) :])))
+        self.assertTrue(decompressor.eof)
+
+    def test_compress_level(self):
+        length = str(len(b"".join(BODY)))
+        headers = [("Content-Type", "application/json"), ("Content-Length", length)]
+        self.config(gzip_level=1, group="compression")
+        fast = b"".join(self._call(headers)[1])
+        self.config(gzip_level=9, group="compression")
+        best = b"".join(self._call(headers)[1])
+
+        self.assertEqual(gzip.decompress(fast), gzip.decompress(best))
+        self.assertNotEqual(fast, best)
+
+    def test_compress_zstd(self):
+        compressor = mock.Mock()
+        compressor.compress.side_effect = lambda data: data.upper()
+        compressor.flush.return_value = b""
+        with mock.patch.object(compression, "zstandard") as mock_zstd:
+            mock_zstd.ZstdCompressor.return_value.compressobj.return_value = compressor
+            headers, chunks = self._call(
+                [("Content-Type", "application/json")], accept="zstd"
+            )
+
+        mock_zstd.ZstdCompressor.assert_called_once_with(level=3)
+        self.assertIn(("Content-Encoding", "zstd"), headers)
+        self.assertEqual(b"".join(BODY).upper(), b"".join(chunks))
+        compressor.flush.assert_any_call(mock_zstd.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def test_small_response(self):
+        headers, chunks = self._call(
+            [("Content-Type", "application/json"), ("Content-Length", "2")],
+            body=[b"{}"],
+        )
+
+        self.assertEqual(
+            [
+                ("Content-Type", "application/json"),
+                ("Content-Length", "2"),
+                ("Vary", "Accept-Encoding"),
+            ],
+            headers,
+        )
+        self.assertEqual([b"{}"], chunks)
+
+    def test_not_accepted(self):
+        self.config(min_size=0, group="compression")
+        headers, chunks = self._call(
+            [("Content-Type", "application/json"), ("Vary", "Accept")],
+            accept="identity",
+        )
+
+        self.assertEqual(
+            [("Content-Type", "application/json"), ("Vary", "Accept, Accept-Encoding")],
+            headers,
+        )
+        self.assertEqual(BODY, chunks)
+
+    def test_not_compressible(self):
+        self.config(min_size=0, group="compression")
+        for status, headers in [
+            ("304 Not Modified", [("Content-Type", "application/json")]),
+            ("200 OK", [("Content-Type", "image/png")]),
+            (
+                "200 OK",
+                [("Content-Type", "text/plain"), ("Content-Encoding", "gzip")],
+            ),
+            (
+                "200 OK",
+                [("Content-Type", "text/plain"), ("Cache-Control", "no-transform")],
+            ),
+        ]:
+            self.assertEqual((headers, BODY), self._call(headers, status=status))
+
+
+class TestCompressionAPI(test_api_base.APITestCase):
+    def test_get_compressed(self):
+        self.config(min_size=0, group="compression")
+        expected = self.get_json("/offers")
+
+        # webtest decodes compressed responses, so skip it
+        request = webob.Request.blank(
+            test_api_base.PATH_PREFIX + "/offers", headers={"Accept-Encoding": "gzip"}
+        )
+        response = request.get_response(self.app.app)
+
+        self.assertEqual("gzip", response.headers["Content-Encoding"])
+        self.assertEqual("Accept-Encoding", response.headers["Vary"])
+        self.assertEqual(expected, json.loads(gzip.decompress(response.body)))
@@ -18,6 +18,7 @@ from oslo_context import context as ctx
 from oslo_db.sqlalchemy import enginefacade
 from oslotest import base
 
+from esi_leap.common import retry
 import esi_leap.conf
 from esi_leap.db import api as db_api
 from esi_leap.db.sqlalchemy import models
@@ -54,6 +55,8 @@ class TestCase(base.BaseTestCase):
     def setUp(self):
         self.config = self.useFixture(config.Config(lockutils.CONF)).config
         super(TestCase, self).setUp()
+        # circuit breakers are per process; start each test with none
+        self.useFixture(fixtures.MockPatchObject(retry, "_BREAKERS", {}))
 
         if not hasattr(self, "context"):
             self.context = ctx.RequestContext(
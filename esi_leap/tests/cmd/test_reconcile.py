@@ -0,0 +1,58 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import io
+
+import mock
+
+from esi_leap.cmd import reconcile as reconcile_cmd
+from esi_leap.manager import reconcile
+from esi_leap.tests import base
+
+
+class TestReconcileCommand(base.TestCase):
+    def setUp(self):
+        super(TestReconcileCommand, self).setUp()
+        reconcile_cmd.CONF.register_cli_opts(reconcile_cmd.cli_opts)
+        self.config(batch_size=10, group="reconcile")
+
+    @mock.patch("sys.stdout", new_callable=io.StringIO)
+    @mock.patch("esi_leap.manager.reconcile.reconcile")
+    @mock.patch("esi_leap.common.service.prepare_service")
+    def test_main(self, mock_ps, mock_reconcile, mock_stdout):
+        self.config(dry_run=True)
+        mock_reconcile.return_value = [
+            reconcile.Mismatch("node-1", "lease-1", None, reconcile.SET_LEASE),
+            reconcile.Mismatch("node-2", None, "lease-2", reconcile.REMOVE_LEASE),
+        ]
+
+        reconcile_cmd.main()
+
+        mock_ps.assert_called_once()
+        mock_reconcile.assert_called_once_with(dry_run=True, limit=10)
+        self.assertEqual(
+            "set_lease node-1: found None, expected lease-1\n"
+            "remove_lease node-2: found lease-2, expected None\n"
+            "2 nodes out of sync\n",
+            mock_stdout.getvalue(),
+        )
+
+    @mock.patch("sys.stdout", new_callable=io.StringIO)
+    @mock.patch("esi_leap.manager.reconcile.reconcile")
+    @mock.patch("esi_leap.common.service.prepare_service")
+    def test_main_in_sync(self, mock_ps, mock_reconcile, mock_stdout):
+        mock_reconcile.return_value = []
+
+        reconcile_cmd.main()
+
+        mock_reconcile.assert_called_once_with(dry_run=False, limit=10)
+        self.assertEqual("0 nodes out of sync\n", mock_stdout.getvalue())
@@ -0,0 +1,178 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import mock
+
+from esi_leap.common import capacity
+from esi_leap.common import statuses
+from esi_leap.db.sqlalchemy import api
+from esi_leap.tests import base
+
+now = datetime.datetime(2016, 7, 16, 19, 20, 30)
+
+
+def _offer(uuid, resource_uuid, start_days, end_days, **kwargs):
+    values = dict(
+        uuid=uuid,
+        project_id="0wn3r",
+        resource_type="test_node",
+        resource_uuid=resource_uuid,
+        start_time=now + datetime.timedelta(days=start_days),
+        end_time=now + datetime.timedelta(days=end_days),
+        status=statuses.AVAILABLE,
+    )
+    values.update(kwargs)
+    return api.offer_create(values)
+
+
+def _lease(uuid, offer, start_days, end_days, **kwargs):
+    values = dict(
+        uuid=uuid,
+        project_id="l3ss33",
+        owner_id=offer.project_id,
+        resource_type=offer.resource_type,
+        resource_uuid=offer.resource_uuid,
+        offer_uuid=offer.uuid,
+        start_time=now + datetime.timedelta(days=start_days),
+        end_time=now + datetime.timedelta(days=end_days),
+        status=statuses.CREATED,
+    )
+    values.update(kwargs)
+    return api.lease_create(values)
+
+
+def _days(days):
+    return now + datetime.timedelta(days=days)
+
+
+class TestCapacityIndex(base.DBTestCase):
+    def setUp(self):
+        super(TestCapacityIndex, self).setUp()
+        self.index = capacity.CapacityIndex()
+
+    def test_free_windows(self):
+        o1 = _offer("o1", "r1", 0, 100)
+        _lease("l1", o1, 10, 20)
+        _lease("l2", o1, 15, 30)
+        _lease("l3", o1, 90, 110)
+        _lease("l4", o1, 40, 50, status=statuses.EXPIRED)
+        _offer("o2", "r2", 0, 100, status=statuses.DELETED)
+
+        self.index.refresh()
+
+        self.assertEqual(
+            [(_days(0), _days(10)), (_days(30), _days(90))],
+            [
+                (w.start_time, w.end_time)
+                for w in self.index.get_free("test_node", _days(0), _days(1))
+                + self.index.get_free("test_node", _days(31), _days(89))
+            ],
+        )
+        self.assertEqual([], self.index.get_free("test_node", _days(5), _days(15)))
+        self.assertEqual([], self.index.get_free("dummy_node", _days(0), _days(1)))
+
+    def test_get_free(self):
+        _offer("o1", "r1", 0, 100)
+        _offer("o2", "r2", 10, 100, lessee_id="l3ss33")
+        _offer("o3", "r3", 0, 50)
+        self.index.refresh()
+
+        windows = self.index.get_free("test_node", _days(20), _days(40))
+        self.assertEqual(["r1", "r2", "r3"], [w.resource_uuid for w in windows])
+
+        windows = self.index.get_free(
+            "test_node", _days(20), _days(60), lambda w: w.lessee_id is None
+        )
+        self.assertEqual(["o1"], [w.offer_uuid for w in windows])
+
+    def test_window_tree(self):
+        windows = [
+            capacity.Window(_days(start), _days(end), None, None, None, None, str(i))
+            for i, (start, end) in enumerate(
+                [(0, 10), (2, 4), (3, 30), (5, 6), (8, 20), (9, 9.5), (12, 40)]
+            )
+        ]
+        tree = capacity._WindowTree(reversed(windows))
+
+        for start, end in [(0, 1), (3, 4), (5, 6), (9, 19), (12, 25), (35, 40)]:
+            self.assertEqual(
+                [
+                    w
+                    for w in windows
+                    if w.start_time <= _days(start) and w.end_time >= _days(end)
+                ],
+                tree.covering(_days(start), _days(end)),
+            )
+        self.assertEqual([], capacity._WindowTree([]).covering(_days(0), _days(1)))
+
+    def test_get_earliest(self):
+        o1 = _offer("o1", "r1", 0, 100)
+        _lease("l1", o1, 0, 30)
+        o2 = _offer("o2", "r2", 0, 100)
+        _lease("l2", o2, 5, 10)
+        _lease("l3", o2, 40, 60)
+        _offer("o3", "r3", 20, 100)
+        self.index.refresh()
+
+        duration = datetime.timedelta(days=10)
+        start, windows = self.index.get_earliest("test_node", duration, 2, _days(0))
+        self.assertEqual(_days(20), start)
+        self.assertEqual(["r2", "r3"], [w.resource_uuid for w in windows])
+
+        start, windows = self.index.get_earliest("test_node", duration, 3, _days(0))
+        self.assertEqual(_days(30), start)
+        self.assertEqual(["r1", "r2", "r3"], [w.resource_uuid for w in windows])
+
+        start, windows = self.index.get_earliest("test_node", duration, 4, _days(0))
+        self.assertIsNone(start)
+        self.assertEqual([], windows)
+
+    @mock.patch("oslo_utils.timeutils.utcnow")
+    def test_refresh_incremental(self, mock_utcnow):
+        mock_utcnow.return_value = datetime.datetime(2024, 1, 1)
+        o1 = _offer("o1", "r1", 0, 100)
+        _offer("o2", "r2", 0, 100)
+        self.index.refresh()
+        mock_utcnow.return_value = datetime.datetime(2024, 1, 1, 0, 1)
+        self.index.refresh()
+        mock_utcnow.return_value = datetime.datetime(2024, 1, 1, 0, 2)
+
+        with mock.patch.object(
+            api, "resource_get_capacity", wraps=api.resource_get_capacity
+        ) as mock_rgc:
+            self.index.refresh()
+            mock_rgc.assert_not_called()
+
+            _lease("l1", o1, 0, 50)
+            self.index.refresh()
+            mock_rgc.assert_called_once()
+            self.assertEqual(
+                [("test_node", "r1")], [tuple(r) for r in mock_rgc.call_args[0][0]]
+            )
+
+        windows = self.index.get_free("test_node", _days(10), _days(20))
+        self.assertEqual(["r2"], [w.resource_uuid for w in windows])
+
+        api.offer_update("o2", {"status": statuses.DELETED})
+        self.index.refresh()
+        self.assertEqual([], self.index.get_free("test_node", _days(10), _days(20)))
+
+    def test_refresh_rebuild(self):
+        self.config(capacity_rebuild_interval=0, group="api")
+        _offer("o1", "r1", 0, 100)
+        self.index.refresh()
+        api.offer_destroy("o1")
+
+        self.index.refresh()
+
+        self.assertEqual([], self.index.get_free("test_node", _days(10), _days(20)))
@@ -0,0 +1,108 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import random
+
+from esi_leap.common import intervals
+from esi_leap.tests import base
+
+
+def _random_intervals(rng, count, horizon=100):
+    result = []
+    for _ in range(count):
+        start = rng.randrange(horizon)
+        result.append((start, start + rng.randrange(1, 20)))
+    return sorted(result)
+
+
+def _points(intervals_list):
+    # integer points covered by half-open intervals
+    return {t for start, end in intervals_list for t in range(start, end)}
+
+
+def _is_canonical(intervals_list):
+    return all(start < end for start, end in intervals_list) and all(
+        a[1] < b[0] for a, b in zip(intervals_list, intervals_list[1:])
+    )
+
+
+class TestIntervals(base.TestCase):
+    def setUp(self):
+        super(TestIntervals, self).setUp()
+        self.rng = random.Random(1718)
+
+    def test_merge(self):
+        self.assertEqual([], intervals.merge([]))
+        self.assertEqual(
+            [(0, 15), (20, 30)],
+            intervals.merge([(0, 10), (5, 10), (10, 15), (20, 25), (21, 30)]),
+        )
+
+    def test_subtract(self):
+        self.assertEqual([(0, 10)], intervals.subtract(0, 10, []))
+        self.assertEqual(
+            [(2, 3), (5, 8)],
+            intervals.subtract(2, 10, [(0, 1), (1, 2), (3, 5), (4, 5), (8, 20)]),
+        )
+        self.assertEqual([], intervals.subtract(0, 10, [(0, 5), (5, 10)]))
+        self.assertEqual([], intervals.subtract(10, 0, []))
+
+    def test_intersect(self):
+        self.assertEqual(
+            [(2, 3), (5, 6), (8, 10)],
+            intervals.intersect([(0, 3), (5, 10)], [(2, 6), (8, 12)]),
+        )
+        self.assertEqual([], intervals.intersect([(0, 3)], [(3, 6)]))
+
+    def test_gaps(self):
+        self.assertEqual([], intervals.gaps([]))
+        self.assertEqual(
+            [(10, 12), (15, 20)],
+            intervals.gaps([(0, 10), (12, 15), (13, 14), (20, 30)]),
+        )
+
+    def test_overlaps(self):
+        self.assertTrue(intervals.overlaps(5, 6, [(0, 2), (4, 10)]))
+        self.assertFalse(intervals.overlaps(2, 4, [(0, 2), (4, 10)]))
+        self.assertFalse(intervals.overlaps(2, 4, []))
+
+    def test_properties(self):
+        for _ in range(500):
+            a = _random_intervals(self.rng, self.rng.randrange(10))
+            b = _random_intervals(self.rng, self.rng.randrange(10))
+            start = self.rng.randrange(-10, 110)
+            end = start + self.rng.randrange(-10, 50)
+            merged_a = intervals.merge(a)
+            merged_b = intervals.merge(b)
+
+            self.assertTrue(_is_canonical(merged_a))
+            self.assertEqual(_points(a), _points(merged_a))
+
+            free = intervals.subtract(start, end, a)
+            self.assertTrue(_is_canonical(free))
+            self.assertEqual(set(range(start, end)) - _points(a), _points(free))
+
+            common = intervals.intersect(merged_a, merged_b)
+            self.assertTrue(_is_canonical(common))
+            self.assertEqual(_points(a) & _points(b), _points(common))
+
+            if merged_a:
+                self.assertEqual(
+                    intervals.subtract(merged_a[0][0], merged_a[-1][1], a),
+                    intervals.gaps(a),
+                )
+
+            if start < end:
+                self.assertEqual(
+                    bool(set(range(start, end)) & _points(a)),
+                    intervals.overlaps(start, end, a),
+                )
@@ -0,0 +1,80 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+
+import mock
+
+from esi_leap.common import inventory
+from esi_leap.db.sqlalchemy import api as db_api
+from esi_leap.tests import base
+
+
+now = datetime.datetime(2016, 7, 16, 19, 20, 30)
+
+
+class FakeNode(object):
+    def __init__(self, uuid, name, lease_uuid=None):
+        self.uuid = uuid
+        self.name = name
+        self.resource_class = "baremetal"
+        self.owner = "0wn3r"
+        self.lessee = None
+        self.provision_state = "available"
+        self.maintenance = False
+        self.properties = {"cpus": 40, "capabilities": "boot_mode:uefi"}
+        if lease_uuid is not None:
+            self.properties["lease_uuid"] = lease_uuid
+
+
+class InventoryTestCase(base.DBTestCase):
+    def setUp(self):
+        super(InventoryTestCase, self).setUp()
+        self.config(enabled=True, group="inventory")
+
+    @mock.patch("esi_leap.common.ironic.get_node_list")
+    def test_get_node_list_disabled(self, mock_gnl):
+        self.config(enabled=False, group="inventory")
+        mock_gnl.return_value = ["node"]
+
+        nodes = inventory.get_node_list(self.context, uuids=["11111"], owner="0wn3r")
+
+        self.assertEqual(["node"], nodes)
+        mock_gnl.assert_called_once_with(self.context, owner="0wn3r")
+
+    @mock.patch("esi_leap.common.ironic.get_node_list")
+    @mock.patch("oslo_utils.timeutils.utcnow")
+    def test_sync(self, mock_utcnow, mock_gnl):
+        mock_utcnow.return_value = now
+        mock_gnl.return_value = [
+            FakeNode("11111", "node-1", lease_uuid="12345"),
+            FakeNode("22222", "node-2"),
+        ]
+
+        inventory.sync()
+
+        mock_gnl.assert_called_once_with()
+        rows = {row.uuid: row for row in db_api.resource_inventory_get_all({})}
+        self.assertEqual({"cpus": 40}, rows["11111"].properties)
+        self.assertEqual("12345", rows["11111"].lease_uuid)
+        self.assertIsNone(rows["22222"].lease_uuid)
+
+        nodes = inventory.get_node_list(uuids=["11111"])
+
+        self.assertEqual(1, len(nodes))
+        self.assertEqual("node-1", nodes[0].name)
+        self.assertEqual({"cpus": 40, "lease_uuid": "12345"}, nodes[0].properties)
+        self.assertEqual(now, inventory.synced_at(nodes))
+
+    def test_synced_at_not_inventory(self):
+        self.assertIsNone(inventory.synced_at([FakeNode("11111", "node-1")]))
+        self.assertIsNone(inventory.synced_at([]))
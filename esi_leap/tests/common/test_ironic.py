@@ -31,6 +31,29 @@ class IronicTestCase(base.TestCase):
         node = ironic.get_node("12345")
 
         self.assertEqual(fake_node, node)
+        mock_ironic.return_value.node.get.assert_called_once_with(
+            "12345", fields=list(ironic.NODE_FIELDS)
+        )
+
+    @mock.patch.object(ironic, "get_ironic_client", autospec=True)
+    def test_get_node_fields(self, mock_ironic):
+        ironic.get_node("12345", fields=("uuid", "owner"))
+
+        mock_ironic.return_value.node.get.assert_called_once_with(
+            "12345", fields=["uuid", "owner"]
+        )
+
+    @mock.patch.object(ironic, "get_ironic_client", autospec=True)
+    def test_list_nodes(self, mock_ironic):
+        fake_node = FakeNode()
+        mock_ironic.return_value.node.list.return_value = [fake_node]
+        nodes = ironic.get_node_list(owner="12345")
+
+        self.assertEqual([fake_node], nodes)
+        mock_ironic.assert_called_once_with(None)
+        mock_ironic.return_value.node.list.assert_called_once_with(
+            fields=list(ironic.NODE_FIELDS), owner="12345"
+        )
 
     @mock.patch.object(ironic, "get_ironic_client", autospec=True)
     def test_get_node_list(self, mock_ironic):
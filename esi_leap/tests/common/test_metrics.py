@@ -0,0 +1,114 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from ironicclient.common.apiclient import exceptions as ir_exception
+from keystoneauth1 import exceptions as ks_exception
+import mock
+
+from esi_leap.common import metrics
+from esi_leap.common import query_stats
+from esi_leap.common import retry
+from esi_leap.db.sqlalchemy import api
+from esi_leap.tests import base
+
+
+def _sample(name, labels):
+    return metrics.REGISTRY.get_sample_value(name, labels) or 0
+
+
+class TestMetrics(base.TestCase):
+    def test_external_call(self):
+        name = "esi_leap_external_call_duration_seconds_count"
+        success = {"service": "ironic", "call": "node.get", "outcome": "success"}
+        error = dict(success, outcome="error")
+        before = (_sample(name, success), _sample(name, error))
+
+        with metrics.external_call("ironic", "node.get"):
+            pass
+        self.assertRaises(
+            ValueError, self._fail_call, metrics.external_call("ironic", "node.get")
+        )
+
+        self.assertEqual(before[0] + 1, _sample(name, success))
+        self.assertEqual(before[1] + 1, _sample(name, error))
+
+    def _fail_call(self, call, error=None):
+        with call:
+            raise error or ValueError()
+
+    def test_external_call_breaker(self):
+        self.config(breaker_error_rate=0.5, breaker_min_calls=2, group="retry")
+
+        # a healthy backend answering that a node or project does not exist
+        for error in (ir_exception.NotFound(), ks_exception.NotFound()):
+            for _ in range(2):
+                self.assertRaises(
+                    type(error),
+                    self._fail_call,
+                    metrics.external_call("ironic", "node.get"),
+                    error,
+                )
+        self.assertFalse(retry.is_open("ironic"))
+
+        for error in (ir_exception.ConnectionRefused(), ir_exception.HttpServerError()):
+            for _ in range(2):
+                self.assertRaises(
+                    type(error),
+                    self._fail_call,
+                    metrics.external_call("ironic", "node.get"),
+                    error,
+                )
+        self.assertTrue(retry.is_open("ironic"))
+
+    def test_timed_job(self):
+        @metrics.timed_job("test_job")
+        def job():
+            metrics.set_backlog("test_job", 3)
+            return "done"
+
+        self.assertEqual("done", job())
+        self.assertIsNotNone(
+            _sample("esi_leap_manager_job_duration_seconds", {"job": "test_job"})
+        )
+        self.assertEqual(
+            3, _sample("esi_leap_manager_job_backlog", {"job": "test_job"})
+        )
+
+    def test_middleware(self):
+        app = mock.Mock(return_value=[b"app"])
+        middleware = metrics.MetricsMiddleware(app)
+        start_response = mock.Mock()
+
+        body = middleware(
+            {"PATH_INFO": "/metrics", "REQUEST_METHOD": "GET", "QUERY_STRING": ""},
+            start_response,
+        )
+        self.assertIn(b"esi_leap_manager_job_backlog", b"".join(body))
+        app.assert_not_called()
+
+        env = {"PATH_INFO": "/v1/offers"}
+        self.assertEqual([b"app"], middleware(env, start_response))
+        app.assert_called_once_with(env, start_response)
+
+
+class TestDBMetrics(base.DBTestCase):
+    def test_instrument_db(self):
+        self.addCleanup(query_stats._OBSERVERS.remove, metrics._observe_query)
+        metrics.instrument_db()
+        metrics.instrument_db()
+        self.assertEqual(1, query_stats._OBSERVERS.count(metrics._observe_query))
+        name = "esi_leap_db_query_duration_seconds_count"
+        before = _sample(name, {"operation": "SELECT"})
+
+        api.offer_get_all({}).all()
+
+        self.assertGreater(_sample(name, {"operation": "SELECT"}), before)
@@ -0,0 +1,105 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+import os
+import tempfile
+
+from osprofiler.drivers import base as driver_base
+from osprofiler import notifier
+from osprofiler import profiler as osp_profiler
+
+from esi_leap.common import profiler
+from esi_leap.db.sqlalchemy import api
+from esi_leap.tests import base
+
+
+class TestFileDriver(base.TestCase):
+    def setUp(self):
+        super(TestFileDriver, self).setUp()
+        self.path = os.path.join(tempfile.mkdtemp(), "traces")
+        self.driver = driver_base.get_driver(
+            "file://" + self.path, project="esi-leap", service="api", host="h"
+        )
+
+    def _point(self, base_id, trace_id, name):
+        return {
+            "base_id": base_id,
+            "parent_id": base_id,
+            "trace_id": trace_id,
+            "name": name,
+            "timestamp": "2016-07-16T19:20:30.000000",
+            "info": {"host": "h"},
+        }
+
+    def test_get_driver(self):
+        self.assertIsInstance(self.driver, profiler.FileDriver)
+        self.assertEqual(self.path, self.driver.path)
+
+    def test_report(self):
+        self.assertEqual([], self.driver.list_traces())
+
+        self.driver.notify(self._point("b1", "t1", "db_api-start"))
+        self.driver.notify(self._point("b1", "t1", "db_api-stop"))
+        self.driver.notify(self._point("b2", "t2", "wsgi-start"))
+
+        self.assertEqual(
+            ["b1", "b2"], [t["base_id"] for t in self.driver.list_traces()]
+        )
+        report = self.driver.get_report("b1")
+        self.assertEqual(1, len(report["children"]))
+        self.assertEqual("t1", report["children"][0]["trace_id"])
+
+
+class TestTracedBackend(base.TestCase):
+    def test_trace(self):
+        points = []
+        old_notifier = notifier.get()
+        notifier.set(points.append)
+        self.addCleanup(notifier.set, old_notifier)
+        osp_profiler.init("key")
+        self.addCleanup(osp_profiler.clean)
+
+        backend = mock.Mock(offer_get_by_uuid=mock.Mock(return_value="offer"))
+        traced = profiler.TracedBackend(backend, "db_api")
+
+        self.assertEqual("offer", traced.offer_get_by_uuid("uuid"))
+        self.assertIs(traced.offer_get_by_uuid, traced.offer_get_by_uuid)
+        self.assertEqual(["db_api-start", "db_api-stop"], [p["name"] for p in points])
+        self.assertEqual("offer_get_by_uuid", points[0]["info"]["db_api"])
+
+    def test_get_backend(self):
+        self.assertIsNot(profiler.TracedBackend, type(api.get_backend()))
+        self.config(enabled=True, group="profiler")
+        self.assertIsInstance(api.get_backend(), profiler.TracedBackend)
+
+
+class TestSetup(base.TestCase):
+    @mock.patch("osprofiler.initializer.init_from_conf")
+    def test_setup_disabled(self, mock_ifc):
+        profiler.setup("esi-leap-api")
+        mock_ifc.assert_not_called()
+
+    @mock.patch("osprofiler.initializer.init_from_conf")
+    def test_setup(self, mock_ifc):
+        self.config(enabled=True, group="profiler")
+        self.config(host="h")
+
+        profiler.setup("esi-leap-api")
+
+        mock_ifc.assert_called_once_with(
+            conf=mock.ANY,
+            context={},
+            project="esi-leap",
+            service="esi-leap-api",
+            host="h",
+        )
@@ -0,0 +1,74 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from esi_leap.common import exception
+from esi_leap.common import query_stats
+from esi_leap.tests import base
+
+
+class TestQueryStats(base.DBTestCase):
+    def tearDown(self):
+        query_stats.stop()
+        super(TestQueryStats, self).tearDown()
+
+    def test_count(self):
+        stats = query_stats.start("route")
+        self.db_api.offer_get_all({}).all()
+        self.db_api.lease_get_all({}).all()
+
+        self.assertIs(stats, query_stats.stop())
+        self.assertEqual("route", stats.route)
+        self.assertGreaterEqual(stats.count, 2)
+        self.assertGreater(stats.duration, 0)
+        self.assertIsNone(query_stats.current())
+
+    def test_not_counted_outside_request(self):
+        self.db_api.offer_get_all({}).all()
+        self.assertIsNone(query_stats.stop())
+
+    def test_budget_warn_only(self):
+        self.config(request_query_budget=1, group="query_stats")
+        stats = query_stats.start("route")
+        self.db_api.offer_get_all({}).all()
+        self.db_api.lease_get_all({}).all()
+
+        self.assertTrue(stats.over_budget)
+
+    def test_budget_enforced(self):
+        self.config(enforce_query_budget=True, group="query_stats")
+        stats = query_stats.start("route")
+        self.db_api.offer_get_all({}).all()
+        self.config(request_query_budget=stats.count, group="query_stats")
+
+        self.assertRaises(
+            exception.QueryBudgetExceeded, self.db_api.lease_get_all({}).all
+        )
+
+    @mock.patch.object(query_stats.LOG, "warning")
+    def test_slow_query(self, mock_warning):
+        self.config(slow_query_threshold=1e-9, group="query_stats")
+        query_stats.start("OffersController.get_all")
+        self.db_api.offer_get_all({}).all()
+
+        mock_warning.assert_called()
+        values = mock_warning.call_args[0][1]
+        self.assertEqual("OffersController.get_all", values["route"])
+        self.assertIn("offers", values["statement"])
+
+    @mock.patch.object(query_stats.LOG, "warning")
+    def test_slow_query_disabled(self, mock_warning):
+        self.config(slow_query_threshold=0, group="query_stats")
+        self.db_api.offer_get_all({}).all()
+
+        mock_warning.assert_not_called()
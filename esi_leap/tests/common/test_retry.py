@@ -0,0 +1,129 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import mock
+
+from esi_leap.common import metrics
+from esi_leap.common import retry
+from esi_leap.tests import base
+
+
+class TestBackoff(base.TestCase):
+    def setUp(self):
+        super(TestBackoff, self).setUp()
+        self.config(base_delay=10, max_delay=100, group="retry")
+
+    @mock.patch("random.uniform")
+    def test_backoff_delay(self, mock_uniform):
+        mock_uniform.side_effect = lambda a, b: (a, b)
+
+        self.assertEqual((5, 10), retry.backoff_delay(1))
+        self.assertEqual((10, 20), retry.backoff_delay(2))
+        self.assertEqual((40, 80), retry.backoff_delay(4))
+        self.assertEqual((50, 100), retry.backoff_delay(5))
+        self.assertEqual((50, 100), retry.backoff_delay(30))
+
+    @mock.patch("oslo_utils.timeutils.utcnow")
+    def test_next_retry_time(self, mock_utcnow):
+        now = datetime.datetime(2026, 10, 19)
+        mock_utcnow.return_value = now
+
+        for attempts in range(1, 10):
+            delay = retry.next_retry_time(attempts) - now
+            self.assertGreaterEqual(delay, datetime.timedelta(seconds=5))
+            self.assertLessEqual(delay, datetime.timedelta(seconds=100))
+
+
+@mock.patch("time.monotonic")
+class TestCircuitBreaker(base.TestCase):
+    def setUp(self):
+        super(TestCircuitBreaker, self).setUp()
+        self.config(
+            breaker_error_rate=0.5,
+            breaker_min_calls=4,
+            breaker_window=60,
+            breaker_cooldown=300,
+            group="retry",
+        )
+
+    def test_opens_on_error_rate(self, mock_monotonic):
+        mock_monotonic.return_value = 1000
+        breaker = retry.CircuitBreaker("ironic")
+
+        for success in (False, True, False):
+            breaker.record(success)
+            self.assertFalse(breaker.is_open)
+        breaker.record(True)
+
+        self.assertTrue(breaker.is_open)
+
+    def test_stays_closed_below_error_rate(self, mock_monotonic):
+        mock_monotonic.return_value = 1000
+        breaker = retry.CircuitBreaker("ironic")
+
+        for success in (False, True, True, True, False, True):
+            breaker.record(success)
+
+        self.assertFalse(breaker.is_open)
+
+    def test_forgets_calls_outside_window(self, mock_monotonic):
+        breaker = retry.CircuitBreaker("ironic")
+        mock_monotonic.return_value = 1000
+        for success in (False, False, False):
+            breaker.record(success)
+
+        mock_monotonic.return_value = 1061
+        for success in (True, True, True):
+            breaker.record(success)
+
+        self.assertFalse(breaker.is_open)
+
+    def test_closes_after_cooldown(self, mock_monotonic):
+        mock_monotonic.return_value = 1000
+        breaker = retry.CircuitBreaker("ironic")
+        for success in (False, False, False, False):
+            breaker.record(success)
+        self.assertTrue(breaker.is_open)
+
+        mock_monotonic.return_value = 1299
+        self.assertTrue(breaker.is_open)
+        mock_monotonic.return_value = 1300
+        self.assertFalse(breaker.is_open)
+
+        # the window starts over once closed
+        breaker.record(False)
+        self.assertFalse(breaker.is_open)
+
+    def test_is_open(self, mock_monotonic):
+        mock_monotonic.return_value = 1000
+        for success in (False, False, False, False):
+            retry.get_breaker("ironic").record(success)
+
+        self.assertTrue(retry.is_open("ironic"))
+        self.assertFalse(retry.is_open("keystone"))
+        self.assertFalse(retry.is_open(None))
+        self.assertEqual(
+            ["ironic", "keystone"], sorted(b.name for b in retry.get_breakers())
+        )
+
+    def test_external_call_records(self, mock_monotonic):
+        mock_monotonic.return_value = 1000
+
+        for i in range(4):
+            try:
+                with metrics.external_call("ironic", "node.get"):
+                    raise ValueError()
+            except ValueError:
+                pass
+
+        self.assertTrue(retry.is_open("ironic"))
@@ -10,7 +10,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import datetime
+import tempfile
+
+from esi_leap.common import statuses
 from esi_leap.common import utils
+from esi_leap.db import api as dbapi
+from esi_leap.objects import base as objects_base
+from esi_leap.objects import offer as offer_obj
 from esi_leap.tests import base
 
 
@@ -23,3 +30,48 @@ class LockTestCase(base.TestCase):
             resource_type + "-" + resource_uuid,
             utils.get_resource_lock_name(resource_type, resource_uuid),
         )
+
+    def test_lock_primary_reads(self):
+        dbapi.allow_replica_reads(True)
+        self.addCleanup(dbapi.allow_replica_reads, False)
+
+        with utils.lock("ironic_node-12345"):
+            self.assertFalse(dbapi.replica_reads_active())
+
+        self.assertTrue(dbapi.replica_reads_active())
+
+
+class LockCacheTestCase(base.DBTestCase):
+    def setUp(self):
+        super(LockCacheTestCase, self).setUp()
+        self.config(lock_path=tempfile.mkdtemp(), group="oslo_concurrency")
+
+    def test_lock_clears_read_cache(self):
+        uuid = "11111111-2222-3333-4444-555555555555"
+        self.db_api.offer_create(
+            {
+                "uuid": uuid,
+                "project_id": "0wn3r",
+                "resource_type": "test_node",
+                "resource_uuid": "12345",
+                "start_time": datetime.datetime(2016, 7, 16),
+                "end_time": datetime.datetime(2016, 8, 16),
+                "status": statuses.AVAILABLE,
+            }
+        )
+
+        with objects_base.read_cache():
+            self.assertEqual(
+                statuses.AVAILABLE, offer_obj.Offer.get(uuid, self.context).status
+            )
+            # e.g. deleted by another worker before the lock is taken
+            self.db_api.offer_update(uuid, {"status": statuses.DELETED})
+            self.assertEqual(
+                statuses.AVAILABLE, offer_obj.Offer.get(uuid, self.context).status
+            )
+
+            with utils.lock("test_node-12345"):
+                self.assertEqual(
+                    statuses.DELETED,
+                    offer_obj.Offer.get(uuid, self.context).status,
+                )
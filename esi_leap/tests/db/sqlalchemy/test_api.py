@@ -12,9 +12,11 @@
 
 import datetime
 import mock
+from oslo_utils import timeutils
 from oslo_utils import uuidutils
 
 from esi_leap.common import exception as e
+from esi_leap.common import query_stats
 from esi_leap.common import statuses
 from esi_leap.db.sqlalchemy import api
 import esi_leap.tests.base as base
@@ -227,6 +229,47 @@ class TestOfferAPI(base.DBTestCase):
         assert len(o) == 1
         assert o[0].to_dict() == offer.to_dict()
 
+    def test_offer_create_bulk(self):
+        offer_2 = dict(test_offer_1, uuid="11112", resource_uuid="1112")
+        offers = api.offer_create_bulk([test_offer_1, offer_2])
+        o = api.offer_get_all({}).all()
+        assert len(o) == 2
+        assert [x.to_dict() for x in o] == [x.to_dict() for x in offers]
+
+    @mock.patch("esi_leap.common.keystone.get_parent_project_id_tree")
+    def test_offer_get_claimable(self, mock_gppit):
+        mock_gppit.return_value = ["12345"]
+        o1 = api.offer_create(test_offer_1)
+        o2 = api.offer_create(dict(test_offer_2, resource_uuid="2222"))
+        o3 = api.offer_create(dict(test_offer_3, resource_uuid="3333"))
+        o4 = api.offer_create(dict(test_offer_1, uuid="44444", resource_uuid="4444"))
+        api.lease_create(dict(test_lease_1, offer_uuid=o4.uuid))
+
+        start = now + datetime.timedelta(days=30)
+        end = now + datetime.timedelta(days=40)
+        res = api.offer_get_claimable(start, end)
+        self.assertEqual([o1.uuid, o2.uuid, o4.uuid], [o.uuid for o in res])
+
+        start = now + datetime.timedelta(days=15)
+        end = now + datetime.timedelta(days=40)
+        res = api.offer_get_claimable(start, end)
+        self.assertEqual([o1.uuid], [o.uuid for o in res])
+
+        start = now + datetime.timedelta(days=55)
+        end = now + datetime.timedelta(days=60)
+        res = api.offer_get_claimable(start, end)
+        self.assertEqual([o1.uuid, o2.uuid, o3.uuid, o4.uuid], [o.uuid for o in res])
+
+        res = api.offer_get_claimable(start, end, lessee_id="12345")
+        self.assertEqual([o1.uuid, o2.uuid, o4.uuid], [o.uuid for o in res])
+        mock_gppit.assert_called_once_with("12345")
+
+        res = api.offer_get_claimable(start, end, offer_uuids=[o3.uuid, o4.uuid])
+        self.assertEqual([o3.uuid, o4.uuid], [o.uuid for o in res])
+
+        res = api.offer_get_claimable(start, end, resource_type="test_node")
+        self.assertEqual([], res)
+
     def test_offer_verify_availability(self):
         offer = api.offer_create(test_offer_1)
 
@@ -402,6 +445,20 @@ class TestOfferAPI(base.DBTestCase):
             [(now + datetime.timedelta(days=50), now + datetime.timedelta(days=60))],
         )
 
+    def test_offer_get_conflict_times_start(self):
+        o1 = api.offer_create(test_offer_1)
+        api.lease_create(dict(test_lease_1, offer_uuid=o1.uuid))
+        api.lease_create(dict(test_lease_2, offer_uuid=o1.uuid))
+        api.lease_create(dict(test_lease_3, offer_uuid=o1.uuid))
+
+        self.assertEqual(
+            api.offer_get_conflict_times(o1, now + datetime.timedelta(days=20)),
+            [
+                (now + datetime.timedelta(days=20), now + datetime.timedelta(days=30)),
+                (now + datetime.timedelta(days=50), now + datetime.timedelta(days=60)),
+            ],
+        )
+
     def test_offer_get_next_lease_start_time(self):
         o1 = api.offer_create(test_offer_1)
         self.assertEqual(
@@ -503,6 +560,53 @@ class TestOfferAPI(base.DBTestCase):
             (res[0].to_dict(), res[1].to_dict(), res[2].to_dict(), res[3].to_dict()),
         )
 
+    def test_offer_get_all_changes_since(self):
+        timeutils.set_time_override(now)
+        self.addCleanup(timeutils.clear_time_override)
+        o1 = api.offer_create(test_offer_1)
+        api.offer_create(test_offer_2)
+        timeutils.advance_time_seconds(60)
+        o3 = api.offer_create(test_offer_3)
+        api.offer_update(o1.uuid, {"status": statuses.DELETED})
+
+        res = api.offer_get_all({"changes_since": now + datetime.timedelta(seconds=60)})
+
+        self.assertEqual(
+            sorted([o1.uuid, o3.uuid]), sorted(offer.uuid for offer in res)
+        )
+
+    def test_offer_get_version(self):
+        timeutils.set_time_override(now)
+        self.addCleanup(timeutils.clear_time_override)
+        o1 = api.offer_create(test_offer_1)
+        api.offer_create(test_offer_5)
+        self.assertEqual((2, now), api.offer_get_version({}))
+
+        # a lease on an offer changes the availabilities of the offer
+        timeutils.advance_time_seconds(5)
+        api.lease_create(dict(test_lease_1, offer_uuid=o1.uuid))
+        self.assertEqual(
+            (3, now + datetime.timedelta(seconds=5)),
+            api.offer_get_version({"resource_uuid": "1111"}),
+        )
+
+    def test_offer_get_next_change_time(self):
+        api.offer_create(test_offer_1)
+        api.offer_create(test_offer_4)
+        api.offer_create(test_offer_5)
+
+        self.assertEqual(
+            test_offer_4["start_time"],
+            api.offer_get_next_change_time({}, now + datetime.timedelta(days=1)),
+        )
+        self.assertEqual(
+            test_offer_1["end_time"],
+            api.offer_get_next_change_time({}, now + datetime.timedelta(days=80)),
+        )
+        self.assertIsNone(
+            api.offer_get_next_change_time({}, now + datetime.timedelta(days=200))
+        )
+
     def test_offer_get_all_time_filter(self):
         o1 = api.offer_create(test_offer_1)
         o2 = api.offer_create(test_offer_2)
@@ -541,6 +645,37 @@ class TestOfferAPI(base.DBTestCase):
             (res[0].to_dict(), res[1].to_dict(), res[2].to_dict(), res[3].to_dict()),
         )
 
+    def test_offer_get_all_availability_filter(self):
+        o1 = api.offer_create(test_offer_1)
+        o2 = api.offer_create(test_offer_2)
+        o3 = api.offer_create(test_offer_3)
+        api.lease_create(dict(test_lease_1, offer_uuid=o1.uuid))
+        api.lease_create(dict(test_lease_3, offer_uuid=o2.uuid))
+        api.lease_create(
+            dict(
+                test_lease_4,
+                offer_uuid=o3.uuid,
+                start_time=now + datetime.timedelta(days=55),
+                end_time=now + datetime.timedelta(days=58),
+            )
+        )
+
+        res = api.offer_get_all(
+            {
+                "available_start_time": now + datetime.timedelta(days=55),
+                "available_end_time": now + datetime.timedelta(days=58),
+            }
+        )
+        self.assertEqual([o1.uuid, o3.uuid], [o.uuid for o in res])
+
+        res = api.offer_get_all(
+            {
+                "available_start_time": now + datetime.timedelta(days=15),
+                "available_end_time": now + datetime.timedelta(days=40),
+            }
+        )
+        self.assertEqual([], [o.uuid for o in res])
+
 
 class TestLeaseAPI(base.DBTestCase):
     def test_lease_get_by_uuid(self):
@@ -658,6 +793,63 @@ class TestLeaseAPI(base.DBTestCase):
         self.assertIn(test_lease_2["uuid"], res_uuids)
         self.assertIn(test_lease_5["uuid"], res_uuids)
 
+    def test_lease_get_all_changes_since(self):
+        timeutils.set_time_override(now)
+        self.addCleanup(timeutils.clear_time_override)
+        api.lease_create(test_lease_1)
+        api.lease_create(test_lease_2)
+        timeutils.advance_time_seconds(60)
+        api.lease_create(test_lease_3)
+        api.lease_offer_bulk_update(
+            [([test_lease_1["uuid"]], {"status": statuses.EXPIRED})], []
+        )
+
+        res = api.lease_get_all({"changes_since": now + datetime.timedelta(seconds=60)})
+
+        self.assertEqual(
+            [test_lease_1["uuid"], test_lease_3["uuid"]],
+            sorted(lease.uuid for lease in res),
+        )
+
+    def test_lease_get_version(self):
+        timeutils.set_time_override(now)
+        self.addCleanup(timeutils.clear_time_override)
+        self.assertEqual((0, None), api.lease_get_version({}))
+
+        api.lease_create(test_lease_1)
+        api.lease_create(test_lease_2)
+        filters = {"status": [statuses.CREATED]}
+        self.assertEqual((2, now), api.lease_get_version(filters))
+        self.assertEqual({"status": [statuses.CREATED]}, filters)
+
+        timeutils.advance_time_seconds(5)
+        api.lease_offer_bulk_update(
+            [([test_lease_1["uuid"]], {"status": statuses.ACTIVE})], []
+        )
+        self.assertEqual(
+            (1, now), api.lease_get_version({"status": [statuses.CREATED]})
+        )
+        self.assertEqual(
+            (2, now + datetime.timedelta(seconds=5)), api.lease_get_version({})
+        )
+
+    def test_lease_get_expiring(self):
+        api.lease_create(test_lease_1)
+        api.lease_create(test_lease_2)
+        api.lease_create(test_lease_3)
+        api.lease_create(test_lease_4)
+        api.lease_create(test_lease_7)
+
+        res = api.lease_get_expiring(
+            now + datetime.timedelta(days=5),
+            now + datetime.timedelta(days=25),
+            [statuses.CREATED, statuses.ACTIVE],
+        ).all()
+
+        self.assertEqual(
+            [test_lease_7["uuid"], test_lease_1["uuid"]], [r.uuid for r in res]
+        )
+
     def test_lease_create(self):
         o1 = api.offer_create(test_offer_2)
         test_lease_4["offer_uuid"] = o1.uuid
@@ -666,6 +858,16 @@ class TestLeaseAPI(base.DBTestCase):
         assert len(l2) == 1
         assert l2[0].to_dict() == l1.to_dict()
 
+    def test_lease_create_bulk(self):
+        o1 = api.offer_create(test_offer_2)
+        lease_2 = dict(test_lease_4, uuid="22222", offer_uuid=o1.uuid)
+        leases = api.lease_create_bulk(
+            [dict(test_lease_4, offer_uuid=o1.uuid), lease_2]
+        )
+        l2 = api.lease_get_all({}).all()
+        assert len(l2) == 2
+        assert [x.to_dict() for x in l2] == [x.to_dict() for x in leases]
+
     def test_lease_update(self):
         o1 = api.offer_create(test_offer_2)
         test_lease_4["offer_uuid"] = o1.uuid
@@ -697,6 +899,66 @@ class TestLeaseAPI(base.DBTestCase):
         self.assertEqual(api.lease_get_by_uuid("lease_4"), None)
 
 
+class TestLeaseRetryAPI(base.DBTestCase):
+    def setUp(self):
+        super(TestLeaseRetryAPI, self).setUp()
+        api.lease_create(dict(test_lease_1, status=statuses.WAIT_FULFILL))
+        api.lease_create(dict(test_lease_2, status=statuses.WAIT_CANCEL))
+
+    def test_lease_schedule_retry(self):
+        schedule = mock.Mock(side_effect=lambda n: now + datetime.timedelta(hours=n))
+
+        api.lease_schedule_retry(["11111"], schedule)
+        api.lease_schedule_retry(["11111"], schedule)
+
+        lease = api.lease_get_by_uuid("11111")
+        self.assertEqual(2, lease.retry_count)
+        self.assertEqual(now + datetime.timedelta(hours=2), lease.next_retry_time)
+        self.assertEqual([mock.call(1), mock.call(2)], schedule.call_args_list)
+        self.assertEqual(0, api.lease_get_by_uuid("22222").retry_count)
+
+    def test_lease_reset_retry(self):
+        api.lease_schedule_retry(["11111", "22222"], lambda n: now)
+
+        api.lease_reset_retry(["11111"])
+
+        lease = api.lease_get_by_uuid("11111")
+        self.assertEqual(0, lease.retry_count)
+        self.assertIsNone(lease.next_retry_time)
+        self.assertEqual(1, api.lease_get_by_uuid("22222").retry_count)
+
+    def test_lease_get_all_retry_due(self):
+        api.lease_schedule_retry(["11111"], lambda n: now + datetime.timedelta(hours=1))
+
+        due = api.lease_get_all({"retry_due": now}).all()
+        later = api.lease_get_all({"retry_due": now + datetime.timedelta(hours=1)})
+
+        self.assertEqual(["22222"], [lease.uuid for lease in due])
+        self.assertEqual({"11111", "22222"}, {lease.uuid for lease in later})
+
+    def test_lease_get_all_retry_status(self):
+        api.lease_schedule_retry(
+            ["11111", "22222"], lambda n: now + datetime.timedelta(hours=1)
+        )
+
+        due = api.lease_get_all(
+            {"retry_due": now, "retry_status": [statuses.WAIT_CANCEL]}
+        )
+
+        # the backoff of the fulfillment does not hold back other transitions
+        self.assertEqual(["11111"], [lease.uuid for lease in due])
+
+    def test_lease_get_retry_queue_depth(self):
+        self.assertEqual(
+            {
+                statuses.WAIT_CANCEL: 1,
+                statuses.WAIT_EXPIRE: 0,
+                statuses.WAIT_FULFILL: 1,
+            },
+            api.lease_get_retry_queue_depth(),
+        )
+
+
 class TestLeaseVerifyChildAvailability(base.DBTestCase):
     def setUp(self):
         super(TestLeaseVerifyChildAvailability, self).setUp()
@@ -837,6 +1099,96 @@ class TestLeaseVerifyChildAvailability(base.DBTestCase):
         )
 
 
+class TestLeaseSubtreeAPI(base.DBTestCase):
+    def setUp(self):
+        super(TestLeaseSubtreeAPI, self).setUp()
+
+        def lease_data(**kwargs):
+            data = dict(
+                uuid=uuidutils.generate_uuid(),
+                project_id="1e5533",
+                owner_id="0wn3r",
+                resource_uuid="1111",
+                resource_type="dummy_node",
+                start_time=now,
+                end_time=now + datetime.timedelta(days=10),
+                status=statuses.ACTIVE,
+            )
+            data.update(kwargs)
+            return data
+
+        self.parent = api.lease_create(lease_data())
+        self.offer = api.offer_create(
+            dict(
+                uuid=uuidutils.generate_uuid(),
+                project_id="1e5533",
+                parent_lease_uuid=self.parent.uuid,
+                resource_uuid="1111",
+                resource_type="dummy_node",
+                start_time=now,
+                end_time=now + datetime.timedelta(days=10),
+                status=statuses.AVAILABLE,
+            )
+        )
+        self.child = api.lease_create(lease_data(parent_lease_uuid=self.parent.uuid))
+        self.grandchild = api.lease_create(
+            lease_data(parent_lease_uuid=self.child.uuid, status=statuses.CREATED)
+        )
+        self.offer_lease = api.lease_create(
+            lease_data(offer_uuid=self.offer.uuid, parent_lease_uuid=self.parent.uuid)
+        )
+        self.expired_child = api.lease_create(
+            lease_data(parent_lease_uuid=self.parent.uuid, status=statuses.EXPIRED)
+        )
+
+    def test_lease_get_subtree(self):
+        leases, offers = api.lease_get_subtree(lease_uuid=self.parent.uuid)
+
+        self.assertEqual(
+            [self.grandchild.uuid, self.child.uuid, self.offer_lease.uuid],
+            [lease.uuid for lease in leases],
+        )
+        self.assertEqual([self.offer.uuid], [offer.uuid for offer in offers])
+
+    def test_lease_get_subtree_offer(self):
+        leases, offers = api.lease_get_subtree(offer_uuid=self.offer.uuid)
+
+        self.assertEqual([self.offer_lease.uuid], [lease.uuid for lease in leases])
+        self.assertEqual([], offers)
+
+    def test_lease_get_subtree_leaf(self):
+        leases, offers = api.lease_get_subtree(lease_uuid=self.grandchild.uuid)
+
+        self.assertEqual([], leases)
+        self.assertEqual([], offers)
+
+    def test_lease_offer_bulk_update(self):
+        api.lease_offer_bulk_update(
+            [
+                ([self.child.uuid, self.grandchild.uuid], {"status": statuses.DELETED}),
+                ([self.offer_lease.uuid], {"status": statuses.WAIT_CANCEL}),
+                ([], {"status": statuses.ERROR}),
+            ],
+            [([self.offer.uuid], {"status": statuses.DELETED})],
+        )
+
+        self.assertEqual(
+            statuses.DELETED, api.lease_get_by_uuid(self.child.uuid).status
+        )
+        self.assertEqual(
+            statuses.DELETED, api.lease_get_by_uuid(self.grandchild.uuid).status
+        )
+        self.assertEqual(
+            statuses.WAIT_CANCEL, api.lease_get_by_uuid(self.offer_lease.uuid).status
+        )
+        self.assertEqual(
+            statuses.ACTIVE, api.lease_get_by_uuid(self.parent.uuid).status
+        )
+        self.assertEqual(
+            statuses.DELETED, api.offer_get_by_uuid(self.offer.uuid).status
+        )
+
+
 class TestResourceVerifyAvailabilityAPI(base.DBTestCase):
     def test_resource_verify_availability_offer_conflict(self):
         o1 = api.offer_create(test_offer_4)
@@ -944,6 +1296,57 @@ class TestResourceVerifyAvailabilityAPI(base.DBTestCase):
             end,
         )
 
+    def test_resource_get_conflicts(self):
+        api.offer_create(test_offer_4)
+        api.lease_create(dict(test_lease_1, resource_uuid="2222"))
+        r_uuids = ["1111", "2222", "3333"]
+
+        start = test_offer_4["end_time"] + datetime.timedelta(days=1)
+        end = test_offer_4["end_time"] + datetime.timedelta(days=5)
+        self.assertEqual(
+            set(), api.resource_get_conflicts("dummy_node", r_uuids, start, end)
+        )
+
+        start = test_lease_1["start_time"] + datetime.timedelta(days=1)
+        end = test_offer_4["start_time"] + datetime.timedelta(days=1)
+        self.assertEqual(
+            {"1111", "2222"},
+            api.resource_get_conflicts("dummy_node", r_uuids, start, end),
+        )
+        self.assertEqual(
+            set(), api.resource_get_conflicts("test_node", r_uuids, start, end)
+        )
+
+    def test_resource_get_changed(self):
+        api.offer_create(test_offer_4)
+        api.lease_create(dict(test_lease_1, resource_uuid="2222"))
+        since = datetime.datetime.utcnow() + datetime.timedelta(minutes=1)
+
+        changed = api.resource_get_changed(since - datetime.timedelta(hours=1))
+        self.assertEqual(
+            [("dummy_node", "1111"), ("dummy_node", "2222")],
+            sorted(tuple(r) for r in changed),
+        )
+        self.assertEqual([], api.resource_get_changed(since))
+
+    def test_resource_get_capacity(self):
+        o1 = api.offer_create(test_offer_4)
+        o2 = api.offer_create(dict(test_offer_5, resource_uuid="2222"))
+        api.offer_create(dict(test_offer_1, status=statuses.DELETED))
+        api.lease_create(dict(test_lease_1, offer_uuid=o1.uuid))
+        api.lease_create(dict(test_lease_2, offer_uuid=o2.uuid))
+        api.lease_create(dict(test_lease_3, offer_uuid=o1.uuid))
+
+        offers, leases = api.resource_get_capacity()
+        self.assertEqual([o1.uuid, o2.uuid], [o.uuid for o in offers])
+        self.assertEqual(
+            [o1.uuid, o2.uuid, o1.uuid], [lease.offer_uuid for lease in leases]
+        )
+
+        offers, leases = api.resource_get_capacity([("dummy_node", "2222")])
+        self.assertEqual([o2.uuid], [o.uuid for o in offers])
+        self.assertEqual([o2.uuid], [lease.offer_uuid for lease in leases])
+
 
 class TestEventAPI(base.DBTestCase):
     def test_event_get_all(self):
@@ -992,8 +1395,278 @@ class TestEventAPI(base.DBTestCase):
         self.assertIn(test_event_1["id"], event_ids)
         self.assertIn(test_event_2["id"], event_ids)
 
+    def test_event_get_all_page(self):
+        for i in range(1, 8):
+            api.event_create(dict(test_event_1, id=i))
+
+        events = api.event_get_all({"last_event_id": 2, "limit": 3}).all()
+
+        self.assertEqual([3, 4, 5], [event.id for event in events])
+
+    def test_event_get_all_page_by_lessee_or_owner_id(self):
+        # the project is lessee of the even events and owner of the odd
+        # ones, and neither of events 5 and 6
+        for i in range(1, 9):
+            api.event_create(
+                dict(
+                    test_event_1,
+                    id=i,
+                    lessee_id="p" if i % 2 == 0 and i != 6 else "other",
+                    owner_id="p" if i % 2 == 1 and i != 5 else "other",
+                )
+            )
+
+        events = api.event_get_all(
+            {"lessee_or_owner_id": "p", "last_event_id": 1, "limit": 4}
+        ).all()
+
+        self.assertEqual([2, 3, 4, 7], [event.id for event in events])
+
+    def test_event_get_version(self):
+        timeutils.set_time_override(now)
+        self.addCleanup(timeutils.clear_time_override)
+        for i in range(1, 8):
+            api.event_create(dict(test_event_1, id=i))
+
+        self.assertEqual(
+            (3, now), api.event_get_version({"last_event_id": 2, "limit": 3})
+        )
+        self.assertEqual((0, None), api.event_get_version({"last_event_id": 7}))
+
+    def test_event_get_version_read_transaction(self):
+        api.event_create(test_event_1)
+        statements = []
+
+        def observer(statement, duration):
+            statements.append(statement.split(None, 1)[0].upper())
+
+        query_stats.instrument()
+        query_stats.add_observer(observer)
+        self.addCleanup(query_stats._OBSERVERS.remove, observer)
+
+        with api.read_transaction():
+            self.assertEqual(1, api.event_get_version({})[0])
+            self.assertEqual(1, len(api.event_get_all({}).all()))
+
+        # one connection, and one statement for the version
+        selects = [s for s in statements if s == "SELECT"]
+        self.assertEqual(3, len(selects))
+
     def test_lease_create(self):
         event = api.event_create(test_event_1)
         events = api.event_get_all({}).all()
         assert len(events) == 1
         assert events[0].to_dict() == event.to_dict()
+
+
+class TestResourceInventoryAPI(base.DBTestCase):
+    def setUp(self):
+        super(TestResourceInventoryAPI, self).setUp()
+        self.node_1 = {
+            "uuid": "11111",
+            "name": "node-1",
+            "resource_class": "baremetal",
+            "owner": "0wn3r",
+            "lessee": None,
+            "provision_state": "available",
+            "maintenance": False,
+            "properties": {"cpus": 40},
+            "lease_uuid": None,
+        }
+        self.node_2 = dict(
+            self.node_1, uuid="22222", name="node-2", owner="0wn3r_2", lessee="0wn3r"
+        )
+        self.node_3 = dict(self.node_1, uuid="33333", name="node-3", owner="0wn3r_2")
+
+    def test_resource_inventory_sync(self):
+        result = api.resource_inventory_sync([self.node_1, self.node_2], now)
+
+        self.assertEqual((2, 0, 0), result)
+        rows = api.resource_inventory_get_all({}).all()
+        self.assertEqual({"11111", "22222"}, {row.uuid for row in rows})
+        self.assertEqual(now, api.resource_inventory_get_synced_at())
+
+    def test_resource_inventory_sync_diff(self):
+        api.resource_inventory_sync([self.node_1, self.node_2], now)
+        node_1 = dict(self.node_1, lessee="l3ss33", lease_uuid="12345")
+        later = now + datetime.timedelta(minutes=1)
+
+        result = api.resource_inventory_sync([node_1, self.node_3], later)
+
+        self.assertEqual((1, 1, 1), result)
+        rows = {row.uuid: row for row in api.resource_inventory_get_all({})}
+        self.assertEqual({"11111", "33333"}, set(rows))
+        self.assertEqual("l3ss33", rows["11111"].lessee)
+        self.assertEqual("12345", rows["11111"].lease_uuid)
+        self.assertEqual({"cpus": 40}, rows["11111"].properties)
+        self.assertEqual(later, api.resource_inventory_get_synced_at())
+
+    def test_resource_inventory_sync_unchanged(self):
+        api.resource_inventory_sync([self.node_1], now)
+        later = now + datetime.timedelta(minutes=1)
+        statements = []
+
+        def observer(statement, duration):
+            statements.append(statement)
+
+        query_stats.instrument()
+        query_stats.add_observer(observer)
+        self.addCleanup(query_stats._OBSERVERS.remove, observer)
+
+        result = api.resource_inventory_sync([self.node_1], later)
+
+        self.assertEqual((0, 0, 0), result)
+        self.assertEqual(later, api.resource_inventory_get_synced_at())
+        updates = [s for s in statements if s.lstrip().upper().startswith("UPDATE")]
+        self.assertEqual(1, len(updates))
+        self.assertIn("resource_inventory_sync", updates[0])
+
+    def test_resource_inventory_get_synced_at_never(self):
+        self.assertIsNone(api.resource_inventory_get_synced_at())
+
+    def test_resource_inventory_get_all_filters(self):
+        api.resource_inventory_sync([self.node_1, self.node_2, self.node_3], now)
+
+        def uuids(filters):
+            rows = api.resource_inventory_get_all(filters)
+            return sorted(row.uuid for row in rows)
+
+        self.assertEqual(["11111"], uuids({"owner": "0wn3r"}))
+        self.assertEqual(["11111", "22222"], uuids({"owner_or_lessee": "0wn3r"}))
+        self.assertEqual(["22222", "33333"], uuids({"uuids": ["22222", "33333"]}))
+        self.assertEqual(
+            ["33333"], uuids({"owner": "0wn3r_2", "uuids": ["11111", "33333"]})
+        )
+
+    def test_resource_inventory_get_version(self):
+        timeutils.set_time_override(now)
+        self.addCleanup(timeutils.clear_time_override)
+        api.resource_inventory_sync([self.node_1, self.node_2], now)
+
+        # a sync that changes nothing leaves the version alone
+        timeutils.advance_time_seconds(5)
+        api.resource_inventory_sync([self.node_1, self.node_2], now)
+        self.assertEqual((2, now), api.resource_inventory_get_version({}))
+        self.assertEqual(
+            (1, now), api.resource_inventory_get_version({"owner": "0wn3r"})
+        )
+
+        node_1 = dict(self.node_1, lessee="l3ss33")
+        api.resource_inventory_sync([node_1, self.node_2], now)
+        self.assertEqual(
+            (2, now + datetime.timedelta(seconds=5)),
+            api.resource_inventory_get_version({}),
+        )
+
+
+class TestResourceOperationAPI(base.DBTestCase):
+    def setUp(self):
+        super(TestResourceOperationAPI, self).setUp()
+        api.lease_create(dict(test_lease_1, status=statuses.ACTIVE))
+        self.operations = [
+            {
+                "action": "cancel",
+                "resource_type": "dummy_node",
+                "resource_uuid": "1718",
+                "lease_uuid": uuid,
+            }
+            for uuid in ("11111", "22222", "33333")
+        ]
+
+    def test_lease_offer_bulk_update_operations(self):
+        api.lease_offer_bulk_update(
+            [(["11111"], {"status": statuses.WAIT_CANCEL})],
+            [],
+            operations=self.operations,
+        )
+
+        self.assertEqual(statuses.WAIT_CANCEL, api.lease_get_by_uuid("11111").status)
+        ops = api.resource_operation_get_all({}).all()
+        self.assertEqual(["11111", "22222", "33333"], [op.lease_uuid for op in ops])
+        self.assertEqual([0, 0, 0], [op.attempts for op in ops])
+
+    def test_resource_operation_get_all_limit(self):
+        api.lease_offer_bulk_update([], [], operations=self.operations)
+
+        ops = api.resource_operation_get_all({"limit": 2}).all()
+
+        self.assertEqual(["11111", "22222"], [op.lease_uuid for op in ops])
+
+    def test_resource_operation_complete(self):
+        api.lease_offer_bulk_update([], [], operations=self.operations)
+        ops = api.resource_operation_get_all({}).all()
+
+        api.resource_operation_complete(
+            [ops[0].id, ops[2].id], [(["11111"], {"status": statuses.DELETED})]
+        )
+
+        self.assertEqual(statuses.DELETED, api.lease_get_by_uuid("11111").status)
+        self.assertEqual(
+            ["22222"], [op.lease_uuid for op in api.resource_operation_get_all({})]
+        )
+
+    def test_resource_operation_fail(self):
+        api.lease_offer_bulk_update([], [], operations=self.operations[:1])
+        op = api.resource_operation_get_all({}).one()
+
+        api.resource_operation_fail(op.id, "first")
+        api.resource_operation_fail(op.id, "second")
+
+        op = api.resource_operation_get_all({}).one()
+        self.assertEqual(2, op.attempts)
+        self.assertEqual("second", op.last_error)
+
+    def test_resource_operation_fail_backs_off_resource(self):
+        other = dict(self.operations[0], resource_uuid="1719", lease_uuid="44444")
+        api.lease_offer_bulk_update([], [], operations=self.operations + [other])
+        ops = api.resource_operation_get_all({}).all()
+        later = now + datetime.timedelta(minutes=5)
+
+        api.resource_operation_fail(ops[0].id, "bad", later)
+
+        due = api.resource_operation_get_all({"due": now}).all()
+        self.assertEqual(["44444"], [op.lease_uuid for op in due])
+        due = api.resource_operation_get_all({"due": later}).all()
+        self.assertEqual(4, len(due))
+
+
+class TestReadRoutingAPI(base.DBTestCase):
+    def tearDown(self):
+        api.allow_replica_reads(False)
+        super(TestReadRoutingAPI, self).tearDown()
+
+    @mock.patch.object(api.enginefacade, "reader")
+    def test_replica_reads(self, mock_reader):
+        api.allow_replica_reads(True)
+        api.offer_get_all({})
+        api.lease_get_by_uuid("11111")
+        api.event_get_all({})
+
+        self.assertEqual(3, mock_reader.async_.using.call_count)
+        mock_reader.using.assert_not_called()
+
+    @mock.patch.object(api.enginefacade, "reader")
+    def test_replica_reads_not_allowed(self, mock_reader):
+        api.offer_get_all({})
+
+        mock_reader.using.assert_called_once_with(api._CONTEXT)
+        mock_reader.async_.using.assert_not_called()
+
+    @mock.patch.object(api.enginefacade, "reader")
+    def test_replica_reads_primary_only_queries(self, mock_reader):
+        api.allow_replica_reads(True)
+        api.offer_get_conflict_times(mock.Mock(uuid="11111"))
+
+        mock_reader.using.assert_called_once_with(api._CONTEXT)
+        mock_reader.async_.using.assert_not_called()
+
+    @mock.patch.object(api.enginefacade, "reader")
+    def test_primary_reads(self, mock_reader):
+        api.allow_replica_reads(True)
+        with api.primary_reads():
+            self.assertFalse(api.replica_reads_active())
+            api.offer_get_by_uuid("11111")
+
+        self.assertTrue(api.replica_reads_active())
+        mock_reader.using.assert_called_once_with(api._CONTEXT)
+        mock_reader.async_.using.assert_not_called()
@@ -0,0 +1,219 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import tempfile
+
+import mock
+from oslo_utils import uuidutils
+
+from esi_leap.common import statuses
+from esi_leap.manager import reconcile
+from esi_leap.tests import base
+
+
+class FakeNode(object):
+    def __init__(self, uuid, lease_uuid=None, lessee=None):
+        self.uuid = uuid
+        self.lessee = lessee
+        self.properties = {"cpus": 40}
+        if lease_uuid is not None:
+            self.properties["lease_uuid"] = lease_uuid
+
+
+class TestReconcile(base.DBTestCase):
+    def setUp(self):
+        super(TestReconcile, self).setUp()
+        self.start_time = datetime.datetime(2016, 7, 16, 19, 20, 30)
+        self.config(lock_path=tempfile.mkdtemp(), group="oslo_concurrency")
+
+    def _lease(self, node_uuid, status=statuses.ACTIVE, parent=None, project="le55ee"):
+        lease = {
+            "uuid": uuidutils.generate_uuid(),
+            "project_id": project,
+            "owner_id": "0wn3r",
+            "resource_type": "ironic_node",
+            "resource_uuid": node_uuid,
+            "start_time": self.start_time,
+            "end_time": self.start_time + datetime.timedelta(days=100),
+            "status": status,
+            "parent_lease_uuid": parent["uuid"] if parent else None,
+        }
+        self.db_api.lease_create(lease)
+        return lease
+
+    @mock.patch("esi_leap.common.ironic.get_node_list")
+    def test_reconcile_dry_run(self, mock_gnl):
+        in_sync = self._lease("node-1")
+        missing = self._lease("node-2")
+        parent = self._lease("node-3", project="p4r3nt")
+        child = self._lease("node-3", parent=parent, project="ch1ld")
+        expired = self._lease("node-4", status=statuses.EXPIRED)
+        mock_gnl.return_value = [
+            FakeNode("node-1", in_sync["uuid"], "le55ee"),
+            FakeNode("node-2"),
+            FakeNode("node-3", parent["uuid"], "p4r3nt"),
+            FakeNode("node-4", expired["uuid"], "le55ee"),
+            FakeNode("node-5"),
+        ]
+
+        with mock.patch.object(reconcile, "_fix") as mock_fix:
+            mismatches = reconcile.reconcile(self.context, dry_run=True)
+
+        mock_gnl.assert_called_once_with()
+        mock_fix.assert_not_called()
+        self.assertEqual(
+            [
+                ("node-2", missing["uuid"], None, reconcile.SET_LEASE),
+                ("node-3", child["uuid"], parent["uuid"], reconcile.SET_LEASE),
+                ("node-4", None, expired["uuid"], reconcile.REMOVE_LEASE),
+            ],
+            [tuple(m) for m in mismatches],
+        )
+
+    @mock.patch("esi_leap.common.ironic.get_node_list")
+    def test_reconcile_wrong_lessee(self, mock_gnl):
+        lease = self._lease("node-1")
+        mock_gnl.return_value = [FakeNode("node-1", lease["uuid"], "0th3r")]
+
+        mismatches = reconcile.reconcile(self.context, dry_run=True)
+
+        self.assertEqual(
+            [("node-1", lease["uuid"], lease["uuid"], reconcile.SET_LEASE)],
+            [tuple(m) for m in mismatches],
+        )
+
+    @mock.patch("esi_leap.common.ironic.get_node_list")
+    def test_reconcile_skips_unclear_node(self, mock_gnl):
+        self._lease("node-1")
+        self._lease("node-1")
+        mock_gnl.return_value = [FakeNode("node-1")]
+
+        self.assertEqual([], reconcile.reconcile(self.context, dry_run=True))
+
+    @mock.patch("esi_leap.resource_objects.ironic_node.IronicNode")
+    @mock.patch("esi_leap.common.ironic.get_node_list")
+    def test_reconcile_fix(self, mock_gnl, mock_node):
+        missing = self._lease("node-2")
+        expired = self._lease("node-4", status=statuses.EXPIRED)
+        mock_gnl.return_value = [
+            FakeNode("node-2"),
+            FakeNode("node-4", expired["uuid"], "le55ee"),
+            FakeNode("node-5", uuidutils.generate_uuid(), "le55ee"),
+        ]
+        nodes = {
+            "node-2": mock.Mock(
+                get_lease_uuid=mock.Mock(return_value=None),
+                get_lessee_project_id=mock.Mock(return_value=None),
+            ),
+            "node-4": mock.Mock(
+                get_lease_uuid=mock.Mock(return_value=expired["uuid"]),
+                get_lessee_project_id=mock.Mock(return_value="le55ee"),
+            ),
+            "node-5": mock.Mock(
+                get_lease_uuid=mock.Mock(
+                    return_value=mock_gnl.return_value[2].properties["lease_uuid"]
+                ),
+                get_lessee_project_id=mock.Mock(return_value="le55ee"),
+            ),
+        }
+        mock_node.side_effect = nodes.get
+
+        mismatches = reconcile.reconcile(self.context)
+
+        self.assertEqual(3, len(mismatches))
+        nodes["node-2"].set_lease.assert_called_once()
+        self.assertEqual(
+            missing["uuid"], nodes["node-2"].set_lease.call_args[0][0].uuid
+        )
+        nodes["node-4"].remove_lease.assert_called_once()
+        self.assertEqual(
+            expired["uuid"], nodes["node-4"].remove_lease.call_args[0][0].uuid
+        )
+        # a lease unknown to the database is reported but left alone
+        nodes["node-5"].remove_lease.assert_not_called()
+
+    @mock.patch("esi_leap.common.ironic.get_node_list")
+    def test_reconcile_skips_waiting_lease(self, mock_gnl):
+        expiring = self._lease("node-1", status=statuses.WAIT_EXPIRE)
+        fulfilling = self._lease("node-2", status=statuses.WAIT_FULFILL)
+        mock_gnl.return_value = [
+            FakeNode("node-1", expiring["uuid"], "le55ee"),
+            FakeNode("node-2", fulfilling["uuid"], "le55ee"),
+        ]
+
+        self.assertEqual([], reconcile.reconcile(self.context, dry_run=True))
+
+    @mock.patch("esi_leap.objects.lease.Lease.deactivate", autospec=True)
+    @mock.patch("esi_leap.resource_objects.ironic_node.IronicNode")
+    @mock.patch("esi_leap.common.ironic.get_node_list")
+    def test_reconcile_fix_deactivates(self, mock_gnl, mock_node, mock_deactivate):
+        expired = self._lease("node-1", status=statuses.EXPIRED)
+        mock_gnl.return_value = [FakeNode("node-1", expired["uuid"], "le55ee")]
+        node = mock_node.return_value
+        node.get_lease_uuid.return_value = expired["uuid"]
+        node.get_lessee_project_id.return_value = "le55ee"
+
+        reconcile.reconcile(self.context)
+
+        mock_deactivate.assert_called_once_with(mock.ANY, self.context, node)
+        self.assertEqual(expired["uuid"], mock_deactivate.call_args[0][0].uuid)
+        node.remove_lease.assert_not_called()
+
+    @mock.patch("esi_leap.resource_objects.ironic_node.IronicNode")
+    @mock.patch("esi_leap.common.ironic.get_node_list")
+    def test_reconcile_fix_rechecks_waiting_lease(self, mock_gnl, mock_node):
+        expiring = self._lease("node-1", status=statuses.WAIT_EXPIRE)
+        mock_gnl.return_value = [FakeNode("node-1", uuidutils.generate_uuid())]
+        # the listing is stale; the node now carries a lease being expired
+        node = mock_node.return_value
+        node.get_lease_uuid.return_value = expiring["uuid"]
+        node.get_lessee_project_id.return_value = "le55ee"
+
+        mismatches = reconcile.reconcile(self.context)
+
+        self.assertEqual(1, len(mismatches))
+        node.remove_lease.assert_not_called()
+        node.set_lease.assert_not_called()
+
+    @mock.patch("esi_leap.resource_objects.ironic_node.IronicNode")
+    @mock.patch("esi_leap.common.ironic.get_node_list")
+    def test_reconcile_fix_rechecks_node(self, mock_gnl, mock_node):
+        lease = self._lease("node-1")
+        mock_gnl.return_value = [FakeNode("node-1")]
+        # the lease was set on the node after the listing
+        node = mock_node.return_value
+        node.get_lease_uuid.return_value = lease["uuid"]
+        node.get_lessee_project_id.return_value = "le55ee"
+
+        mismatches = reconcile.reconcile(self.context)
+
+        self.assertEqual(1, len(mismatches))
+        mock_node.assert_called_once_with("node-1")
+        node.set_lease.assert_not_called()
+        node.remove_lease.assert_not_called()
+
+    @mock.patch.object(reconcile, "_fix")
+    @mock.patch("esi_leap.common.ironic.get_node_list")
+    def test_reconcile_limit(self, mock_gnl, mock_fix):
+        for node_uuid in ("node-1", "node-2", "node-3"):
+            self._lease(node_uuid)
+        mock_gnl.return_value = [FakeNode(n) for n in ("node-1", "node-2", "node-3")]
+        mock_fix.side_effect = [Exception("bad"), None]
+
+        mismatches = reconcile.reconcile(self.context, limit=2)
+
+        self.assertEqual(3, len(mismatches))
+        mock_fix.assert_has_calls(
+            [mock.call(self.context, "node-1"), mock.call(self.context, "node-2")]
+        )
+        self.assertEqual(2, mock_fix.call_count)
@@ -14,7 +14,9 @@ import datetime
 import mock
 from oslo_utils import uuidutils
 
+from esi_leap.common import retry
 from esi_leap.common import statuses
+from esi_leap.manager import reconcile
 from esi_leap.manager.service import ManagerService
 from esi_leap.objects import lease
 from esi_leap.objects import offer
@@ -41,6 +43,8 @@ class TestService(base.TestCase):
             name="c",
             uuid=uuidutils.generate_uuid(),
             project_id="lesseeid",
+            resource_type="test_node",
+            resource_uuid="abc",
             status=statuses.CREATED,
             start_time=datetime.datetime(3000, 7, 16),
             end_time=datetime.datetime(4000, 7, 16),
@@ -58,8 +62,35 @@ class TestService(base.TestCase):
 
         assert mock_fulfill.call_count == 2
         mock_ga.assert_called_once_with(
-            {"status": [statuses.CREATED, statuses.WAIT_FULFILL]}, s._context
+            {
+                "status": [statuses.CREATED, statuses.WAIT_FULFILL],
+                "retry_due": mock_utcnow.return_value,
+            },
+            s._context,
+        )
+
+    @mock.patch("esi_leap.common.retry.is_open")
+    @mock.patch("esi_leap.objects.lease.Lease.fulfill")
+    @mock.patch("oslo_utils.timeutils.utcnow")
+    @mock.patch("esi_leap.objects.lease.Lease.get_all")
+    def test__fulfill_leases_breaker_open(
+        self, mock_ga, mock_utcnow, mock_fulfill, mock_is_open
+    ):
+        ironic_lease = lease.Lease(
+            uuid=uuidutils.generate_uuid(),
+            resource_type="ironic_node",
+            start_time=datetime.datetime(3000, 7, 16),
+            end_time=datetime.datetime(4000, 7, 16),
         )
+        mock_ga.return_value = [ironic_lease, self.test_lease]
+        mock_utcnow.return_value = datetime.datetime(3500, 7, 16)
+        mock_is_open.side_effect = lambda backend: backend == "ironic"
+
+        s = ManagerService()
+        s._fulfill_leases()
+
+        mock_fulfill.assert_called_once_with(s._context)
+        mock_is_open.assert_has_calls([mock.call("ironic"), mock.call(None)])
 
     @mock.patch("esi_leap.objects.lease.Lease.save")
     @mock.patch("esi_leap.objects.lease.Lease.fulfill")
@@ -71,6 +102,8 @@ class TestService(base.TestCase):
             name="c",
             uuid=uuidutils.generate_uuid(),
             project_id="lesseeid",
+            resource_type="test_node",
+            resource_uuid="abc",
             status=statuses.CREATED,
             start_time=datetime.datetime(3000, 7, 16),
             end_time=datetime.datetime(4000, 7, 16),
@@ -84,7 +117,11 @@ class TestService(base.TestCase):
 
         mock_fulfill.assert_called_once()
         mock_ga.assert_called_once_with(
-            {"status": [statuses.CREATED, statuses.WAIT_FULFILL]}, s._context
+            {
+                "status": [statuses.CREATED, statuses.WAIT_FULFILL],
+                "retry_due": mock_utcnow.return_value,
+            },
+            s._context,
         )
         self.assertEqual(statuses.ERROR, error_lease.status)
         mock_save.assert_called_once()
@@ -107,7 +144,9 @@ class TestService(base.TestCase):
                     statuses.CREATED,
                     statuses.WAIT_EXPIRE,
                     statuses.WAIT_FULFILL,
-                ]
+                ],
+                "retry_due": mock_utcnow.return_value,
+                "retry_status": [statuses.WAIT_EXPIRE],
             },
             s._context,
         )
@@ -122,6 +161,8 @@ class TestService(base.TestCase):
             name="c",
             uuid=uuidutils.generate_uuid(),
             project_id="lesseeid",
+            resource_type="test_node",
+            resource_uuid="abc",
             status=statuses.CREATED,
             start_time=datetime.datetime(3000, 7, 16),
             end_time=datetime.datetime(4000, 7, 16),
@@ -141,13 +182,40 @@ class TestService(base.TestCase):
                     statuses.CREATED,
                     statuses.WAIT_EXPIRE,
                     statuses.WAIT_FULFILL,
-                ]
+                ],
+                "retry_due": mock_utcnow.return_value,
+                "retry_status": [statuses.WAIT_EXPIRE],
             },
             s._context,
         )
         self.assertEqual(statuses.ERROR, error_lease.status)
         mock_save.assert_called_once()
 
+    @mock.patch("esi_leap.objects.lease.Lease.save")
+    @mock.patch("esi_leap.objects.lease.Lease.expire")
+    @mock.patch("oslo_utils.timeutils.utcnow")
+    @mock.patch("esi_leap.objects.lease.Lease.get_all")
+    def test__expire_leases_unknown_type(
+        self, mock_ga, mock_utcnow, mock_expire, mock_save
+    ):
+        bad_lease = lease.Lease(
+            uuid=uuidutils.generate_uuid(),
+            resource_type="bad_type",
+            status=statuses.ACTIVE,
+            start_time=datetime.datetime(3000, 7, 16),
+            end_time=datetime.datetime(4000, 7, 16),
+        )
+        mock_ga.return_value = [bad_lease, self.test_lease]
+        mock_utcnow.return_value = datetime.datetime(5000, 7, 16)
+
+        s = ManagerService()
+        s._expire_leases()
+
+        # the other leases are still expired
+        mock_expire.assert_called_once_with(s._context)
+        self.assertEqual(statuses.ERROR, bad_lease.status)
+        mock_save.assert_called_once()
+
     @mock.patch("esi_leap.objects.lease.Lease.cancel")
     @mock.patch("oslo_utils.timeutils.utcnow")
     @mock.patch("esi_leap.objects.lease.Lease.get_all")
@@ -158,7 +226,29 @@ class TestService(base.TestCase):
         s._cancel_leases()
 
         assert mock_cancel.call_count == 2
-        mock_ga.assert_called_once_with({"status": [statuses.WAIT_CANCEL]}, s._context)
+        mock_ga.assert_called_once_with(
+            {"status": [statuses.WAIT_CANCEL], "retry_due": mock_utcnow.return_value},
+            s._context,
+        )
+
+    @mock.patch("esi_leap.objects.lease.get_queued_lease_uuids")
+    @mock.patch("esi_leap.objects.lease.Lease.cancel")
+    @mock.patch("esi_leap.objects.lease.Lease.get_all")
+    def test__cancel_leases_skips_queued(self, mock_ga, mock_cancel, mock_gqlu):
+        self.config(enabled=True, group="outbox")
+        queued_lease = lease.Lease(
+            uuid=uuidutils.generate_uuid(),
+            resource_type="test_node",
+            status=statuses.WAIT_CANCEL,
+        )
+        mock_ga.return_value = [self.test_lease, queued_lease]
+        mock_gqlu.return_value = {queued_lease.uuid}
+
+        s = ManagerService()
+        s._cancel_leases()
+
+        mock_cancel.assert_called_once_with()
+        mock_gqlu.assert_called_once_with()
 
     @mock.patch("esi_leap.objects.lease.Lease.save")
     @mock.patch("esi_leap.objects.lease.Lease.cancel")
@@ -170,6 +260,8 @@ class TestService(base.TestCase):
             name="c",
             uuid=uuidutils.generate_uuid(),
             project_id="lesseeid",
+            resource_type="test_node",
+            resource_uuid="abc",
             status=statuses.WAIT_CANCEL,
             start_time=datetime.datetime(3000, 7, 16),
             end_time=datetime.datetime(4000, 7, 16),
@@ -182,7 +274,10 @@ class TestService(base.TestCase):
         s._cancel_leases()
 
         mock_cancel.assert_called_once()
-        mock_ga.assert_called_once_with({"status": [statuses.WAIT_CANCEL]}, s._context)
+        mock_ga.assert_called_once_with(
+            {"status": [statuses.WAIT_CANCEL], "retry_due": mock_utcnow.return_value},
+            s._context,
+        )
         self.assertEqual(statuses.ERROR, error_lease.status)
         mock_save.assert_called_once()
 
@@ -229,3 +324,74 @@ class TestService(base.TestCase):
         )
         self.assertEqual(statuses.ERROR, error_offer.status)
         mock_save.assert_called_once()
+
+    @mock.patch("esi_leap.common.inventory.sync")
+    def test__sync_inventory(self, mock_sync):
+        s = ManagerService()
+        s._sync_inventory()
+
+        mock_sync.assert_called_once_with()
+
+    @mock.patch("esi_leap.common.inventory.sync")
+    def test__sync_inventory_error(self, mock_sync):
+        mock_sync.side_effect = Exception("whoops")
+
+        s = ManagerService()
+        s._sync_inventory()
+
+        mock_sync.assert_called_once_with()
+
+    @mock.patch("esi_leap.objects.lease.apply_resource_operations")
+    def test__apply_resource_operations(self, mock_aro):
+        self.config(batch_size=5, group="outbox")
+        mock_aro.return_value = 3
+
+        s = ManagerService()
+        s._apply_resource_operations()
+
+        mock_aro.assert_called_once_with(s._context, 5)
+
+    @mock.patch("esi_leap.objects.lease.apply_resource_operations")
+    def test__apply_resource_operations_error(self, mock_aro):
+        mock_aro.side_effect = Exception("whoops")
+
+        s = ManagerService()
+        s._apply_resource_operations()
+
+        mock_aro.assert_called_once_with(s._context, 100)
+
+    @mock.patch("esi_leap.common.metrics.set_breaker_open")
+    @mock.patch("esi_leap.common.metrics.set_retry_queue_depth")
+    @mock.patch("esi_leap.objects.lease.get_retry_queue_depth")
+    def test__report_retries(self, mock_grqd, mock_srqd, mock_sbo):
+        mock_grqd.return_value = {statuses.WAIT_CANCEL: 2, statuses.WAIT_FULFILL: 0}
+        retry.get_breaker("ironic")
+
+        s = ManagerService()
+        s._report_retries()
+
+        mock_srqd.assert_has_calls(
+            [mock.call(statuses.WAIT_CANCEL, 2), mock.call(statuses.WAIT_FULFILL, 0)]
+        )
+        mock_sbo.assert_called_once_with("ironic", False)
+
+    @mock.patch("esi_leap.manager.reconcile.reconcile")
+    def test__reconcile_nodes(self, mock_reconcile):
+        self.config(dry_run=True, batch_size=5, group="reconcile")
+        mock_reconcile.return_value = [
+            reconcile.Mismatch("node-1", "lease-1", None, reconcile.SET_LEASE)
+        ]
+
+        s = ManagerService()
+        s._reconcile_nodes()
+
+        mock_reconcile.assert_called_once_with(s._context, dry_run=True, limit=5)
+
+    @mock.patch("esi_leap.manager.reconcile.reconcile")
+    def test__reconcile_nodes_error(self, mock_reconcile):
+        mock_reconcile.side_effect = Exception("whoops")
+
+        s = ManagerService()
+        s._reconcile_nodes()
+
+        mock_reconcile.assert_called_once_with(s._context, dry_run=False, limit=100)
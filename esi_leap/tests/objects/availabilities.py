@@ -0,0 +1,43 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""The offer availability computation before interval algebra."""
+
+
+def legacy_availabilities(start_time, end_time, conflicts):
+    # quadratic implementation get_availabilities replaced, kept as a
+    # reference for the offer tests and benchmarks.availabilities
+    if not conflicts or conflicts[-1][1] <= start_time:
+        return [[start_time, end_time]]
+    if start_time < conflicts[0][0]:
+        times = [start_time, conflicts[0][0]]
+        for i in range(len(conflicts) - 1):
+            times.append(conflicts[i][1])
+            times.append(conflicts[i + 1][0])
+    else:
+        times = []
+        for i in range(len(conflicts) - 1):
+            if (
+                conflicts[i][0] <= start_time and conflicts[i][1] > start_time
+            ) or conflicts[i][0] > start_time:
+                times.append(conflicts[i][1])
+                times.append(conflicts[i + 1][0])
+    times.append(conflicts[-1][1])
+    times.append(end_time)
+    i = 0
+    while i < len(times) - 1:
+        if times[i] == times[i + 1]:
+            times.pop(i)
+            times.pop(i)
+        else:
+            i += 1
+    return [[times[j], times[j + 1]] for j in range(0, len(times) - 1, 2)]
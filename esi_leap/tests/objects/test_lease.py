@@ -18,6 +18,7 @@ import threading
 
 from esi_leap.common import exception
 from esi_leap.common import statuses
+from esi_leap.objects import base as objects_base
 from esi_leap.objects import fields as obj_fields
 from esi_leap.objects import lease as lease_obj
 from esi_leap.objects import offer as offer_obj
@@ -104,6 +105,33 @@ class TestLeaseObject(base.DBTestCase):
             mock_lease_get_by_uuid.assert_called_once_with(lease_uuid)
             self.assertEqual(self.context, lease._context)
 
+    def test_get_read_cache(self):
+        lease_uuid = self.test_lease_dict["uuid"]
+        with mock.patch.object(
+            self.db_api, "lease_get_by_uuid", autospec=True
+        ) as mock_lease_get_by_uuid, mock.patch.object(
+            self.db_api, "lease_update", autospec=True
+        ) as mock_lease_update:
+            mock_lease_get_by_uuid.return_value = self.test_lease_dict
+            mock_lease_update.return_value = self.test_lease_dict
+
+            with objects_base.read_cache():
+                lease = lease_obj.Lease.get(lease_uuid, self.context)
+                lease.status = statuses.ACTIVE
+                again = lease_obj.Lease.get(lease_uuid)
+                mock_lease_get_by_uuid.assert_called_once_with(lease_uuid)
+                self.assertIsNot(lease, again)
+                self.assertEqual(self.test_lease_dict["status"], again.status)
+                self.assertIsNone(again._context)
+
+                lease.save()
+                lease_obj.Lease.get(lease_uuid)
+                self.assertEqual(2, mock_lease_get_by_uuid.call_count)
+
+            lease_obj.Lease.get(lease_uuid)
+            lease_obj.Lease.get(lease_uuid)
+            self.assertEqual(4, mock_lease_get_by_uuid.call_count)
+
     def test_get_all(self):
         with mock.patch.object(
             self.db_api, "lease_get_all", autospec=True
@@ -120,6 +148,25 @@ class TestLeaseObject(base.DBTestCase):
             self.assertIsInstance(leases[0], lease_obj.Lease)
             self.assertEqual(self.context, leases[0]._context)
 
+    def test_get_expiring(self):
+        start = self.test_lease_dict["start_time"]
+        end = self.test_lease_dict["end_time"]
+        with mock.patch.object(
+            self.db_api, "lease_get_expiring", autospec=True
+        ) as mock_lease_get_expiring:
+            mock_lease_get_expiring.return_value = [self.test_lease_dict]
+
+            leases = lease_obj.Lease.get_expiring(
+                start, end, [statuses.ACTIVE], self.context
+            )
+
+            mock_lease_get_expiring.assert_called_once_with(
+                start, end, [statuses.ACTIVE]
+            )
+            self.assertEqual(len(leases), 1)
+            self.assertIsInstance(leases[0], lease_obj.Lease)
+            self.assertEqual(self.context, leases[0]._context)
+
     @mock.patch("esi_leap.objects.lease.Lease.verify_time_range")
     @mock.patch("esi_leap.db.sqlalchemy.api.lease_create")
     def test_create(self, mock_lc, mock_vtr):
@@ -138,6 +185,43 @@ class TestLeaseObject(base.DBTestCase):
             lease.resource_uuid,
         )
 
+    @mock.patch("esi_leap.objects.offer.Offer.get_claimable")
+    @mock.patch("esi_leap.db.sqlalchemy.api.lease_create_bulk")
+    def test_create_bulk(self, mock_lcb, mock_ogc):
+        lease = lease_obj.Lease(self.context, **self.test_lease_create_offer_dict)
+        mock_ogc.return_value = [self.test_offer]
+        mock_lcb.return_value = [self.test_lease_offer_dict]
+
+        leases = lease_obj.Lease.create_bulk([lease], self.context)
+
+        mock_ogc.assert_called_once_with(
+            lease.start_time, lease.end_time, offer_uuids=[self.test_offer.uuid]
+        )
+        mock_lcb.assert_called_once_with([self.test_lease_create_offer_dict])
+        self.assertEqual([lease], leases)
+        self.assertEqual(self.test_lease_offer_dict["uuid"], lease.uuid)
+
+    @mock.patch("esi_leap.objects.offer.Offer.get_claimable")
+    @mock.patch("esi_leap.db.sqlalchemy.api.lease_create_bulk")
+    def test_create_bulk_offer_unavailable(self, mock_lcb, mock_ogc):
+        lease = lease_obj.Lease(self.context, **self.test_lease_create_offer_dict)
+        lease2_dict = dict(
+            self.test_lease_create_offer_dict,
+            offer_uuid=uuidutils.generate_uuid(),
+            resource_uuid="1719",
+        )
+        lease2 = lease_obj.Lease(self.context, **lease2_dict)
+        mock_ogc.return_value = [self.test_offer]
+
+        self.assertRaises(
+            exception.InsufficientOffers,
+            lease_obj.Lease.create_bulk,
+            [lease, lease2],
+            self.context,
+        )
+
+        mock_lcb.assert_not_called()
+
     def test_create_conflict(self):
         lease = lease_obj.Lease(self.context, **self.test_lease_create_offer_dict)
         lease2 = lease_obj.Lease(self.context, **self.test_lease_create_offer_dict)
@@ -315,6 +399,30 @@ class TestLeaseObject(base.DBTestCase):
         mock_save.assert_called_once()
         self.assertEqual(lease.status, statuses.WAIT_FULFILL)
 
+    @mock.patch("esi_leap.resource_objects.dummy_node.DummyNode.set_lease")
+    def test_fulfill_retry(self, mock_set_lease):
+        lease_dict = self.test_lease_create_dict.copy()
+        lease_dict.update(uuid=uuidutils.generate_uuid(), status=statuses.CREATED)
+        self.db_api.lease_create(lease_dict)
+        lease = lease_obj.Lease.get(lease_dict["uuid"], self.context)
+
+        mock_set_lease.side_effect = Exception("bad")
+        lease.fulfill(self.context)
+        lease.fulfill(self.context)
+
+        db_lease = self.db_api.lease_get_by_uuid(lease.uuid)
+        self.assertEqual(statuses.WAIT_FULFILL, db_lease.status)
+        self.assertEqual(2, db_lease.retry_count)
+        self.assertIsNotNone(db_lease.next_retry_time)
+
+        mock_set_lease.side_effect = None
+        lease.fulfill(self.context)
+
+        db_lease = self.db_api.lease_get_by_uuid(lease.uuid)
+        self.assertEqual(statuses.ACTIVE, db_lease.status)
+        self.assertEqual(0, db_lease.retry_count)
+        self.assertIsNone(db_lease.next_retry_time)
+
     @mock.patch("esi_leap.resource_objects.test_node.TestNode.set_lease")
     @mock.patch("esi_leap.objects.lease.Lease.get")
     @mock.patch("esi_leap.objects.lease.Lease.resource_object")
@@ -359,7 +467,7 @@ class TestLeaseObject(base.DBTestCase):
         mock_ro.assert_called_once()
         mock_glu.assert_called_once()
         mock_rl.assert_called_once()
-        mock_save.assert_called_once()
+        mock_save.assert_not_called()
         self.assertEqual(lease.status, statuses.DELETED)
 
     @mock.patch("esi_leap.resource_objects.test_node.TestNode.set_lease")
@@ -408,7 +516,7 @@ class TestLeaseObject(base.DBTestCase):
         mock_ro.assert_called_once()
         mock_glu.assert_called_once()
         mock_rl.assert_called_once()
-        mock_save.assert_called_once()
+        mock_save.assert_not_called()
         self.assertEqual(lease.status, statuses.WAIT_CANCEL)
 
     @mock.patch("esi_leap.resource_objects.test_node.TestNode.set_lease")
@@ -456,7 +564,7 @@ class TestLeaseObject(base.DBTestCase):
         mock_ro.assert_called_once()
         mock_glu.assert_called_once()
         mock_rl.assert_called_once()
-        mock_save.assert_called_once()
+        mock_save.assert_not_called()
         self.assertEqual(lease.status, statuses.DELETED)
 
     @mock.patch("esi_leap.objects.lease.Lease.resource_object")
@@ -498,7 +606,7 @@ class TestLeaseObject(base.DBTestCase):
         mock_ro.assert_called_once()
         mock_glu.assert_called_once()
         mock_rl.assert_not_called()
-        mock_save.assert_called_once()
+        mock_save.assert_not_called()
         self.assertEqual(lease.status, statuses.DELETED)
 
     @mock.patch("esi_leap.resource_objects.test_node.TestNode.set_lease")
@@ -546,7 +654,7 @@ class TestLeaseObject(base.DBTestCase):
         mock_ro.assert_called_once()
         mock_glu.assert_called_once()
         mock_rl.assert_called_once()
-        mock_save.assert_called_once()
+        mock_save.assert_not_called()
         self.assertEqual(lease.status, statuses.EXPIRED)
 
     @mock.patch("esi_leap.resource_objects.test_node.TestNode.set_lease")
@@ -595,7 +703,7 @@ class TestLeaseObject(base.DBTestCase):
         mock_ro.assert_called_once()
         mock_glu.assert_called_once()
         mock_rl.assert_called_once()
-        mock_save.assert_called_once()
+        mock_save.assert_not_called()
         self.assertEqual(lease.status, statuses.WAIT_EXPIRE)
 
     @mock.patch("esi_leap.resource_objects.test_node.TestNode.set_lease")
@@ -643,7 +751,7 @@ class TestLeaseObject(base.DBTestCase):
         mock_ro.assert_called_once()
         mock_glu.assert_called_once()
         mock_rl.assert_called_once()
-        mock_save.assert_called_once()
+        mock_save.assert_not_called()
         self.assertEqual(lease.status, statuses.EXPIRED)
 
     @mock.patch("esi_leap.objects.lease.Lease.resource_object")
@@ -685,9 +793,206 @@ class TestLeaseObject(base.DBTestCase):
         mock_ro.assert_called_once()
         mock_glu.assert_called_once()
         mock_rl.assert_not_called()
-        mock_save.assert_called_once()
+        mock_save.assert_not_called()
         self.assertEqual(lease.status, statuses.EXPIRED)
 
+    @mock.patch("esi_leap.objects.lease.Lease.deactivate", autospec=True)
+    def test_cancel_subtree(self, mock_deactivate):
+        parent_dict = self.test_lease_create_dict.copy()
+        parent_dict.update(uuid=uuidutils.generate_uuid(), status=statuses.ACTIVE)
+        child_dict = self.test_lease_create_dict.copy()
+        child_dict.update(
+            uuid=uuidutils.generate_uuid(),
+            parent_lease_uuid=parent_dict["uuid"],
+            status=statuses.ACTIVE,
+        )
+        offer_dict = {
+            "uuid": uuidutils.generate_uuid(),
+            "project_id": "le55ee",
+            "resource_type": "dummy_node",
+            "resource_uuid": "1718",
+            "parent_lease_uuid": parent_dict["uuid"],
+            "status": statuses.AVAILABLE,
+        }
+        self.db_api.lease_create(parent_dict)
+        self.db_api.lease_create(child_dict)
+        self.db_api.offer_create(offer_dict)
+
+        def deactivate(lease, context, resource):
+            if lease.uuid == parent_dict["uuid"]:
+                raise Exception("bad")
+
+        mock_deactivate.side_effect = deactivate
+
+        lease = lease_obj.Lease.get(parent_dict["uuid"], self.context)
+        lease.cancel(self.context)
+
+        self.assertEqual(
+            [child_dict["uuid"], parent_dict["uuid"]],
+            [c[0][0].uuid for c in mock_deactivate.call_args_list],
+        )
+        self.assertEqual(statuses.WAIT_CANCEL, lease.status)
+        db_parent = self.db_api.lease_get_by_uuid(parent_dict["uuid"])
+        self.assertEqual(statuses.WAIT_CANCEL, db_parent.status)
+        self.assertEqual(1, db_parent.retry_count)
+        self.assertIsNotNone(db_parent.next_retry_time)
+        self.assertEqual(
+            statuses.DELETED, self.db_api.lease_get_by_uuid(child_dict["uuid"]).status
+        )
+        self.assertEqual(
+            statuses.DELETED, self.db_api.offer_get_by_uuid(offer_dict["uuid"]).status
+        )
+
+    @mock.patch("esi_leap.objects.lease.Lease.deactivate", autospec=True)
+    def test_cancel_subtree_deferred(self, mock_deactivate):
+        parent_dict = self.test_lease_create_dict.copy()
+        parent_dict.update(uuid=uuidutils.generate_uuid(), status=statuses.ACTIVE)
+        child_dict = self.test_lease_create_dict.copy()
+        child_dict.update(
+            uuid=uuidutils.generate_uuid(),
+            parent_lease_uuid=parent_dict["uuid"],
+            status=statuses.ACTIVE,
+        )
+        self.db_api.lease_create(parent_dict)
+        self.db_api.lease_create(child_dict)
+
+        lease = lease_obj.Lease.get(parent_dict["uuid"], self.context)
+        lease.cancel(self.context, deferred=True)
+
+        mock_deactivate.assert_not_called()
+        self.assertEqual(statuses.WAIT_CANCEL, lease.status)
+        for uuid in (parent_dict["uuid"], child_dict["uuid"]):
+            self.assertEqual(
+                statuses.WAIT_CANCEL, self.db_api.lease_get_by_uuid(uuid).status
+            )
+        self.assertEqual(
+            [("cancel", child_dict["uuid"]), ("cancel", parent_dict["uuid"])],
+            [
+                (op.action, op.lease_uuid)
+                for op in self.db_api.resource_operation_get_all({})
+            ],
+        )
+        self.assertEqual(
+            {parent_dict["uuid"], child_dict["uuid"]},
+            lease_obj.get_queued_lease_uuids(),
+        )
+
+    @mock.patch("esi_leap.objects.lease.Lease.deactivate", autospec=True)
+    def test_apply_resource_operations(self, mock_deactivate):
+        leases = []
+        for resource_uuid in ("1718", "1718", "1719"):
+            lease_dict = self.test_lease_create_dict.copy()
+            lease_dict.update(
+                uuid=uuidutils.generate_uuid(),
+                resource_uuid=resource_uuid,
+                status=statuses.WAIT_CANCEL,
+            )
+            self.db_api.lease_create(lease_dict)
+            leases.append(lease_dict)
+        self.db_api.lease_offer_bulk_update(
+            [],
+            [],
+            operations=[
+                {
+                    "action": "cancel",
+                    "resource_type": lease["resource_type"],
+                    "resource_uuid": lease["resource_uuid"],
+                    "lease_uuid": lease["uuid"],
+                }
+                for lease in leases
+            ],
+        )
+
+        def deactivate(lease, context, resource):
+            if lease.uuid == leases[0]["uuid"]:
+                raise Exception("bad")
+
+        mock_deactivate.side_effect = deactivate
+
+        self.assertEqual(3, lease_obj.apply_resource_operations(self.context, 10))
+
+        # the failed operation holds back the other one on its resource
+        self.assertEqual(
+            [leases[0]["uuid"], leases[2]["uuid"]],
+            [c[0][0].uuid for c in mock_deactivate.call_args_list],
+        )
+        ops = self.db_api.resource_operation_get_all({}).all()
+        self.assertEqual(
+            [(leases[0]["uuid"], 1), (leases[1]["uuid"], 0)],
+            [(op.lease_uuid, op.attempts) for op in ops],
+        )
+        self.assertEqual("Exception: bad", ops[0].last_error)
+        # the operations on the resource back off together
+        self.assertIsNotNone(ops[0].next_attempt_time)
+        self.assertEqual(ops[0].next_attempt_time, ops[1].next_attempt_time)
+        self.assertEqual(
+            statuses.WAIT_CANCEL,
+            self.db_api.lease_get_by_uuid(leases[0]["uuid"]).status,
+        )
+        done = self.db_api.lease_get_by_uuid(leases[2]["uuid"])
+        self.assertEqual(statuses.DELETED, done.status)
+        self.assertIsNotNone(done.expire_time)
+
+        mock_deactivate.side_effect = None
+        self.assertEqual(0, lease_obj.apply_resource_operations(self.context, 10))
+        with mock.patch(
+            "oslo_utils.timeutils.utcnow",
+            return_value=ops[0].next_attempt_time + datetime.timedelta(seconds=1),
+        ):
+            self.assertEqual(2, lease_obj.apply_resource_operations(self.context, 10))
+        self.assertEqual([], self.db_api.resource_operation_get_all({}).all())
+        for lease in leases[:2]:
+            self.assertEqual(
+                statuses.DELETED, self.db_api.lease_get_by_uuid(lease["uuid"]).status
+            )
+
+    @mock.patch("esi_leap.objects.lease.Lease.deactivate", autospec=True)
+    def test_apply_resource_operations_max_attempts(self, mock_deactivate):
+        self.config(max_attempts=2, group="outbox")
+        leases = []
+        for _ in range(2):
+            lease_dict = self.test_lease_create_dict.copy()
+            lease_dict.update(
+                uuid=uuidutils.generate_uuid(),
+                resource_uuid="1718",
+                status=statuses.WAIT_CANCEL,
+            )
+            self.db_api.lease_create(lease_dict)
+            leases.append(lease_dict)
+        self.db_api.lease_offer_bulk_update(
+            [],
+            [],
+            operations=[
+                {
+                    "action": "cancel",
+                    "resource_type": lease["resource_type"],
+                    "resource_uuid": lease["resource_uuid"],
+                    "lease_uuid": lease["uuid"],
+                }
+                for lease in leases
+            ],
+        )
+        op = self.db_api.resource_operation_get_all({}).first()
+        self.db_api.resource_operation_fail(op.id, "Exception: bad")
+
+        def deactivate(lease, context, resource):
+            if lease.uuid == leases[0]["uuid"]:
+                raise Exception("bad")
+
+        mock_deactivate.side_effect = deactivate
+
+        self.assertEqual(2, lease_obj.apply_resource_operations(self.context, 10))
+
+        # the dropped operation no longer holds back the other one
+        self.assertEqual(2, mock_deactivate.call_count)
+        self.assertEqual([], self.db_api.resource_operation_get_all({}).all())
+        self.assertEqual(
+            statuses.ERROR, self.db_api.lease_get_by_uuid(leases[0]["uuid"]).status
+        )
+        self.assertEqual(
+            statuses.DELETED, self.db_api.lease_get_by_uuid(leases[1]["uuid"]).status
+        )
+
     def test_destroy(self):
         lease = lease_obj.Lease(self.context, **self.test_lease_dict)
         with mock.patch.object(
@@ -13,14 +13,17 @@
 import datetime
 import mock
 from oslo_utils import uuidutils
+import random
 import tempfile
 import threading
 
 from esi_leap.common import exception
 from esi_leap.common import statuses
+from esi_leap.objects import base as objects_base
 from esi_leap.objects import lease
 from esi_leap.objects import offer
 from esi_leap.tests import base
+from esi_leap.tests.objects import availabilities as reference
 
 
 class TestOfferObject(base.DBTestCase):
@@ -76,6 +79,28 @@ class TestOfferObject(base.DBTestCase):
         mock_offer_get_by_uuid.assert_called_once_with(offer_uuid)
         self.assertEqual(self.context, o._context)
 
+    @mock.patch("esi_leap.db.sqlalchemy.api.offer_update")
+    @mock.patch("esi_leap.db.sqlalchemy.api.offer_get_by_uuid")
+    def test_get_read_cache(self, mock_offer_get_by_uuid, mock_offer_update):
+        offer_uuid = self.test_offer_data["uuid"]
+        mock_offer_get_by_uuid.return_value = self.test_offer_data
+        mock_offer_update.return_value = self.test_offer_data
+
+        with objects_base.read_cache():
+            o = offer.Offer.get(offer_uuid, self.context)
+            with objects_base.read_cache():
+                again = offer.Offer.get(offer_uuid, self.context)
+            self.assertIsNot(o, again)
+            self.assertEqual(o.uuid, again.uuid)
+            mock_offer_get_by_uuid.assert_called_once_with(offer_uuid)
+
+            offer.Offer.get(offer_uuid, self.context)
+            mock_offer_get_by_uuid.assert_called_once_with(offer_uuid)
+
+            o.save()
+            offer.Offer.get(offer_uuid, self.context)
+            self.assertEqual(2, mock_offer_get_by_uuid.call_count)
+
     @mock.patch("esi_leap.db.sqlalchemy.api.offer_get_all")
     def test_get_all(self, mock_offer_get_all):
         mock_offer_get_all.return_value = [self.test_offer_data]
@@ -206,6 +231,7 @@ class TestOfferObject(base.DBTestCase):
         ]
         a = o.get_availabilities()
         self.assertEqual(a, expect)
+        mock_ogct.assert_called_once_with(o, now)
 
     @mock.patch("esi_leap.db.sqlalchemy.api.offer_get_conflict_times")
     @mock.patch("esi_leap.objects.offer.datetime")
@@ -226,6 +252,69 @@ class TestOfferObject(base.DBTestCase):
         a = o.get_availabilities()
         self.assertEqual(a, expect)
 
+    @mock.patch("esi_leap.db.sqlalchemy.api.offer_get_conflict_times")
+    @mock.patch("esi_leap.objects.offer.datetime")
+    def test_get_availabilities_conflict_ends_before_now(
+        self, mock_datetime, mock_ogct
+    ):
+        o = offer.Offer(self.context, **self.test_offer_data)
+
+        # a past conflict must not hide the gap before the next one
+        now = o.start_time + datetime.timedelta(days=10)
+        mock_datetime.datetime.now = mock.Mock(return_value=now)
+        mock_ogct.return_value = [
+            [o.start_time, o.start_time + datetime.timedelta(days=5)],
+            [
+                o.start_time + datetime.timedelta(days=20),
+                o.start_time + datetime.timedelta(days=30),
+            ],
+        ]
+        expect = [
+            [now, o.start_time + datetime.timedelta(days=20)],
+            [o.start_time + datetime.timedelta(days=30), o.end_time],
+        ]
+        self.assertEqual(expect, o.get_availabilities())
+
+        # an expired offer has no availabilities left
+        mock_datetime.datetime.now = mock.Mock(
+            return_value=o.end_time + datetime.timedelta(days=1)
+        )
+        self.assertEqual([], o.get_availabilities())
+
+    @mock.patch("esi_leap.db.sqlalchemy.api.offer_get_conflict_times")
+    @mock.patch("esi_leap.objects.offer.datetime")
+    def test_get_availabilities_matches_legacy(self, mock_datetime, mock_ogct):
+        o = offer.Offer(self.context, **self.test_offer_data)
+        rng = random.Random(1718)
+
+        def day(n):
+            return o.start_time + datetime.timedelta(days=n)
+
+        for _ in range(500):
+            bounds = sorted(rng.sample(range(0, 101), rng.randrange(0, 21, 2)))
+            conflicts = [
+                [day(bounds[i]), day(bounds[i + 1])] for i in range(0, len(bounds), 2)
+            ]
+            now = day(rng.randrange(-10, 100))
+            start_time = max(o.start_time, now)
+            # the legacy code dropped the gap after a conflict that ended
+            # by the effective start; only compare where it was right
+            if any(start_time >= c[1] for c in conflicts) and any(
+                start_time < c[1] for c in conflicts
+            ):
+                continue
+            mock_datetime.datetime.now = mock.Mock(return_value=now)
+            mock_ogct.return_value = conflicts
+
+            expect = [
+                a
+                for a in reference.legacy_availabilities(
+                    start_time, o.end_time, conflicts
+                )
+                if a[0] < a[1]
+            ]
+            self.assertEqual(expect, o.get_availabilities())
+
     @mock.patch("esi_leap.db.sqlalchemy.api.resource_verify_availability")
     @mock.patch("esi_leap.db.sqlalchemy.api.offer_create")
     def test_create(self, mock_oc, mock_rva):
@@ -256,6 +345,52 @@ class TestOfferObject(base.DBTestCase):
 
         self.assertRaises(exception.InvalidTimeRange, o.create)
 
+    @mock.patch("esi_leap.db.sqlalchemy.api.offer_get_claimable")
+    def test_get_claimable(self, mock_ogc):
+        start = self.test_offer_data["start_time"]
+        end = self.test_offer_data["end_time"]
+        mock_ogc.return_value = [self.test_offer_data]
+
+        offers = offer.Offer.get_claimable(
+            start, end, lessee_id="12345", context=self.context
+        )
+
+        mock_ogc.assert_called_once_with(
+            start, end, resource_type=None, lessee_id="12345", offer_uuids=None
+        )
+        self.assertEqual(1, len(offers))
+        self.assertEqual(self.test_offer_data["uuid"], offers[0].uuid)
+        self.assertEqual(self.context, offers[0]._context)
+
+    @mock.patch("esi_leap.db.sqlalchemy.api.resource_get_conflicts")
+    @mock.patch("esi_leap.db.sqlalchemy.api.offer_create_bulk")
+    def test_create_bulk(self, mock_ocb, mock_rgc):
+        o1 = offer.Offer(self.context, **self.test_offer_create_data)
+        o2_data = dict(self.test_offer_create_data, resource_uuid="1719")
+        o2 = offer.Offer(self.context, **o2_data)
+        mock_rgc.return_value = {"1719"}
+        mock_ocb.return_value = [self.test_offer_data]
+
+        created, errors = offer.Offer.create_bulk([o1, o2], self.context)
+
+        mock_rgc.assert_called_once_with(
+            "dummy_node", ["1718", "1719"], o1.start_time, o1.end_time
+        )
+        mock_ocb.assert_called_once_with([self.test_offer_create_data])
+        self.assertEqual([o1], created)
+        self.assertEqual(self.test_offer_data["uuid"], o1.uuid)
+        self.assertEqual(["1719"], list(errors))
+        self.assertIsInstance(errors["1719"], exception.ResourceTimeConflict)
+
+    def test_create_bulk_invalid_time(self):
+        bad_offer = dict(
+            self.test_offer_create_data,
+            start_time=self.test_offer_create_data["end_time"],
+        )
+        o = offer.Offer(self.context, **bad_offer)
+
+        self.assertRaises(exception.InvalidTimeRange, offer.Offer.create_bulk, [o])
+
     @mock.patch("esi_leap.db.sqlalchemy.api.lease_verify_child_availability")
     @mock.patch("esi_leap.objects.lease.Lease.get")
     @mock.patch("esi_leap.db.sqlalchemy.api.offer_create")
@@ -312,6 +447,54 @@ class TestOfferObject(base.DBTestCase):
         self.assertEqual(mock_rva.call_count, 2)
         mock_oc.assert_called_once()
 
+    @mock.patch("esi_leap.objects.lease.Lease.deactivate")
+    @mock.patch("esi_leap.db.sqlalchemy.api.lease_offer_bulk_update")
+    @mock.patch("esi_leap.db.sqlalchemy.api.lease_get_subtree")
+    def test_cancel(self, mock_lgs, mock_lobu, mock_deactivate):
+        o = offer.Offer(self.context, **self.test_offer_data)
+        child_lease = {
+            "id": 30,
+            "name": "l",
+            "uuid": uuidutils.generate_uuid(),
+            "project_id": "le55ee",
+            "owner_id": "0wn5r",
+            "purpose": None,
+            "resource_type": "dummy_node",
+            "resource_uuid": "1718",
+            "start_time": o.start_time,
+            "end_time": o.end_time,
+            "fulfill_time": None,
+            "expire_time": None,
+            "status": statuses.ACTIVE,
+            "properties": {},
+            "offer_uuid": o.uuid,
+            "parent_lease_uuid": None,
+            "created_at": None,
+            "updated_at": None,
+        }
+        mock_lgs.return_value = ([child_lease], [])
+
+        o.cancel()
+
+        mock_lgs.assert_called_once_with(offer_uuid=o.uuid)
+        mock_deactivate.assert_called_once()
+        mock_lobu.assert_called_once_with(
+            [
+                (
+                    [child_lease["uuid"]],
+                    {
+                        "status": statuses.DELETED,
+                        "expire_time": mock.ANY,
+                        "retry_count": 0,
+                        "next_retry_time": None,
+                    },
+                ),
+                ([], {"status": statuses.WAIT_CANCEL}),
+            ],
+            [([o.uuid], {"status": statuses.DELETED})],
+        )
+        self.assertEqual(statuses.DELETED, o.status)
+
     @mock.patch("esi_leap.db.sqlalchemy.api.offer_destroy")
     def test_destroy(self, mock_offer_destroy):
         o = offer.Offer(self.context, **self.test_offer_data)
@@ -53,3 +53,15 @@ class TestResourceObjectInterface(base.TestCase):
 
         test_node.verify_availability(start, end)
         mock_rva.assert_called_once_with("base", fake_uuid, start, end)
+
+    def test_replace_lease(self):
+        test_node = ResourceObjectStub(uuidutils.generate_uuid())
+        lease = mock.Mock()
+        new_lease = mock.Mock()
+
+        with mock.patch.object(test_node, "remove_lease") as mock_rl:
+            with mock.patch.object(test_node, "set_lease") as mock_sl:
+                test_node.replace_lease(lease, new_lease)
+
+        mock_rl.assert_called_once_with(lease)
+        mock_sl.assert_called_once_with(new_lease)
@@ -16,6 +16,7 @@ from ironicclient.common.apiclient import exceptions as ir_exception
 import mock
 
 from esi_leap.common import exception
+from esi_leap.common import ironic
 from esi_leap.common import statuses
 from esi_leap.resource_objects import ironic_node
 from esi_leap.tests import base
@@ -73,7 +74,72 @@ class TestIronicNode(base.TestCase):
 
         self.assertEqual(fake_uuid, test_ironic_node.get_uuid())
         mock_gn.assert_called_once()
-        mock_gn.return_value.node.get.assert_called_once_with("node-name")
+        mock_gn.return_value.node.get.assert_called_once_with(
+            "node-name", fields=list(ironic.NODE_FIELDS)
+        )
+
+    @mock.patch.object(ironic_node, "get_ironic_client", autospec=True)
+    def test_init_with_node(self, mock_gic):
+        fake_node = FakeIronicNode()
+        test_ironic_node = ironic_node.IronicNode("fake-node", node=fake_node)
+
+        self.assertEqual(fake_uuid, test_ironic_node.get_uuid())
+        self.assertEqual("fake-node", test_ironic_node.get_name())
+        mock_gic.assert_not_called()
+
+    @mock.patch("esi_leap.common.ironic.get_node")
+    @mock.patch("esi_leap.common.ironic.get_node_list")
+    def test_get_many(self, mock_gnl, mock_gn):
+        fake_node = FakeIronicNode()
+        other_node = FakeIronicNode()
+        other_node.uuid = "b3e9a2b4-7a1b-4dbc-a2a4-34c4e2b1c0c1"
+        other_node.name = None
+        mock_gnl.return_value = [fake_node, other_node]
+
+        nodes = ironic_node.IronicNode.get_many(
+            ["fake-node", other_node.uuid, "missing-node"]
+        )
+
+        mock_gnl.assert_called_once_with()
+        self.assertEqual({"fake-node", other_node.uuid}, set(nodes))
+        self.assertEqual(fake_uuid, nodes["fake-node"].get_uuid())
+        self.assertEqual("baremetal", nodes["fake-node"].get_resource_class())
+        self.assertEqual("abcdef", nodes[other_node.uuid].get_lessee_project_id())
+        mock_gn.assert_not_called()
+
+    @mock.patch("esi_leap.common.ironic.get_node_list")
+    def test_get_many_resource_list(self, mock_gnl):
+        fake_node = FakeIronicNode()
+
+        nodes = ironic_node.IronicNode.get_many(
+            [fake_uuid, "fake-node"], resource_list=[fake_node]
+        )
+
+        mock_gnl.assert_not_called()
+        self.assertEqual(fake_uuid, nodes[fake_uuid].get_uuid())
+        self.assertEqual(fake_uuid, nodes["fake-node"].get_uuid())
+
+    @mock.patch("esi_leap.common.ironic.get_node")
+    @mock.patch("esi_leap.common.ironic.get_node_list")
+    def test_get_many_single(self, mock_gnl, mock_gn):
+        mock_gn.return_value = FakeIronicNode()
+
+        nodes = ironic_node.IronicNode.get_many([fake_uuid])
+
+        self.assertEqual(fake_uuid, nodes[fake_uuid].get_uuid())
+        self.assertEqual("baremetal", nodes[fake_uuid].get_resource_class())
+        mock_gnl.assert_not_called()
+        mock_gn.assert_called_once_with(fake_uuid)
+
+    @mock.patch("esi_leap.common.ironic.get_node")
+    @mock.patch("esi_leap.common.ironic.get_node_list")
+    def test_get_many_single_missing(self, mock_gnl, mock_gn):
+        mock_gn.side_effect = ir_exception.NotFound
+
+        for ident in ["missing-node", "b3e9a2b4-7a1b-4dbc-a2a4-34c4e2b1c0c1"]:
+            self.assertEqual({}, ironic_node.IronicNode.get_many([ident]))
+            mock_gn.assert_called_with(ident)
+        mock_gnl.assert_not_called()
 
     @mock.patch("esi_leap.resource_objects.ironic_node.IronicNode._get_node")
     def test_get_resource_class(self, mock_gn):
@@ -200,6 +266,43 @@ class TestIronicNode(base.TestCase):
             fake_uuid, "deleted"
         )
 
+    @mock.patch.object(ironic_node, "get_ironic_client", autospec=True)
+    @mock.patch("esi_leap.common.ironic.get_node")
+    def test_replace_lease(self, mock_gn, mock_client):
+        fake_get_node = FakeIronicNode()
+        fake_get_node.provision_state = "active"
+        fake_lease = FakeLease()
+        parent_lease = FakeLease()
+        parent_lease.uuid = "000"
+        parent_lease.project_id = "123456"
+        mock_gn.return_value = fake_get_node
+
+        test_ironic_node = ironic_node.IronicNode(fake_uuid)
+        test_ironic_node.replace_lease(fake_lease, parent_lease)
+
+        mock_gn.assert_called_once_with(fake_uuid, None)
+        mock_client.return_value.node.update.assert_called_once_with(
+            fake_uuid,
+            [
+                {"op": "add", "path": "/properties/lease_uuid", "value": "000"},
+                {"op": "add", "path": "/lessee", "value": "123456"},
+            ],
+        )
+        mock_client.return_value.node.set_provision_state.assert_called_once_with(
+            fake_uuid, "deleted"
+        )
+
+    @mock.patch.object(ironic_node, "get_ironic_client", autospec=True)
+    @mock.patch("esi_leap.resource_objects.ironic_node.IronicNode." "get_lease_uuid")
+    def test_replace_lease_no_match(self, mock_glu, mock_client):
+        mock_glu.return_value = "none"
+        test_ironic_node = ironic_node.IronicNode(fake_uuid)
+
+        test_ironic_node.replace_lease(FakeLease(), FakeLease())
+
+        mock_glu.assert_called_once()
+        mock_client.return_value.node.update.assert_not_called()
+
     @mock.patch("esi_leap.resource_objects.ironic_node.IronicNode." "get_lease_uuid")
     def test_expire_lease_no_match(self, mock_glu):
         mock_glu.return_value = "none"
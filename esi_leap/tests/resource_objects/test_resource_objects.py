@@ -13,6 +13,7 @@
 import mock
 
 from esi_leap.common import exception
+from esi_leap.common import ironic
 from esi_leap import resource_objects
 from esi_leap.tests import base
 
@@ -46,6 +47,23 @@ class TestResourceObjects(base.TestCase):
         mock_type.assert_called_once_with("data")
         mock_gt.assert_called_once_with("fake_node")
 
+    @mock.patch("esi_leap.resource_objects.get_type")
+    def test_get_many(self, mock_gt):
+        mock_gt.return_value.get_many.return_value = {"data": "i have data!"}
+        objs = resource_objects.get_many("fake_node", ["data"], ["node"])
+
+        self.assertEqual({"data": "i have data!"}, objs)
+        mock_gt.return_value.get_many.assert_called_once_with(["data"], ["node"])
+        mock_gt.assert_called_once_with("fake_node")
+
+    def test_get_many_default(self):
+        objs = resource_objects.get_many("test_node", ["1111", "2222"])
+
+        self.assertEqual({"1111", "2222"}, set(objs))
+        for ident, obj in objs.items():
+            self.assertIsInstance(obj, resource_objects.test_node.TestNode)
+            self.assertEqual(ident, obj.get_uuid())
+
     @mock.patch("esi_leap.resource_objects.ironic_node.is_uuid_like")
     def test_ironic_node(self, mock_iul):
         mock_iul.return_value = True
@@ -71,7 +89,9 @@ class TestResourceObjects(base.TestCase):
         mock_iul.assert_called_with("node-name")
         mock_gic.assert_called_once_with()
         mock_uuid.assert_called_once_with()
-        mock_ironic_client.node.get.assert_called_once_with("node-name")
+        mock_ironic_client.node.get.assert_called_once_with(
+            "node-name", fields=list(ironic.NODE_FIELDS)
+        )
         self.assertIsInstance(node, resource_objects.ironic_node.IronicNode)
         self.assertEqual("1111", node.get_uuid())
 
@@ -0,0 +1,77 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+
+import mock
+
+from esi_leap import send_email_notification as notification
+from esi_leap.tests import base
+
+
+class TestWarnedLeases(base.TestCase):
+    def setUp(self):
+        super(TestWarnedLeases, self).setUp()
+        self.now = datetime.datetime(2016, 7, 16, 19, 20, 30)
+        self.conn = notification.get_warned_lease_db(":memory:")
+        self.addCleanup(self.conn.close)
+
+    def _lease(self, uuid, days):
+        return mock.Mock(uuid=uuid, end_time=self.now + datetime.timedelta(days))
+
+    def test_get_warned_leases_prunes_ended(self):
+        ended = (self.now - datetime.timedelta(hours=1)).isoformat()
+        ending = (self.now + datetime.timedelta(hours=1)).isoformat()
+        notification.write_warned_lease(self.conn, "ended", ended, self.now)
+        notification.write_warned_lease(self.conn, "ending", ending, self.now)
+
+        self.assertEqual(
+            {("ending", ending)}, notification.get_warned_leases(self.conn, self.now)
+        )
+        rows = self.conn.execute("SELECT lease_uuid FROM warned_leases").fetchall()
+        self.assertEqual([("ending",)], rows)
+
+    @mock.patch("esi_leap.objects.lease.Lease.get_expiring")
+    def test_warn_expiring_leases_skips_warned(self, mock_ge):
+        earlier = self.now - datetime.timedelta(hours=1)
+        warned = self._lease("warned", 1)
+        extended = self._lease("extended", 1)
+        new = self._lease("new", 1)
+        notification.write_warned_lease(
+            self.conn, "warned", warned.end_time.isoformat(), earlier
+        )
+        # the end time of this lease changed since it was warned about
+        old_end_time = (self.now + datetime.timedelta(hours=1)).isoformat()
+        notification.write_warned_lease(self.conn, "extended", old_end_time, earlier)
+        mock_ge.return_value = [warned, extended, new]
+
+        notification.warn_expiring_leases(self.conn, self.now)
+
+        mock_ge.assert_called_once_with(
+            self.now,
+            self.now + datetime.timedelta(notification.lease_warning_days),
+            notification.LEASE_WARNING_STATUSES,
+        )
+        rows = self.conn.execute(
+            "SELECT lease_uuid, end_time, warned_at FROM warned_leases "
+            "ORDER BY lease_uuid, end_time"
+        ).fetchall()
+        end_time = warned.end_time.isoformat()
+        self.assertEqual(
+            [
+                ("extended", old_end_time, earlier.isoformat()),
+                ("extended", end_time, self.now.isoformat()),
+                ("new", end_time, self.now.isoformat()),
+                ("warned", end_time, earlier.isoformat()),
+            ],
+            rows,
+        )